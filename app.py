@@ -3,15 +3,22 @@ Music Akenator Flask App - CLEAN VERSION
 Uses your verified enhanced system
 """
 
-from datetime import datetime, timedelta
-import uuid
+import atexit
+from datetime import datetime
+import functools
+import hmac
 import logging
-from typing import Tuple
+import signal
+import sys
+import threading
+import time
+import uuid
 
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, g, jsonify, request, send_from_directory
 from flask_cors import CORS
 
 from backend.logic.config import (
+    ADMIN_TOKEN,
     CONFIDENCE_THRESHOLD,
     DOMINANCE_RATIO,
     FLASK_DEBUG,
@@ -21,7 +28,27 @@ from backend.logic.config import (
     MIN_QUESTIONS_BEFORE_GUESS,
     MIN_CONFIDENCE_MARGIN,
     MAX_QUESTIONS,
+    RATE_LIMIT_CLIENT_HEADER,
+    SPECULATIVE_ANSWERS,
+    STATELESS_SESSIONS,
 )
+from backend.logic.admission import AdmissionRejected, admission, client_key
+from backend.logic.batching import batch_scheduler
+from backend.logic.catalog import catalog_stats, confidence_label, find_catalog, normalize_answer
+from backend.logic.live_updates import live_updates
+from backend.logic.memory_tracing import memory_tracer
+from backend.logic.metrics import REGISTRY, REQUEST_SECONDS, STAGE_SECONDS, TURN_OUTCOMES
+from backend.logic.process_stats import process_memory
+from backend.logic.profiling import profiler
+from backend.logic.response_formats import FULL, encode, negotiate
+from backend.logic.sessions import Session, SessionManager
+from backend.logic.single_flight import single_flight_stats
+from backend.logic.song_index import find_card_json, find_playback_json
+from backend.logic.speculation import speculator
+from backend.logic.state_tokens import InvalidStateToken, decode_session, encode_session, is_state_token
+from backend.logic.status import StatusReporter
+from backend.logic.turn_cache import decide_turn, turn_cache
+from backend.logic.warm_pool import warm_pool
 
 # Create Flask app
 app = Flask(__name__)
@@ -34,74 +61,140 @@ logger = logging.getLogger(__name__)
 CORS(app)
 
 
-class Session:
-    """Game session using YOUR verified enhanced system"""
-    
-    def __init__(self, target_dataset_size: int = 100):
-        try:
-            from backend.logic.simple_enhanced import create_simple_enhanced_akenator
-            self.akenator = create_simple_enhanced_akenator(target_dataset_size)
-            self.songs = self.akenator.get_entities()
-            self.beliefs = self.akenator.get_beliefs()
-            self.questions = self.akenator.get_questions()
-            self.asked = set()
-            self.history = []
-            self.target_dataset_size = target_dataset_size
-            logger.info(f"✅ Session created with {len(self.songs)} songs")
-        except Exception as e:
-            logger.error(f"❌ Failed to create session: {e}")
-            self.akenator = None
-            self.songs = []
-            self.beliefs = {}
-            self.questions = []
-            self.asked = set()
-            self.history = []
-            self.target_dataset_size = 100
-
-
-class SessionManager:
-    """Simple in-memory session store with basic time-based expiry."""
-    
-    def __init__(self):
-        self._sessions = {}
-        self._ttl = timedelta(seconds=SESSION_TTL_SECONDS)
-
-    def _is_expired(self, created_at: datetime) -> bool:
-        return datetime.utcnow() - created_at > self._ttl
-
-    def cleanup(self) -> None:
-        now = datetime.utcnow()
-        expired_keys = [
-            key
-            for key, (_, created_at) in self._sessions.items()
-            if now - created_at > self._ttl
-        ]
-        for key in expired_keys:
-            self._sessions.pop(key, None)
-
-    def create(self, target_dataset_size: int = 100) -> Tuple[str, Session]:
-        """Create a new session and return (session_id, session)."""
-        self.cleanup()
-        session_id = str(uuid.uuid4())
-        session = Session(target_dataset_size)
-        self._sessions[session_id] = (session, datetime.utcnow())
-        logger.info(f"🆔 Created session {session_id}")
-        return session_id, session
-
-    def get(self, session_id):
-        """Return an existing session or None if missing/expired."""
-        self.cleanup()
-        value = self._sessions.get(session_id)
-        if value is None:
-            return None
-        session, created_at = value
-        if self._is_expired(created_at):
-            self._sessions.pop(session_id, None)
-            return None
-        return session
+session_manager = SessionManager()
+status_reporter = StatusReporter(session_manager)
 
 
-session_manager = SessionManager()
+_shutdown_lock = threading.Lock()
+_shut_down = False
+
+
+def shutdown():
+    """Stop background work and flush sessions; servers that bypass atexit call this."""
+    global _shut_down
+    with _shutdown_lock:
+        if _shut_down:
+            return
+        _shut_down = True
+    warm_pool.stop()
+    status_reporter.stop()
+    speculator.shutdown()
+    session_manager.close()
+
+
+atexit.register(shutdown)
+
+
+_SESSION_LOAD_STAGE = STAGE_SECONDS.labels("session_load")
+_BELIEF_UPDATE_STAGE = STAGE_SECONDS.labels("belief_update")
+_TURN_DECISION_STAGE = STAGE_SECONDS.labels("turn_decision")
+_PAYLOAD_STAGE = STAGE_SECONDS.labels("payload")
+_ENCODE_STAGE = STAGE_SECONDS.labels("encode")
+
+
+def _register_metrics():
+    """Gauges and counters read from live state at scrape time."""
+    REGISTRY.callback("song_genie_active_sessions", "Sessions in the session store",
+                      lambda: [({}, len(session_manager))])
+    REGISTRY.callback("song_genie_catalog_songs", "Songs per cached catalog",
+                      lambda: [({"version": c["version"]}, c["songs"]) for c in catalog_stats()["catalogs"]])
+    REGISTRY.callback("song_genie_catalog_questions", "Question pool size per cached catalog",
+                      lambda: [({"version": c["version"]}, c["questions"]) for c in catalog_stats()["catalogs"]])
+    REGISTRY.callback("song_genie_turn_cache_entries", "Entries in the transposition cache",
+                      lambda: [({}, turn_cache.stats()["entries"])])
+    REGISTRY.callback("song_genie_admission_in_flight", "Admitted requests in progress",
+                      lambda: [({}, admission.stats()["in_flight"])])
+    REGISTRY.callback("song_genie_admission_queue_depth", "Requests waiting for an in-flight slot",
+                      lambda: [({}, admission.stats()["queue_depth"])])
+    REGISTRY.callback("song_genie_admission_shed_total", "Requests shed by admission control",
+                      lambda: [
+                          ({"reason": reason}, admission.stats()[f"shed_{reason}"])
+                          for reason in ("rate_limited", "queue_full", "queue_timeout")
+                      ], kind="counter")
+    REGISTRY.callback("song_genie_warm_pool_depth", "Ready sessions per dataset size",
+                      lambda: [({"size": size}, pool["depth"]) for size, pool in warm_pool.stats()["pools"].items()])
+    REGISTRY.callback("song_genie_coalesced_waiters_total", "Callers that waited on an identical in-flight computation",
+                      lambda: [({"group": name}, stats["coalesced_waiters"])
+                               for name, stats in single_flight_stats().items()], kind="counter")
+
+
+_register_metrics()
+
+
+def admin_allowed(token: str, remote_addr) -> bool:
+    """Admin token when configured, otherwise loopback clients only."""
+    if ADMIN_TOKEN:
+        return hmac.compare_digest(token, ADMIN_TOKEN)
+    return remote_addr in {"127.0.0.1", "::1"}
+
+
+def _admin_allowed() -> bool:
+    return admin_allowed(request.headers.get("X-Admin-Token", ""), request.remote_addr)
+
+
+def admin_only(view):
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not _admin_allowed():
+            return jsonify({"error": "Forbidden", "status": "error"}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+    
+    # Opt-in profiling: X-Profile header (admins only) or random sampling
+    requested = request.headers.get("X-Profile", "").lower() in {"1", "true", "yes", "on"}
+    if profiler.wanted(requested and _admin_allowed()):
+        g.request_id = request.headers.get("X-Request-Id") or uuid.uuid4().hex[:16]
+        g.profile = profiler.start()
+
+
+@app.after_request
+def _observe_request_latency(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        elapsed = time.perf_counter() - started
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        REQUEST_SECONDS.labels(endpoint).observe(elapsed)
+        
+        profile = g.pop("profile", None)
+        if profile is not None:
+            profiler.finish(profile, g.request_id, request.path, response.status_code, elapsed)
+            response.headers["X-Request-Id"] = g.request_id
+            response.headers["X-Profile-Id"] = g.request_id
+    return response
+
+
+@app.teardown_request
+def _stop_abandoned_profile(error=None):
+    # after_request is skipped when a view raises; never leave the profiler on
+    profile = g.pop("profile", None)
+    if profile is not None:
+        profiler.finish(profile, g.request_id, request.path, 500,
+                        time.perf_counter() - g.get("request_started", time.perf_counter()))
+
+
+def admission_controlled(view):
+    """Shed requests fast with 429/503 + Retry-After instead of queueing them."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        try:
+            forwarded = request.headers.get(RATE_LIMIT_CLIENT_HEADER) if RATE_LIMIT_CLIENT_HEADER else None
+            admission.acquire(client_key(request.remote_addr, forwarded))
+        except AdmissionRejected as e:
+            logger.warning(f"🚦 Shed {request.path} ({e.status_code}): {e.reason}")
+            response = jsonify({"error": e.reason, "status": "error"})
+            response.status_code = e.status_code
+            response.headers["Retry-After"] = str(e.retry_after)
+            return response
+        try:
+            return view(*args, **kwargs)
+        finally:
+            admission.release()
+    return wrapper
 
 
 @app.route("/")
@@ -122,303 +215,581 @@ def serve_js():
     return send_from_directory("frontend", "script.js")
 
 
-@app.route("/start", methods=["GET"])
-def start():
-    """Start a new game session."""
+def start_game(args):
+    """Start a new game from query args; returns (payload, status)."""
     try:
         # Get dataset size parameter (default 100)
-        target_size = int(request.args.get("size", "100"))
+        target_size = int(args.get("size", "100"))
         target_size = max(10, min(1000, target_size))  # Limit between 10-1000
         
-        logger.info(f"🚀 Starting new game with {target_size} songs")
+        # Stateless games live in a signed client-held token, not the session store
+        stateless = args.get(
+            "stateless", "1" if STATELESS_SESSIONS else "0"
+        ).strip().lower() in {"1", "true", "yes", "on"}
         
-        session_id, session = session_manager.create(target_size)
+        logger.info(f"🚀 Starting new game with {target_size} songs")
         
-        # Get first question
-        best_question = session.akenator.get_best_question(session.asked)
+        # Pooled sessions have already been asked the catalog's precomputed first question
+        session = warm_pool.take(target_size)
+        session_id = None if stateless else session_manager.add(session)
+        catalog = session.catalog
+        question_index = session.pending_question
         
-        if best_question:
-            session.asked.add((best_question["feature"], best_question["value"]))
-            session.history.append({
-                "feature": best_question["feature"],
-                "value": best_question["value"],
-                "text": best_question["text"]
-            })
-            question_data = {
-                "feature": best_question["feature"],
-                "value": best_question["value"],
-                "text": best_question["text"]
-            }
+        if question_index is not None:
+            if SPECULATIVE_ANSWERS:
+                speculator.speculate(session)
+            question_data = catalog.question_payload(question_index)
         else:
             question_data = None
         
-        return jsonify({
+        response = {
             "session_id": session_id,
             "question": question_data,
-            "total_questions": len(session.questions),
-            "songs_count": len(session.songs),
+            "total_questions": len(catalog.questions),
+            "songs_count": len(catalog.songs),
             "dataset_size": target_size,
             "status": "success"
-        })
+        }
+        if stateless:
+            response["session_id"] = response["state_token"] = encode_session(session)
+        
+        return response, 200
         
     except Exception as e:
         logger.error(f"❌ Start endpoint error: {e}")
-        return jsonify({
+        return {
             "error": str(e),
             "status": "error"
-        }), 500
+        }, 500
 
 
-@app.route("/answer", methods=["POST"])
-def answer():
-    """Process user answer and return next question or guess."""
+@app.route("/start", methods=["GET"])
+@admission_controlled
+def start():
+    """Start a new game session."""
+    payload, status_code = start_game(request.args)
+    return jsonify(payload), status_code
+
+
+def _play_turn(session: Session, answer, slim: bool = False):
+    """Apply one answer; returns (payload, status) with the next question or the final guess.
+
+    Slim payloads carry song ids plus a small projection instead of full song cards.
+    """
+    if not session.catalog:
+        return {
+            "error": "Session not properly initialized",
+            "status": "error"
+        }, 500
+
+    catalog = session.catalog
+
+    # Apply the answer to the last asked question
+    question_index = session.pending_question
+    if question_index is not None:
+        if SPECULATIVE_ANSWERS:
+            speculator.cancel(session)
+        answer = normalize_answer(answer)
+        with _BELIEF_UPDATE_STAGE.time():
+            session.record_answer(answer)
+        logger.info(f"📝 Answer recorded: {catalog.questions[question_index]['feature']} = {answer}")
+
+    # Guess or next question; shared with other sessions that gave the same answers
+    with _TURN_DECISION_STAGE.time():
+        decision = decide_turn(session)
+
+    with _PAYLOAD_STAGE.time():
+        return _turn_payload(session, decision, slim)
+
+
+def _turn_payload(session: Session, decision, slim: bool):
+    """Response for a turn decision: the final guess or the next question."""
+    catalog = session.catalog
+    questions_asked = session.questions_asked
+
+    if decision.should_guess:
+        # Make final guess
+        top_candidates = decision.top_candidates
+
+        if top_candidates:
+            guessed_index, top_prob = top_candidates[0]
+            guessed_song = catalog.songs[guessed_index]
+            confidence = 1.0 if top_prob > 0 else 0.0
+            explanation = confidence_label(confidence)
+
+            cards = catalog.song_index
+            logger.info(f"🎯 Final guess: {guessed_song['title']} (confidence: {confidence:.3f})")
+            
+            if slim:
+                return {
+                    "type": "result",
+                    "catalog_version": catalog.version,
+                    "song": cards.summary(catalog.song_ids[guessed_index]),
+                    "confidence": confidence,
+                    "explanation": explanation,
+                    "questions_asked": questions_asked,
+                    "top_songs": [[catalog.song_ids[song_index], prob] for song_index, prob in top_candidates],
+                    "status": "success"
+                }, 200
+
+            # Create response with top songs and playback URLs
+            # Song records are serialized once per catalog and spliced in
+            response = {
+                "type": "result",
+                "song": cards.card_json(catalog.song_ids[guessed_index]),
+                "confidence": confidence,
+                "explanation": explanation,
+                "questions_asked": questions_asked,
+                "top_songs": [
+                    {
+                        "song": cards.card_json(catalog.song_ids[song_index]),
+                        "probability": prob,
+                        "playback_url": f"/play_song/{catalog.song_ids[song_index]}"
+                    }
+                    for song_index, prob in top_candidates
+                ],
+                "status": "success"
+            }
+            return response, 200
+
+        # Fallback if no candidates
+        return {
+            "type": "result",
+            "error": "Unable to determine song",
+            "questions_asked": questions_asked,
+            "status": "error"
+        }, 200
+
+    else:
+        # Get next question
+        question_index = decision.question_index
+
+        if question_index is not None:
+            session.ask(question_index)
+            if SPECULATIVE_ANSWERS:
+                speculator.speculate(session)
+
+            question = catalog.question_payload(question_index)
+            return {
+                "type": "question",
+                "question": {"text": question["text"]} if slim else question,
+                "questions_asked": questions_asked,
+                "remaining_questions": MAX_QUESTIONS - questions_asked,
+                "status": "success"
+            }, 200
+        else:
+            # No more questions available
+            return {
+                "type": "result",
+                "error": "No more questions available",
+                "questions_asked": questions_asked,
+                "status": "error"
+            }, 200
+
+
+def answer_game(data, response_format: str = FULL):
+    """Apply an answer from a request body; returns (payload, status)."""
+    slim = response_format != FULL
     try:
-        data = request.get_json()
         session_id = data.get("session_id")
         answer = data.get("answer")
+        # A state token may be sent as state_token or in place of session_id
+        state_token = data.get("state_token") or (session_id if is_state_token(session_id) else None)
         
-        if not session_id or answer is None:
-            return jsonify({
+        if not (session_id or state_token) or answer is None:
+            return {
                 "error": "Missing session_id or answer",
                 "status": "error"
-            }), 400
-        
-        session = session_manager.get(session_id)
-        if not session:
-            return jsonify({
-                "error": "Invalid or expired session",
-                "status": "error"
-            }), 400
-        
-        if not session.akenator:
-            return jsonify({
-                "error": "Session not properly initialized",
-                "status": "error"
-            }), 500
+            }, 400
         
-        # Get last asked question from history
-        if session.history:
-            last_question = session.history[-1]
-            
-            # Update beliefs with answer
-            new_beliefs = session.akenator.update_beliefs(last_question, answer)
-            session.beliefs = new_beliefs
+        if state_token:
+            try:
+                session = decode_session(state_token)
+            except InvalidStateToken as e:
+                logger.info(f"🔏 Rejected state token: {e}")
+                return {
+                    "error": "Invalid or expired session",
+                    "status": "error"
+                }, 400
             
-            # Record answer
-            last_question["answer"] = answer
-            logger.info(f"📝 Answer recorded: {last_question['feature']} = {answer}")
+            payload, status_code = _play_turn(session, answer, slim)
+            payload["session_id"] = payload["state_token"] = encode_session(session)
+            return payload, status_code
         
-        # Check if should make guess
-        questions_asked = len(session.asked)
-        should_guess, guess_id = session.akenator.should_make_guess(questions_asked)
+        # Answers for the same session are applied one at a time; a turn that
+        # loses a race with another worker is re-run on the fresh state
+        load_started = time.perf_counter()
         
-        if should_guess or questions_asked >= MAX_QUESTIONS:
-            # Make final guess
-            top_candidates = session.akenator.get_top_candidates(3)
-            
-            if top_candidates:
-                # Get song details for top candidate
-                guessed_song_id = top_candidates[0][0]
-                guessed_song = None
-                
-                for song in session.songs:
-                    if song['id'] == guessed_song_id:
-                        guessed_song = song
-                        break
-                
-                if guessed_song:
-                    confidence, explanation = session.akenator.get_confidence(guessed_song_id)
-                    
-                    # Create response with top songs and playback URLs
-                    response = {
-                        "type": "result",
-                        "song": guessed_song,
-                        "confidence": confidence,
-                        "explanation": explanation,
-                        "questions_asked": questions_asked,
-                        "top_songs": [
-                            {
-                                "song": session.songs[song_id] if song_id < len(session.songs) else guessed_song,
-                                "probability": prob,
-                                "playback_url": f"/play_song/{song_id}"
-                            }
-                            for song_id, prob, _ in top_candidates
-                        ],
-                        "status": "success"
-                    }
-                    
-                    logger.info(f"🎯 Final guess: {guessed_song['title']} (confidence: {confidence:.3f})")
-                    return jsonify(response)
-            
-            # Fallback if no candidates
-            return jsonify({
-                "type": "result",
-                "error": "Unable to determine song",
-                "questions_asked": questions_asked,
-                "status": "error"
-            })
-        
-        else:
-            # Get next question
-            best_question = session.akenator.get_best_question(session.asked)
-            
-            if best_question:
-                session.asked.add((best_question["feature"], best_question["value"]))
-                session.history.append({
-                    "feature": best_question["feature"],
-                    "value": best_question["value"],
-                    "text": best_question["text"]
-                })
-                
-                return jsonify({
-                    "type": "question",
-                    "question": {
-                        "feature": best_question["feature"],
-                        "value": best_question["value"],
-                        "text": best_question["text"]
-                    },
-                    "questions_asked": questions_asked,
-                    "remaining_questions": MAX_QUESTIONS - questions_asked,
-                    "status": "success"
-                })
-            else:
-                # No more questions available
-                return jsonify({
-                    "type": "result",
-                    "error": "No more questions available",
-                    "questions_asked": questions_asked,
+        def turn(session):
+            _SESSION_LOAD_STAGE.observe(time.perf_counter() - load_started)
+            if not session:
+                return None, ({
+                    "error": "Invalid or expired session",
                     "status": "error"
-                })
+                }, 400)
+            return session, _play_turn(session, answer, slim)
+        
+        session, (payload, status_code) = session_manager.apply(session_id, turn)
+        # Subscribers only see turns that were written
+        if session is not None and live_updates.has_subscribers(session_id):
+            live_updates.publish(session_id, session, final=payload.get("type") == "result")
+        return payload, status_code
     
     except Exception as e:
         logger.error(f"❌ Answer endpoint error: {e}")
-        return jsonify({
+        return {
             "error": str(e),
             "status": "error"
-        }), 500
+        }, 500
+
+
+@app.route("/answer", methods=["POST"])
+@admission_controlled
+def answer():
+    """Process user answer and return next question or guess."""
+    try:
+        data = request.get_json()
+    except Exception as e:
+        return jsonify({"error": str(e), "status": "error"}), 400
+    response_format = negotiate(
+        request.headers.get("Accept"), data.get("format") if isinstance(data, dict) else None
+    )
+    payload, status_code = answer_game(data, response_format)
+    TURN_OUTCOMES.labels(payload.get("type", "error")).inc()
+    with _ENCODE_STAGE.time():
+        body, content_type = encode(payload, response_format)
+    return Response(body, status=status_code, content_type=content_type)
+
+
+@app.route("/sessions/<session_id>/stream", methods=["GET"])
+def stream_session(session_id):
+    """Server-sent events with the session's live top candidates."""
+    session = session_manager.get(session_id)
+    if not session:
+        return jsonify({"error": "Invalid session", "status": "error"}), 404
+    
+    events = live_updates.stream(session_id, session, alive=lambda: session_manager.is_live(session_id))
+    return Response(events, mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+
+@app.route("/songs/<int:song_id>", methods=["GET"])
+def song_card(song_id):
+    """Full song card, cacheable; slim /answer clients fetch cards on demand."""
+    catalog_version = request.args.get("catalog")
+    card = find_card_json(song_id, catalog_version)
+    if card is None:
+        return jsonify({"error": "Song not found"}), 404
+    
+    response = Response(card, mimetype="application/json")
+    if catalog_version:
+        # A catalog version pins the card's content
+        response.set_etag(f"{catalog_version}-{song_id}")
+        response.cache_control.public = True
+        response.cache_control.max_age = 86400
+        return response.make_conditional(request)
+    response.cache_control.public = True
+    response.cache_control.max_age = 300
+    return response
 
 
 @app.route("/play_song/<int:song_id>", methods=["GET"])
 def play_song(song_id):
     """Play the song with the highest probability after guess is complete."""
     try:
-        # Load all songs to find the requested song
-        from backend.logic.kg_loader import load_dataset
-        all_songs = load_dataset()
-        
-        # Find the song by ID
-        target_song = None
-        for song in all_songs:
-            if song.get("id") == song_id:
-                target_song = song
-                break
-        
-        if not target_song:
+        # O(1) lookup of a body serialized when the song was indexed
+        playback = find_playback_json(song_id)
+        if playback is None:
             return jsonify({"error": "Song not found"}), 404
-        
-        # Return song details for playback
-        return jsonify({
-            "type": "playback",
-            "song": target_song,
-            "message": f"Now playing: {target_song['title']} by {', '.join(target_song['artists'])}",
-            "audio_url": f"https://example.com/audio/{song_id}.mp3",  # Mock URL
-            "duration": target_song.get("duration"),
-            "genres": target_song.get("genres", []),
-            "year": target_song.get("publication_date", "")[:4] if target_song.get("publication_date") else "Unknown"
-        })
+        return Response(playback, mimetype="application/json")
         
     except Exception as e:
         logger.error(f"Error in song playback: {e}")
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/feedback", methods=["POST"])
-def feedback():
-    """Collect user feedback on the guess."""
+def feedback_game(data):
+    """Record feedback on a guess; returns (payload, status)."""
     try:
-        data = request.get_json()
         session_id = data.get("session_id")
         feedback_type = data.get("feedback")  # "correct" or "incorrect"
         song_title = data.get("song_title")
         
-        session = session_manager.get(session_id)
+        token = data.get("state_token") or (session_id if is_state_token(session_id) else None)
+        if token:
+            try:
+                session = decode_session(token)
+            except InvalidStateToken:
+                session = None
+        else:
+            session = session_manager.get(session_id)
         if not session:
-            return jsonify({"error": "Invalid session"}), 404
+            return {"error": "Invalid session"}, 404
         
         # Log feedback for analytics
         logger.info(f"📝 Feedback: {feedback_type} for song {song_title}")
         
-        return jsonify({
+        return {
             "message": "Feedback recorded",
             "status": "success"
-        })
+        }, 200
         
     except Exception as e:
         logger.error(f"Error recording feedback: {e}")
-        return jsonify({"error": str(e)}), 500
+        return {"error": str(e)}, 500
 
 
-@app.route("/health", methods=["GET"])
-def health():
-    """Health check endpoint."""
-    return jsonify({
+@app.route("/feedback", methods=["POST"])
+def feedback():
+    """Collect user feedback on the guess."""
+    try:
+        data = request.get_json()
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+    payload, status_code = feedback_game(data)
+    return jsonify(payload), status_code
+
+
+def health_report():
+    """Health check payload; returns (payload, status_code)."""
+    return {
         "status": "ok",
         "timestamp": datetime.utcnow().isoformat(),
         "service": "Music Akenator Enhanced System"
-    })
+    }, 200
 
 
-@app.route("/status", methods=["GET"])
-def status():
-    """Get system status."""
+@app.route("/health", methods=["GET"])
+def health():
+    """Health check endpoint."""
+    payload, status_code = health_report()
+    return jsonify(payload), status_code
+
+
+def system_status():
+    """Status payload; returns (payload, status_code)."""
     try:
-        from backend.logic.simple_enhanced import create_simple_enhanced_akenator
-        akenator = create_simple_enhanced_akenator(50)
-        system_status = akenator.get_system_status()
-        
-        return jsonify({
-            "system_status": system_status,
-            "active_sessions": len(session_manager._sessions),
+        # Served from the background-refreshed snapshot; never builds an engine
+        return {
+            **status_reporter.snapshot(),
             "flask_debug": FLASK_DEBUG,
             "host": FLASK_HOST,
             "port": FLASK_PORT,
             "status": "success"
-        })
+        }, 200
     except Exception as e:
         logger.error(f"❌ Status endpoint error: {e}")
-        return jsonify({
+        return {
             "error": str(e),
             "status": "error"
-        }), 500
+        }, 500
 
 
-@app.route("/sessions", methods=["GET"])
-def list_sessions():
-    """List active sessions."""
+@app.route("/status", methods=["GET"])
+def status():
+    """Get system status."""
+    payload, status_code = system_status()
+    return jsonify(payload), status_code
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus text exposition of in-process metrics."""
+    return Response(REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def profile_listing():
+    """Recently profiled requests payload; returns (payload, status_code)."""
+    return {
+        "status": "success",
+        "profiler": profiler.stats(),
+        "profiles": profiler.summaries()
+    }, 200
+
+
+def profile_record(request_id):
+    """One profiled request's top stacks; returns (payload, status_code)."""
+    record = profiler.get(request_id)
+    if record is None:
+        return {"error": "Profile not found", "status": "error"}, 404
+    return {"status": "success", **record}, 200
+
+
+@app.route("/admin/profiles", methods=["GET"])
+@admin_only
+def list_profiles():
+    """Recently profiled requests, newest first."""
+    payload, status_code = profile_listing()
+    return jsonify(payload), status_code
+
+
+@app.route("/admin/profiles/<request_id>", methods=["GET"])
+@admin_only
+def get_profile(request_id):
+    """Top stacks captured for one profiled request."""
+    payload, status_code = profile_record(request_id)
+    return jsonify(payload), status_code
+
+
+def memory_breakdown(args):
+    """Memory report payload for query args (?limit=); returns (payload, status_code)."""
+    limit = max(0, int(args.get("limit", "100")))
+    totals = {}
     sessions = []
-    for session_id, (session_obj, created_at) in session_manager._sessions.items():
+    # Stored sessions are measured by their serialized state, never decoded
+    for summary in session_manager.summaries():
+        breakdown = summary.breakdown
+        for component, size in breakdown.items():
+            totals[component] = totals.get(component, 0) + size
         sessions.append({
-            "session_id": session_id,
-            "created_at": created_at.isoformat(),
-            "questions_asked": len(session_obj.asked),
-            "songs_count": len(session_obj.songs)
+            "session_id": summary.session_id,
+            "questions_asked": summary.questions_asked,
+            "catalog_version": summary.catalog_version,
+            "memory_bytes": sum(breakdown.values()),
+            "breakdown": breakdown
         })
-    return jsonify({"status": "success", "sessions": sessions})
+    sessions.sort(key=lambda entry: entry["memory_bytes"], reverse=True)
+    total_bytes = sum(totals.values())
+    
+    return {
+        "status": "success",
+        "session_count": len(sessions),
+        "session_bytes": total_bytes,
+        "avg_session_bytes": (total_bytes / len(sessions)) if sessions else 0.0,
+        "components": totals,
+        "sessions": sessions[:limit],
+        "shared_catalogs": [
+            {key: entry[key] for key in ("version", "songs", "memory_bytes")}
+            for entry in catalog_stats()["catalogs"]
+        ],
+        "process": process_memory(),
+        "tracemalloc": {"tracing": memory_tracer.tracing, "snapshots": memory_tracer.snapshots()}
+    }, 200
+
+
+@app.route("/admin/memory", methods=["GET"])
+@admin_only
+def memory_report():
+    """Per-session memory by component, plus shared catalogs and process totals."""
+    payload, status_code = memory_breakdown(request.args)
+    return jsonify(payload), status_code
+
+
+def tracemalloc_snapshot(args):
+    """Take a tracemalloc snapshot (?frames=); returns (payload, status_code)."""
+    frames = max(1, min(50, int(args.get("frames", "1"))))
+    return {"status": "success", "snapshot": memory_tracer.take_snapshot(frames)}, 200
+
+
+def tracemalloc_report(args):
+    """Allocation diff payload (?from=&to=&top=&filter=&group_by=); returns (payload, status_code)."""
+    key_type = args.get("group_by", "lineno")
+    if key_type not in {"lineno", "filename", "traceback"}:
+        return {"error": "group_by must be lineno, filename or traceback", "status": "error"}, 400
+    diff = memory_tracer.diff(
+        args.get("from", ""),
+        args.get("to", ""),
+        top_n=max(1, int(args.get("top", "20"))),
+        key_type=key_type,
+        path_filter=args.get("filter")
+    )
+    if diff is None:
+        return {"error": "Unknown snapshot id", "status": "error"}, 404
+    return {"status": "success", **diff}, 200
 
 
-@app.route("/insights", methods=["GET"])
-def insights():
-    """Return basic question/guess insights."""
+def tracemalloc_stop():
+    """Stop tracing and drop stored snapshots; returns (payload, status_code)."""
+    memory_tracer.stop()
+    return {"status": "success"}, 200
+
+
+@app.route("/admin/tracemalloc/snapshots", methods=["POST"])
+@admin_only
+def take_tracemalloc_snapshot():
+    """Take a snapshot; the first one also starts tracing and is the baseline."""
+    payload, status_code = tracemalloc_snapshot(request.args)
+    return jsonify(payload), status_code
+
+
+@app.route("/admin/tracemalloc/diff", methods=["GET"])
+@admin_only
+def tracemalloc_diff():
+    """Largest allocation changes between two snapshots (?from=&to=&top=&filter=)."""
+    payload, status_code = tracemalloc_report(request.args)
+    return jsonify(payload), status_code
+
+
+@app.route("/admin/tracemalloc", methods=["DELETE"])
+@admin_only
+def stop_tracemalloc():
+    """Stop tracing and drop stored snapshots."""
+    payload, status_code = tracemalloc_stop()
+    return jsonify(payload), status_code
+
+
+def session_listing():
+    """Active sessions payload; returns (payload, status_code)."""
+    sessions = []
+    total_bytes = 0
+    for summary in session_manager.summaries():
+        memory_bytes = sum(summary.breakdown.values())
+        total_bytes += memory_bytes
+        # Song counts come from cached catalogs only; listing never builds one
+        catalog = find_catalog(summary.catalog_version) if summary.catalog_version else None
+        sessions.append({
+            "session_id": summary.session_id,
+            "created_at": datetime.utcfromtimestamp(summary.created_at).isoformat(),
+            "questions_asked": summary.questions_asked,
+            "songs_count": len(catalog.songs) if catalog else None,
+            "catalog_version": summary.catalog_version,
+            "memory_bytes": memory_bytes
+        })
+    return {
+        "status": "success",
+        "sessions": sessions,
+        "memory_bytes": total_bytes,
+        "avg_memory_bytes": (total_bytes / len(sessions)) if sessions else 0.0
+    }, 200
+
+
+@app.route("/sessions", methods=["GET"])
+def list_sessions():
+    """List active sessions."""
+    payload, status_code = session_listing()
+    return jsonify(payload), status_code
+
+
+def insights_report():
+    """Question/guess insights payload; returns (payload, status_code)."""
     # Simple insights based on session statistics as placeholder
-    total_sessions = len(session_manager._sessions)
-    total_questions = sum(len(session_obj.asked) for session_obj, _ in session_manager._sessions.values())
-    return jsonify({
+    summaries = session_manager.summaries()
+    total_sessions = len(summaries)
+    total_questions = sum(summary.questions_asked for summary in summaries)
+    return {
         "status": "success",
         "total_sessions": total_sessions,
         "total_questions": total_questions,
         "avg_questions_per_session": (total_questions / total_sessions) if total_sessions > 0 else 0.0,
+        "catalog_cache": catalog_stats(),
+        "admission": admission.stats(),
+        "warm_pool": warm_pool.stats(),
+        "live_updates": live_updates.stats(),
+        "single_flight": single_flight_stats(),
+        "turn_cache": turn_cache.stats(),
+        "speculation": speculator.stats(),
+        "batching": batch_scheduler.stats(),
         "message": "Basic insights endpoint"
-    })
+    }, 200
+
+
+@app.route("/insights", methods=["GET"])
+def insights():
+    """Return basic question/guess insights."""
+    payload, status_code = insights_report()
+    return jsonify(payload), status_code
 
 
 # Error handlers
@@ -444,7 +815,10 @@ if __name__ == "__main__":
     logger.info(f"🌐 Server: http://{FLASK_HOST}:{FLASK_PORT}")
     logger.info(f"🐛 Debug mode: {FLASK_DEBUG}")
     logger.info("🎵 Using your verified enhanced system!")
-    
+
+    # Exit through atexit on SIGTERM so sessions get their final snapshot
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
     app.run(
         host=FLASK_HOST,
         port=FLASK_PORT,
@@ -0,0 +1,361 @@
+"""
+ASGI entry point for the Music Akenator API
+
+Serves the same routes as the Flask app from an asyncio event loop,
+delegating to the same helpers. Games idle between answers cost no
+threads: scoring, session locking and store I/O run in a bounded thread
+pool (numpy releases the GIL for the heavy products) and the loop only
+awaits them.
+
+Usage: uvicorn asgi:app --host 0.0.0.0 --port 5000
+   or: python asgi.py
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import mimetypes
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+from app import (
+    admin_allowed,
+    answer_game,
+    feedback_game,
+    health_report,
+    insights_report,
+    memory_breakdown,
+    profile_listing,
+    profile_record,
+    session_listing,
+    session_manager,
+    shutdown,
+    start_game,
+    system_status,
+    tracemalloc_report,
+    tracemalloc_snapshot,
+    tracemalloc_stop,
+)
+from backend.logic.admission import AdmissionRejected, admission, client_key
+from backend.logic.config import ASGI_WORKER_THREADS, FLASK_HOST, FLASK_PORT, RATE_LIMIT_CLIENT_HEADER
+from backend.logic.json_fragments import dumps
+from backend.logic.live_updates import live_updates
+from backend.logic.metrics import REGISTRY, TURN_OUTCOMES
+from backend.logic.profiling import profiler
+from backend.logic.response_formats import encode, negotiate
+from backend.logic.song_index import find_card_json, find_playback_json
+
+logger = logging.getLogger("asgi")
+
+MAX_BODY_BYTES = 64 * 1024
+
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend")
+# Path -> frontend file, as served by the Flask app
+_STATIC_FILES = {"/": "index.html", "/style.css": "style.css", "/script.js": "script.js"}
+# Path -> helper returning (payload, status_code)
+_JSON_VIEWS = {
+    "/health": health_report,
+    "/status": system_status,
+    "/sessions": session_listing,
+    "/insights": insights_report,
+}
+
+_executor = ThreadPoolExecutor(max_workers=ASGI_WORKER_THREADS, thread_name_prefix="asgi-work")
+
+# Profile of the request being handled, if it is profiled; _offload runs its work under it
+_request_profile = contextvars.ContextVar("request_profile", default=None)
+
+
+def _admitted(client, handler, *args):
+    """Run a game handler under admission control; returns (payload, status, headers)."""
+    try:
+        admission.acquire(client)
+    except AdmissionRejected as e:
+        logger.warning(f"🚦 Shed request ({e.status_code}): {e.reason}")
+        return {"error": e.reason, "status": "error"}, e.status_code, [(b"retry-after", str(e.retry_after).encode())]
+    try:
+        payload, status_code = handler(*args)
+        return payload, status_code, []
+    finally:
+        admission.release()
+
+
+async def _offload(func, *args):
+    profile = _request_profile.get()
+    if profile is not None:
+        # cProfile hooks one thread: profile the worker doing this request's work
+        return await asyncio.get_running_loop().run_in_executor(_executor, profiler.runcall, profile, func, *args)
+    return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+
+
+def _is_admin(scope, headers):
+    """Same rule as the Flask admin_only views."""
+    token = headers.get(b"x-admin-token", b"").decode("latin-1")
+    return admin_allowed(token, (scope.get("client") or (None,))[0])
+
+
+def _admin_view(method, path, args):
+    """Helper for an /admin route as a zero-argument callable, or None if unknown."""
+    if path == "/admin/memory" and method == "GET":
+        return lambda: memory_breakdown(args)
+    if path == "/admin/tracemalloc/snapshots" and method == "POST":
+        return lambda: tracemalloc_snapshot(args)
+    if path == "/admin/tracemalloc/diff" and method == "GET":
+        return lambda: tracemalloc_report(args)
+    if path == "/admin/tracemalloc" and method == "DELETE":
+        return tracemalloc_stop
+    if path == "/admin/profiles" and method == "GET":
+        return profile_listing
+    if path.startswith("/admin/profiles/") and method == "GET":
+        request_id = path[len("/admin/profiles/"):]
+        return lambda: profile_record(request_id)
+    return None
+
+
+async def _read_json(receive):
+    """Request body as JSON, or raise ValueError."""
+    body = bytearray()
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if len(body) > MAX_BODY_BYTES:
+            raise ValueError("Request body too large")
+        if not message.get("more_body"):
+            break
+    return json.loads(body or b"null")
+
+
+async def _send(send, status_code, body, headers=(), content_type="application/json"):
+    if not isinstance(body, (bytes, bytearray)):
+        body = (body if isinstance(body, str) else dumps(body)).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", content_type.encode("latin-1")),
+            (b"content-length", str(len(body)).encode()),
+            (b"access-control-allow-origin", b"*"),
+            *headers,
+        ],
+    })
+    await send({"type": "http.response.body", "body": bytes(body)})
+
+
+def _read_static(name):
+    with open(os.path.join(FRONTEND_DIR, name), "rb") as f:
+        return f.read()
+
+
+async def _stream(send, receive, events):
+    """Send server-sent events until the stream ends or the client goes away."""
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [
+            (b"content-type", b"text/event-stream"),
+            (b"cache-control", b"no-cache"),
+            (b"x-accel-buffering", b"no"),
+            (b"access-control-allow-origin", b"*"),
+        ],
+    })
+
+    async def disconnected():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    watcher = asyncio.ensure_future(disconnected())
+    try:
+        while True:
+            chunk = asyncio.ensure_future(events.__anext__())
+            await asyncio.wait((chunk, watcher), return_when=asyncio.FIRST_COMPLETED)
+            if not chunk.done():
+                # Client went away: unwind the generator before closing it
+                chunk.cancel()
+                await asyncio.gather(chunk, return_exceptions=True)
+                return
+            try:
+                body = chunk.result()
+            except StopAsyncIteration:
+                break
+            await send({"type": "http.response.body", "body": body.encode("utf-8"), "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+    finally:
+        watcher.cancel()
+        await events.aclose()
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            shutdown()
+            _executor.shutdown(wait=False)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    """The ASGI application."""
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    # Opt-in profiling, as in the Flask app: X-Profile header (admins only) or random sampling
+    headers = dict(scope.get("headers", ()))
+    requested = headers.get(b"x-profile", b"").decode("latin-1").lower() in {"1", "true", "yes", "on"}
+    profile = profiler.start(enable=False) if profiler.wanted(requested and _is_admin(scope, headers)) else None
+    if profile is None:
+        await _dispatch(scope, receive, send)
+        return
+
+    request_id = headers.get(b"x-request-id", b"").decode("latin-1") or uuid.uuid4().hex[:16]
+    status_code = 500
+
+    async def profiled_send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            message = {**message, "headers": [
+                *message.get("headers", ()),
+                (b"x-request-id", request_id.encode("latin-1")),
+                (b"x-profile-id", request_id.encode("latin-1")),
+            ]}
+        await send(message)
+
+    started = time.perf_counter()
+    token = _request_profile.set(profile)
+    try:
+        await _dispatch(scope, receive, profiled_send)
+    finally:
+        _request_profile.reset(token)
+        profiler.finish(profile, request_id, scope["path"], status_code, time.perf_counter() - started)
+
+
+async def _dispatch(scope, receive, send):
+    method, path = scope["method"], scope["path"]
+    forwarded = None
+    if RATE_LIMIT_CLIENT_HEADER:
+        forwarded = dict(scope.get("headers", ())).get(RATE_LIMIT_CLIENT_HEADER.lower().encode("latin-1"))
+    client = client_key((scope.get("client") or (None,))[0],
+                        forwarded.decode("latin-1") if forwarded else None)
+
+    if method == "OPTIONS":
+        await _send(send, 204, b"", [
+            (b"access-control-allow-methods", b"GET, POST, DELETE, OPTIONS"),
+            (b"access-control-allow-headers", b"content-type"),
+        ])
+        return
+
+    try:
+        if path == "/start" and method == "GET":
+            args = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+            payload, status_code, headers = await _offload(_admitted, client, start_game, args)
+            await _send(send, status_code, payload, headers)
+
+        elif path in ("/answer", "/feedback") and method == "POST":
+            try:
+                data = await _read_json(receive)
+            except ValueError as e:
+                await _send(send, 400, {"error": str(e), "status": "error"})
+                return
+            if path == "/answer":
+                accept = dict(scope.get("headers", ())).get(b"accept", b"").decode("latin-1")
+                response_format = negotiate(accept, data.get("format") if isinstance(data, dict) else None)
+                payload, status_code, headers = await _offload(
+                    _admitted, client, answer_game, data, response_format
+                )
+                TURN_OUTCOMES.labels(payload.get("type", "error")).inc()
+                body, content_type = encode(payload, response_format)
+                await _send(send, status_code, body, headers, content_type)
+                return
+            else:
+                (payload, status_code), headers = await _offload(feedback_game, data), []
+            await _send(send, status_code, payload, headers)
+
+        elif path.startswith("/sessions/") and path.endswith("/stream") and method == "GET":
+            session_id = path[len("/sessions/"):-len("/stream")]
+            session = await _offload(session_manager.get, session_id)
+            if not session:
+                await _send(send, 404, {"error": "Invalid session", "status": "error"})
+                return
+
+            async def alive():
+                return await _offload(session_manager.is_live, session_id)
+
+            await _stream(send, receive, live_updates.stream_async(session_id, session, alive))
+
+        elif path.startswith("/songs/") and method == "GET":
+            # Full song cards for slim /answer clients, cacheable like the Flask route
+            song_id = path.rsplit("/", 1)[-1]
+            args = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+            catalog_version = args.get("catalog")
+            card = await _offload(find_card_json, int(song_id), catalog_version) if song_id.isdigit() else None
+            if card is None:
+                await _send(send, 404, {"error": "Song not found"})
+            elif catalog_version:
+                # A catalog version pins the card's content
+                etag = f'"{catalog_version}-{song_id}"'.encode("latin-1")
+                headers = [(b"etag", etag), (b"cache-control", b"public, max-age=86400")]
+                if_none_match = dict(scope.get("headers", ())).get(b"if-none-match", b"")
+                if etag in [tag.strip() for tag in if_none_match.split(b",")]:
+                    await _send(send, 304, b"", headers)
+                else:
+                    await _send(send, 200, card, headers)
+            else:
+                await _send(send, 200, card, [(b"cache-control", b"public, max-age=300")])
+
+        elif path.startswith("/play_song/") and method == "GET":
+            song_id = path.rsplit("/", 1)[-1]
+            playback = await _offload(find_playback_json, int(song_id)) if song_id.isdigit() else None
+            if playback is None:
+                await _send(send, 404, {"error": "Song not found"})
+            else:
+                await _send(send, 200, playback)
+
+        elif path == "/metrics" and method == "GET":
+            await _send(send, 200, REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+        elif path in _JSON_VIEWS and method == "GET":
+            payload, status_code = await _offload(_JSON_VIEWS[path])
+            await _send(send, status_code, payload)
+
+        elif path.startswith("/admin/"):
+            view = _admin_view(method, path, dict(parse_qsl(scope.get("query_string", b"").decode("latin-1"))))
+            if view is None:
+                await _send(send, 404, {"error": "Endpoint not found", "status": "error"})
+            elif not _is_admin(scope, dict(scope.get("headers", ()))):
+                await _send(send, 403, {"error": "Forbidden", "status": "error"})
+            else:
+                payload, status_code = await _offload(view)
+                await _send(send, status_code, payload)
+
+        elif path in _STATIC_FILES and method == "GET":
+            name = _STATIC_FILES[path]
+            body = await _offload(_read_static, name)
+            content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            if content_type.startswith("text/") or content_type.endswith("javascript"):
+                content_type += "; charset=utf-8"
+            await _send(send, 200, body, content_type=content_type)
+
+        else:
+            await _send(send, 404, {"error": "Endpoint not found", "status": "error"})
+
+    except Exception as e:
+        logger.error(f"❌ ASGI request error: {e}")
+        await _send(send, 500, {"error": "Internal server error", "status": "error"})
+
+
+if __name__ == "__main__":
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("uvicorn is required to serve the ASGI app: pip install uvicorn")
+    uvicorn.run(app, host=FLASK_HOST, port=FLASK_PORT)
@@ -0,0 +1,174 @@
+"""
+Admission Control
+Bounded in-flight work and per-client rate limits with fast shedding
+"""
+
+import logging
+import math
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .config import (
+    ADMISSION_MAX_IN_FLIGHT,
+    ADMISSION_MAX_QUEUE,
+    ADMISSION_QUEUE_TARGET_MS,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_CLIENT_HEADER,
+    RATE_LIMIT_PER_SECOND,
+)
+
+logger = logging.getLogger(__name__)
+
+# Idle client buckets are pruned once the table grows past this
+_MAX_TRACKED_CLIENTS = 10000
+
+
+def client_key(remote_addr: Optional[str], forwarded: Optional[str] = None) -> str:
+    """Rate-limit key for a request.
+
+    `forwarded` is the value of the configured RATE_LIMIT_CLIENT_HEADER; the
+    trusted proxy appends the address it saw, so the last entry is used.
+    """
+    if RATE_LIMIT_CLIENT_HEADER and forwarded:
+        address = forwarded.rsplit(",", 1)[-1].strip()
+        if address:
+            return address
+    return remote_addr or "unknown"
+
+
+class AdmissionRejected(Exception):
+    """Request shed before doing any work"""
+
+    def __init__(self, status_code: int, retry_after: float, reason: str):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.retry_after = max(1, math.ceil(retry_after))
+        self.reason = reason
+
+
+class _TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, burst: float, now: float):
+        self.tokens = burst
+        self.updated = now
+
+
+class AdmissionController:
+    """Gatekeeper for expensive endpoints.
+
+    A request first spends a token from its client's bucket (429 when
+    empty), then takes one of the in-flight slots. When all slots are busy
+    it may wait in a bounded queue, but never longer than the latency
+    target; a full queue or a missed target sheds it with 503. Both
+    rejections carry a Retry-After hint.
+    """
+
+    def __init__(self, max_in_flight: int = ADMISSION_MAX_IN_FLIGHT,
+                 max_queue: int = ADMISSION_MAX_QUEUE,
+                 queue_target_ms: float = ADMISSION_QUEUE_TARGET_MS,
+                 rate_per_second: float = RATE_LIMIT_PER_SECOND,
+                 burst: int = RATE_LIMIT_BURST):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_target = queue_target_ms / 1000.0
+        self.rate = rate_per_second
+        self.burst = max(1, burst)
+
+        self._buckets: Dict[str, _TokenBucket] = {}
+        self._bucket_lock = threading.Lock()
+        self._slots = threading.Condition()
+        self.in_flight = 0
+        self.queued = 0
+
+        self.admitted = 0
+        self.shed_rate_limited = 0
+        self.shed_queue_full = 0
+        self.shed_queue_timeout = 0
+        self.max_queue_wait_ms = 0.0
+
+    def _take_token(self, client: str) -> float:
+        """Spend one token; returns 0 or the seconds until one is available"""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._bucket_lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                if len(self._buckets) >= _MAX_TRACKED_CLIENTS:
+                    self._prune(now)
+                bucket = self._buckets[client] = _TokenBucket(self.burst, now)
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+            bucket.updated = now
+            if bucket.tokens >= 1.0:
+                bucket.tokens -= 1.0
+                return 0.0
+            self.shed_rate_limited += 1
+            return (1.0 - bucket.tokens) / self.rate
+
+    def _prune(self, now: float) -> None:
+        """Drop buckets that have refilled completely; they carry no state"""
+        refill_seconds = self.burst / self.rate
+        for client in [c for c, b in self._buckets.items() if now - b.updated > refill_seconds]:
+            del self._buckets[client]
+
+    def acquire(self, client: str) -> None:
+        """Admit a request or raise AdmissionRejected"""
+        wait = self._take_token(client)
+        if wait > 0:
+            raise AdmissionRejected(429, wait, "Too many requests")
+
+        if self.max_in_flight <= 0:
+            with self._slots:
+                self.in_flight += 1
+                self.admitted += 1
+            return
+
+        with self._slots:
+            if self.in_flight < self.max_in_flight:
+                self.in_flight += 1
+                self.admitted += 1
+                return
+            if self.queued >= self.max_queue:
+                self.shed_queue_full += 1
+                raise AdmissionRejected(503, self.queue_target, "Server busy, queue full")
+
+            self.queued += 1
+            started = time.monotonic()
+            deadline = started + self.queue_target
+            try:
+                while self.in_flight >= self.max_in_flight:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.shed_queue_timeout += 1
+                        raise AdmissionRejected(503, self.queue_target, "Server busy, try again")
+                    self._slots.wait(remaining)
+            finally:
+                self.queued -= 1
+            self.in_flight += 1
+            self.admitted += 1
+            self.max_queue_wait_ms = max(self.max_queue_wait_ms, (time.monotonic() - started) * 1000.0)
+
+    def release(self) -> None:
+        with self._slots:
+            self.in_flight -= 1
+            self._slots.notify()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._slots:
+            return {
+                "in_flight": self.in_flight,
+                "queue_depth": self.queued,
+                "max_in_flight": self.max_in_flight,
+                "max_queue": self.max_queue,
+                "admitted": self.admitted,
+                "shed_rate_limited": self.shed_rate_limited,
+                "shed_queue_full": self.shed_queue_full,
+                "shed_queue_timeout": self.shed_queue_timeout,
+                "max_queue_wait_ms": round(self.max_queue_wait_ms, 3),
+                "tracked_clients": len(self._buckets),
+            }
+
+
+admission = AdmissionController()
@@ -0,0 +1,97 @@
+"""
+Micro-Batching Scheduler
+Scores concurrent sessions' next questions with one matrix product
+"""
+
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .catalog import CompiledCatalog, TurnDecision
+from .config import BATCH_MAX_SIZE, BATCH_WINDOW_MS
+
+logger = logging.getLogger(__name__)
+
+
+class _Batch:
+    __slots__ = ("turns", "full", "done", "results", "error")
+
+    def __init__(self):
+        self.turns: List[Tuple[Any, int, int]] = []
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.results: Optional[List[TurnDecision]] = None
+        self.error: Optional[BaseException] = None
+
+
+class BatchScheduler:
+    """Collects decide_turn calls per catalog for a short window.
+
+    The first request to arrive leads the batch: it waits up to the window
+    (or until the batch is full), runs CompiledCatalog.decide_turns for
+    everyone, and wakes the followers. No scheduler thread is needed.
+    """
+
+    def __init__(self, window_ms: float = BATCH_WINDOW_MS, max_batch: int = BATCH_MAX_SIZE):
+        self.window_seconds = max(0.0, window_ms) / 1000.0
+        self.max_batch = max(1, max_batch)
+        self._open: Dict[str, _Batch] = {}
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.batched_turns = 0
+        self.largest_batch = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window_seconds > 0
+
+    def decide(self, catalog: CompiledCatalog, beliefs, asked_bits: int, questions_asked: int) -> TurnDecision:
+        if not self.enabled:
+            return catalog.decide_turn(beliefs, asked_bits, questions_asked)
+
+        with self._lock:
+            batch = self._open.get(catalog.version)
+            leader = batch is None
+            if leader:
+                batch = self._open[catalog.version] = _Batch()
+            slot = len(batch.turns)
+            batch.turns.append((beliefs, asked_bits, questions_asked))
+            if len(batch.turns) >= self.max_batch:
+                del self._open[catalog.version]
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window_seconds)
+            with self._lock:
+                if self._open.get(catalog.version) is batch:
+                    del self._open[catalog.version]
+                size = len(batch.turns)
+                self.batches += 1
+                self.batched_turns += size
+                self.largest_batch = max(self.largest_batch, size)
+            try:
+                batch.results = catalog.decide_turns(batch.turns)
+            except BaseException as e:
+                logger.error(f"❌ Batched scoring failed: {e}")
+                batch.error = e
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        return batch.results[slot]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "window_ms": self.window_seconds * 1000.0,
+                "batches": self.batches,
+                "batched_turns": self.batched_turns,
+                "avg_batch_size": (self.batched_turns / self.batches) if self.batches else 0.0,
+                "largest_batch": self.largest_batch,
+            }
+
+
+batch_scheduler = BatchScheduler()
@@ -1,6 +1,10 @@
 import json
 import os
 
+import numpy as np
+
+from backend.logic.config import BELIEF_DTYPE, BELIEF_RENORMALIZE_EVERY
+
 
 ALPHA = 0.9  # default P(answer = yes | attribute is true)
 BETA = 0.1   # default P(answer = yes | attribute is false)
@@ -126,3 +130,119 @@ def update_beliefs(beliefs, songs, feature, value, answer):
         beliefs[song_id] *= likelihood
 
     return normalize(beliefs)
+
+
+# Floor for likelihoods before taking logs, so an alpha of 1.0
+# cannot push a log-belief to -inf.
+_MIN_LIKELIHOOD = 1e-12
+
+
+class BeliefVector:
+    """
+    Array-backed belief distribution for a single game.
+
+    Beliefs are held as unnormalized log-probabilities, one slot per song
+    in catalog order. Bayesian updates become an in-place add of the
+    log-likelihood, and the vector is re-centered every
+    `renormalize_every` updates so float32 storage does not drift.
+    """
+
+    __slots__ = ("log_beliefs", "pending_updates", "renormalize_every")
+
+    def __init__(self, log_beliefs, renormalize_every=None):
+        self.log_beliefs = log_beliefs
+        self.pending_updates = 0
+        self.renormalize_every = (
+            BELIEF_RENORMALIZE_EVERY if renormalize_every is None else renormalize_every
+        )
+
+    @classmethod
+    def uniform(cls, size, dtype=None, renormalize_every=None):
+        """
+        Uniform prior over `size` songs (log-beliefs of zero).
+        """
+        return cls(np.zeros(size, dtype=np.dtype(dtype or BELIEF_DTYPE)), renormalize_every)
+
+    @classmethod
+    def from_probabilities(cls, probabilities, dtype=None, renormalize_every=None):
+        """
+        Build from a probability array (zeros stay impossible).
+        """
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        with np.errstate(divide="ignore"):
+            log_beliefs = np.log(probabilities)
+        return cls(log_beliefs.astype(np.dtype(dtype or BELIEF_DTYPE)), renormalize_every)
+
+    @property
+    def dtype(self):
+        return self.log_beliefs.dtype
+
+    @property
+    def nbytes(self):
+        return self.log_beliefs.nbytes
+
+    def __len__(self):
+        return len(self.log_beliefs)
+
+    def update(self, matches, answer, feature=None):
+        """
+        Bayesian update from a boolean match array, using the same
+        noise model as compute_likelihood.
+        """
+
+        if answer not in ("yes", "no"):
+            return self
+
+        alpha, beta = FEATURE_NOISE.get(feature, (ALPHA, BETA))
+        if answer == "no":
+            alpha, beta = 1.0 - alpha, 1.0 - beta
+
+        log_match = np.log(max(alpha, _MIN_LIKELIHOOD))
+        log_other = np.log(max(beta, _MIN_LIKELIHOOD))
+
+        self.log_beliefs += np.where(matches, log_match, log_other).astype(self.log_beliefs.dtype)
+        self.pending_updates += 1
+
+        if self.pending_updates >= self.renormalize_every:
+            self.normalize()
+
+        return self
+
+    def normalize(self):
+        """
+        Shift log-beliefs so they log-sum-exp to zero.
+        The shift is computed in float64 whatever the storage dtype.
+        """
+
+        values = self.log_beliefs.astype(np.float64)
+        peak = values.max() if len(values) else 0.0
+        if np.isfinite(peak):
+            log_total = peak + np.log(np.exp(values - peak).sum())
+            self.log_beliefs -= self.log_beliefs.dtype.type(log_total)
+        self.pending_updates = 0
+        return self
+
+    def probabilities(self):
+        """
+        Normalized float64 probabilities in catalog order.
+        """
+
+        values = self.log_beliefs.astype(np.float64)
+        if not len(values):
+            return values
+        peak = values.max()
+        if not np.isfinite(peak):
+            return np.full(len(values), 1.0 / len(values))
+        weights = np.exp(values - peak)
+        return weights / weights.sum()
+
+    def to_dict(self, song_ids):
+        """
+        Dict view keyed by song id, for code that expects belief dicts.
+        """
+        return dict(zip(song_ids, self.probabilities().tolist()))
+
+    def copy(self):
+        clone = BeliefVector(self.log_beliefs.copy(), self.renormalize_every)
+        clone.pending_updates = self.pending_updates
+        return clone
@@ -0,0 +1,459 @@
+"""
+Compiled Song Catalog
+Read-only arrays shared by every game session of one dataset size
+"""
+
+import hashlib
+import logging
+import mmap
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .belief import BeliefVector
+from .config import CATALOG_CACHE_SIZE, MAX_QUESTIONS
+from .questions import (
+    FEATURE_WEIGHTS,
+    build_match_matrix,
+    generate_all_questions,
+    question_noise,
+    question_text_variants,
+)
+from .single_flight import SingleFlight
+from .song_index import SongIndex
+
+logger = logging.getLogger(__name__)
+
+# Compact answer codes stored in session answer logs.
+ANSWER_CODES = {"yes": 0, "no": 1, "unsure": 2}
+ANSWER_NAMES = ("yes", "no", "unsure")
+
+
+def normalize_answer(answer: Any) -> str:
+    """Map free-form answers from clients onto yes / no / unsure"""
+    text = str(answer).strip().lower()
+    if text in ('yes', 'y', 'true'):
+        return 'yes'
+    if text in ('unsure', 'maybe', 'idk', "don't know", 'not sure', 'skip'):
+        return 'unsure'
+    return 'no'
+
+
+def confidence_label(confidence: float) -> str:
+    """Human label for a confidence relative to the leader"""
+    if confidence >= 0.8:
+        return "High confidence"
+    elif confidence >= 0.5:
+        return "Medium confidence"
+    else:
+        return "Low confidence"
+
+
+class TurnDecision(NamedTuple):
+    """What to do after the answers so far, plus a compact posterior summary"""
+    should_guess: bool
+    question_index: Optional[int]
+    top_candidates: Tuple[Tuple[int, float], ...]  # (song_index, probability), best first
+    entropy: float  # posterior entropy in bits
+
+
+def _to_shared(array: np.ndarray) -> np.ndarray:
+    """Read-only copy of an array in an anonymous shared mapping.
+
+    Pages of a MAP_SHARED mapping stay shared after fork() even when the
+    ndarray header around them is touched by refcounting or GC.
+    """
+    buffer = mmap.mmap(-1, max(array.nbytes, 1))
+    shared = np.frombuffer(buffer, dtype=array.dtype, count=array.size).reshape(array.shape)
+    shared[...] = array
+    shared.flags.writeable = False
+    return shared
+
+
+def _binary_entropy(p: np.ndarray) -> np.ndarray:
+    """Entropy in bits of a yes/no variable with P(yes) = p"""
+    p = np.clip(p, 1e-12, 1.0 - 1e-12)
+    return -(p * np.log2(p) + (1.0 - p) * np.log2(1.0 - p))
+
+
+def _object_bytes(obj, seen: set) -> int:
+    """Recursive sys.getsizeof over containers and plain objects, counting each object once"""
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_object_bytes(k, seen) + _object_bytes(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_object_bytes(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+        size += _object_bytes(vars(obj), seen)
+    return size
+
+
+class CompiledCatalog:
+    """Songs, question pool and match matrix compiled from one dataset.
+
+    No engine is built: songs come straight from the dataset loader and
+    everything a game needs is compiled here.
+    """
+
+    def __init__(self, songs: List[Dict[str, Any]], target_dataset_size: int,
+                 system_status: Optional[Dict[str, Any]] = None):
+        started = time.perf_counter()
+        self.load_seconds = 0.0
+        self.system_status: Dict[str, Any] = system_status or {}
+        self.target_dataset_size = target_dataset_size
+        self.songs: List[Dict[str, Any]] = songs
+        self.song_ids = [song['id'] for song in self.songs]
+        self.index_of = {song_id: i for i, song_id in enumerate(self.song_ids)}
+        self.song_index = SongIndex(self.songs)
+
+        # Question pool: every generated question that actually splits the catalog
+        candidates = generate_all_questions(self.songs)
+        matrix = build_match_matrix(self.songs, candidates)
+        counts = matrix.sum(axis=1)
+        keep = (counts > 0) & (counts < len(self.songs))
+
+        self.questions: List[Dict[str, Any]] = [q for q, k in zip(candidates, keep) if k]
+        self.question_index = {
+            (q['feature'], q['value']): i for i, q in enumerate(self.questions)
+        }
+        self.match_matrix = matrix[keep]
+        self.match_weights = self.match_matrix.astype(np.float64)
+        self.alphas, self.betas = question_noise(self.questions)
+        self.feature_weights = np.array(
+            [FEATURE_WEIGHTS.get(q['feature'], 0.5) for q in self.questions]
+        )
+        # Expected answer noise per question, H(answer | song) for matches / non-matches
+        self._noise_match = _binary_entropy(self.alphas)
+        self._noise_other = _binary_entropy(self.betas)
+
+        self.version = self._fingerprint()
+
+        # Filled-in text templates per question, built on first use
+        self._question_texts: Dict[int, Tuple[str, ...]] = {}
+        self._object_bytes: Optional[int] = None
+
+        # With a uniform prior every new game opens with the same question
+        self.first_question: Optional[int] = self.select_question(self.new_beliefs())
+        self.compile_seconds = time.perf_counter() - started
+        logger.info(
+            f"📚 Compiled catalog {self.version}: {len(self.songs)} songs, "
+            f"{len(self.questions)} questions"
+        )
+
+    def _fingerprint(self) -> str:
+        """Stable handle for this catalog's songs and question pool"""
+        digest = hashlib.sha1()
+        for song in self.songs:
+            digest.update(f"{song['id']}|{song.get('title', '')}\n".encode('utf-8'))
+        for feature, value in self.question_index:
+            digest.update(f"{feature}={value}\n".encode('utf-8'))
+        return f"{self.target_dataset_size}-{digest.hexdigest()[:12]}"
+
+    @property
+    def mask_bytes(self) -> int:
+        """Bytes needed for an asked-question bitmask over the pool"""
+        return (len(self.questions) + 7) // 8
+
+    def asked_mask(self, asked_bits: int) -> np.ndarray:
+        """Unpack an asked-question bitmask into a boolean array"""
+        packed = np.frombuffer(asked_bits.to_bytes(self.mask_bytes, 'little'), dtype=np.uint8)
+        return np.unpackbits(packed, bitorder='little')[:len(self.questions)].astype(bool)
+
+    def new_beliefs(self) -> BeliefVector:
+        """Uniform prior over the catalog"""
+        return BeliefVector.uniform(len(self.songs))
+
+    def update_beliefs(self, beliefs: BeliefVector, question_index: int, answer: str) -> BeliefVector:
+        """Apply one answer to a session's belief vector in place"""
+        feature = self.questions[question_index]['feature']
+        return beliefs.update(self.match_matrix[question_index], answer, feature=feature)
+
+    def replay_beliefs(self, question_log, answer_log) -> BeliefVector:
+        """Posterior for an answer log in one fused update.
+
+        Sums every answer's log-likelihood row with a single
+        (answers x songs) product instead of one update per answer.
+        """
+        answered = len(answer_log)
+        beliefs = self.new_beliefs()
+        if not answered:
+            return beliefs
+
+        rows = np.asarray(question_log[:answered], dtype=np.intp)
+        codes = np.frombuffer(bytes(answer_log), dtype=np.uint8)
+        alphas, betas = self.alphas[rows], self.betas[rows]
+        # yes: (alpha, beta); no: (1 - alpha, 1 - beta); unsure: no evidence
+        is_yes = codes == ANSWER_CODES['yes']
+        is_no = codes == ANSWER_CODES['no']
+        match_likelihood = np.where(is_yes, alphas, np.where(is_no, 1.0 - alphas, 1.0))
+        other_likelihood = np.where(is_yes, betas, np.where(is_no, 1.0 - betas, 1.0))
+        log_match = np.log(np.maximum(match_likelihood, 1e-12))
+        log_other = np.log(np.maximum(other_likelihood, 1e-12))
+
+        log_beliefs = (log_match - log_other) @ self.match_weights[rows] + log_other.sum()
+        beliefs.log_beliefs[:] = log_beliefs
+        return beliefs.normalize()
+
+    def score_questions(self, probabilities: np.ndarray, yes_mass: Optional[np.ndarray] = None) -> np.ndarray:
+        """Expected information gain of every pool question, weighted by feature"""
+        if yes_mass is None:
+            yes_mass = self.match_weights @ probabilities
+        p_yes = self.betas + (self.alphas - self.betas) * yes_mass
+        info_gain = _binary_entropy(p_yes) - (
+            yes_mass * self._noise_match + (1.0 - yes_mass) * self._noise_other
+        )
+        return np.maximum(info_gain, 0.0) * self.feature_weights
+
+    def select_question(self, beliefs: BeliefVector, asked_bits: int = 0,
+                        yes_mass: Optional[np.ndarray] = None,
+                        probabilities: Optional[np.ndarray] = None) -> Optional[int]:
+        """Index of the most informative unasked question, or None"""
+        if not self.questions:
+            return None
+
+        if probabilities is None:
+            probabilities = beliefs.probabilities()
+        scores = self.score_questions(probabilities, yes_mass)
+        if asked_bits:
+            scores[self.asked_mask(asked_bits)] = -1.0
+
+        best = int(np.argmax(scores))
+        if scores[best] <= 1e-9:
+            return None
+        return best
+
+    def question_texts(self, question_index: int) -> Tuple[str, ...]:
+        """Text variants for a question, filled in once per catalog"""
+        texts = self._question_texts.get(question_index)
+        if texts is None:
+            question = self.questions[question_index]
+            texts = tuple(question_text_variants(question['feature'], question['value']))
+            self._question_texts[question_index] = texts
+        return texts
+
+    def question_payload(self, question_index: int) -> Dict[str, Any]:
+        """Client-facing question dict with a freshly picked text variant"""
+        question = self.questions[question_index]
+        return {
+            'feature': question['feature'],
+            'value': question['value'],
+            'text': random.choice(self.question_texts(question_index))
+        }
+
+    def should_make_guess(self, beliefs: BeliefVector, questions_asked: int,
+                          probabilities: Optional[np.ndarray] = None) -> Tuple[bool, Optional[int]]:
+        """Same thresholds as SimpleEnhancedAkenator.should_make_guess"""
+        if questions_asked < 3 or len(self.songs) < 2:
+            return False, None
+
+        if probabilities is None:
+            probabilities = beliefs.probabilities()
+        top_two = np.argpartition(-probabilities, 1)[:2]
+        first, second = sorted(top_two, key=lambda i: -probabilities[i])
+        top_confidence = probabilities[first]
+        second_confidence = probabilities[second]
+
+        if top_confidence >= 0.8 and top_confidence >= 2.0 * second_confidence:
+            return True, int(first)
+        return False, None
+
+    def get_confidence(self, beliefs: BeliefVector, song_index: int,
+                       probabilities: Optional[np.ndarray] = None) -> Tuple[float, str]:
+        """Confidence relative to the current leader"""
+        if probabilities is None:
+            probabilities = beliefs.probabilities()
+        max_belief = probabilities.max() if len(probabilities) else 0.0
+        confidence = float(probabilities[song_index] / max_belief) if max_belief > 0 else 0.0
+        return confidence, confidence_label(confidence)
+
+    def get_top_candidates(self, beliefs: BeliefVector, top_k: int = 5,
+                           probabilities: Optional[np.ndarray] = None) -> List[Tuple[int, float, str]]:
+        """Top (song_index, probability, explanation) triples"""
+        if probabilities is None:
+            probabilities = beliefs.probabilities()
+        top_k = min(top_k, len(probabilities))
+        if top_k <= 0:
+            return []
+
+        top = np.argpartition(-probabilities, top_k - 1)[:top_k]
+        top = top[np.argsort(-probabilities[top], kind='stable')]
+
+        candidates = []
+        for song_index in top:
+            _, explanation = self.get_confidence(beliefs, song_index, probabilities)
+            candidates.append((int(song_index), float(probabilities[song_index]), explanation))
+        return candidates
+
+    def decide_turn(self, beliefs: BeliefVector, asked_bits: int, questions_asked: int,
+                    probabilities: Optional[np.ndarray] = None,
+                    yes_mass: Optional[np.ndarray] = None) -> TurnDecision:
+        """Guess or next question for a session whose questions are all answered"""
+        if probabilities is None:
+            probabilities = beliefs.probabilities()
+        should_guess, _ = self.should_make_guess(beliefs, questions_asked, probabilities)
+        should_guess = should_guess or questions_asked >= MAX_QUESTIONS
+
+        question_index = None
+        if not should_guess:
+            question_index = self.select_question(
+                beliefs, asked_bits, yes_mass=yes_mass, probabilities=probabilities
+            )
+
+        top = self.get_top_candidates(beliefs, 3, probabilities)
+        nonzero = probabilities[probabilities > 0]
+        entropy_bits = float(-(nonzero * np.log2(nonzero)).sum())
+        return TurnDecision(
+            should_guess,
+            question_index,
+            tuple((song_index, prob) for song_index, prob, _ in top),
+            entropy_bits,
+        )
+
+    def decide_turns(self, turns: List[Tuple[BeliefVector, int, int]]) -> List[TurnDecision]:
+        """decide_turn for many sessions at once.
+
+        Yes-masses for every session come from one (questions x songs) by
+        (songs x sessions) product instead of one matrix-vector product each.
+        """
+        if not turns:
+            return []
+        probabilities = np.stack([beliefs.probabilities() for beliefs, _, _ in turns], axis=1)
+        yes_masses = self.match_weights @ probabilities
+        return [
+            self.decide_turn(
+                beliefs, asked_bits, questions_asked,
+                probabilities=probabilities[:, i], yes_mass=yes_masses[:, i],
+            )
+            for i, (beliefs, asked_bits, questions_asked) in enumerate(turns)
+        ]
+
+    def share_memory(self) -> None:
+        """Move the large read-only arrays into fork-shared mappings"""
+        self.match_matrix = _to_shared(self.match_matrix)
+        self.match_weights = _to_shared(self.match_weights)
+
+    def array_bytes(self) -> int:
+        """Bytes held by the compiled numpy arrays"""
+        return int(
+            self.match_matrix.nbytes + self.match_weights.nbytes + self.alphas.nbytes
+            + self.betas.nbytes + self.feature_weights.nbytes
+            + self._noise_match.nbytes + self._noise_other.nbytes
+        )
+
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by this catalog: arrays, songs, questions and song index"""
+        if self._object_bytes is None:
+            # Songs and questions never change after compile, so measure them once
+            seen = set()
+            self._object_bytes = sum(
+                _object_bytes(part, seen)
+                for part in (self.songs, self.song_ids, self.index_of, self.song_index,
+                             self.questions, self.question_index)
+            )
+        return self.array_bytes() + self._object_bytes
+
+
+# Bounded LRU of compiled catalogs keyed by dataset size
+_catalogs: "OrderedDict[int, CompiledCatalog]" = OrderedDict()
+_catalogs_lock = threading.Lock()
+_catalog_counters = {"hits": 0, "misses": 0, "evictions": 0}
+_catalog_builds = SingleFlight("catalog_build")
+
+
+def get_catalog(target_dataset_size: int = 100) -> CompiledCatalog:
+    """Shared compiled catalog for a dataset size, built on first use"""
+    with _catalogs_lock:
+        catalog = _catalogs.get(target_dataset_size)
+        if catalog is not None:
+            _catalogs.move_to_end(target_dataset_size)
+            _catalog_counters["hits"] += 1
+            return catalog
+
+    # Concurrent requests for one size share a build; other sizes build in parallel
+    return _catalog_builds.do(target_dataset_size, lambda: _build_catalog(target_dataset_size))
+
+
+def _build_catalog(target_dataset_size: int) -> CompiledCatalog:
+    with _catalogs_lock:
+        catalog = _catalogs.get(target_dataset_size)
+        if catalog is not None:
+            return catalog
+        _catalog_counters["misses"] += 1
+
+    from .simple_enhanced import SimpleEnhancedAkenator
+    started = time.perf_counter()
+    songs = SimpleEnhancedAkenator.load_songs(target_dataset_size)
+    load_seconds = time.perf_counter() - started
+    catalog = CompiledCatalog(songs, target_dataset_size,
+                              SimpleEnhancedAkenator.system_status(songs, target_dataset_size))
+    catalog.load_seconds = load_seconds
+
+    with _catalogs_lock:
+        _catalogs[target_dataset_size] = catalog
+        while len(_catalogs) > max(1, CATALOG_CACHE_SIZE):
+            _, evicted = _catalogs.popitem(last=False)
+            _catalog_counters["evictions"] += 1
+            logger.info(f"♻️ Evicted catalog {evicted.version} from the catalog cache")
+    return catalog
+
+
+def cached_catalogs() -> List[CompiledCatalog]:
+    """Live catalogs, least recently used first"""
+    with _catalogs_lock:
+        return list(_catalogs.values())
+
+
+def catalog_stats() -> Dict[str, Any]:
+    """Hit/miss counters and per-catalog build time and memory"""
+    with _catalogs_lock:
+        lookups = _catalog_counters["hits"] + _catalog_counters["misses"]
+        return {
+            **_catalog_counters,
+            "capacity": CATALOG_CACHE_SIZE,
+            "hit_rate": (_catalog_counters["hits"] / lookups) if lookups else 0.0,
+            "catalogs": [
+                {
+                    "size": size,
+                    "version": catalog.version,
+                    "songs": len(catalog.songs),
+                    "questions": len(catalog.questions),
+                    "memory_bytes": catalog.memory_bytes(),
+                    "array_bytes": catalog.array_bytes(),
+                    "load_seconds": round(catalog.load_seconds, 4),
+                    "compile_seconds": round(catalog.compile_seconds, 4),
+                }
+                for size, catalog in _catalogs.items()
+            ],
+        }
+
+
+def find_catalog(version: str) -> Optional[CompiledCatalog]:
+    """Look up a live catalog by its version handle"""
+    for catalog in cached_catalogs():
+        if catalog.version == version:
+            return catalog
+    return None
+
+
+def catalog_for_version(version: str) -> Optional[CompiledCatalog]:
+    """Live or rebuilt catalog matching a version handle, or None.
+
+    Versions start with the dataset size, so a catalog evicted or never
+    built in this process can be rebuilt; the fingerprint must still match.
+    """
+    catalog = find_catalog(version)
+    if catalog is not None:
+        return catalog
+    size, _, _ = version.partition('-')
+    if not size.isdigit():
+        return None
+    catalog = get_catalog(int(size))
+    return catalog if catalog.version == version else None
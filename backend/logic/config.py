@@ -38,6 +38,103 @@ MIN_CONFIDENCE_MARGIN: float = float(
 SESSION_TTL_SECONDS: int = int(
     os.getenv("SONG_GENIE_SESSION_TTL_SECONDS", "1800")  # 30 minutes
 )
+# How often the background reaper evicts idle sessions.
+SESSION_REAP_INTERVAL_SECONDS: float = float(
+    os.getenv("SONG_GENIE_SESSION_REAP_INTERVAL_SECONDS", "30")
+)
+# Number of lock stripes the session table is sharded over.
+SESSION_LOCK_STRIPES: int = int(os.getenv("SONG_GENIE_SESSION_LOCK_STRIPES", "16"))
+# Session storage backend: "memory" (single process) or "sqlite"
+# (shared by worker processes on one host).
+SESSION_BACKEND: str = os.getenv("SONG_GENIE_SESSION_BACKEND", "memory").strip().lower()
+SESSION_DB_PATH: str = os.getenv(
+    "SONG_GENIE_SESSION_DB_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "data", "sessions.db"),
+)
+# Opt-in: in-memory sessions are snapshotted to this file periodically and
+# on shutdown, and restored lazily on startup ("" disables).
+SESSION_SNAPSHOT_PATH: str = os.getenv("SONG_GENIE_SESSION_SNAPSHOT_PATH", "")
+SESSION_SNAPSHOT_INTERVAL_SECONDS: float = float(
+    os.getenv("SONG_GENIE_SESSION_SNAPSHOT_INTERVAL_SECONDS", "60")
+)
+# SQLite writes: 0 commits before the request returns, batching concurrent
+# writers into one transaction; > 0 switches to write-behind, flushing
+# this often or once SESSION_FLUSH_BATCH_SIZE sessions are dirty.
+SESSION_FLUSH_INTERVAL_SECONDS: float = float(
+    os.getenv("SONG_GENIE_SESSION_FLUSH_INTERVAL_SECONDS", "0")
+)
+SESSION_FLUSH_BATCH_SIZE: int = int(os.getenv("SONG_GENIE_SESSION_FLUSH_BATCH_SIZE", "64"))
+
+# Compiled catalogs kept per dataset size, least recently used evicted.
+CATALOG_CACHE_SIZE: int = int(os.getenv("SONG_GENIE_CATALOG_CACHE_SIZE", "8"))
+
+# How often the background task rebuilds the /status snapshot.
+STATUS_REFRESH_SECONDS: float = float(os.getenv("SONG_GENIE_STATUS_REFRESH_SECONDS", "5"))
+
+# Turn decisions shared across sessions with the same answers (0 disables).
+TURN_CACHE_SIZE: int = int(os.getenv("SONG_GENIE_TURN_CACHE_SIZE", "50000"))
+
+# Speculative mode: precompute the next turn for every answer while the player thinks.
+SPECULATIVE_ANSWERS: bool = _get_bool("SONG_GENIE_SPECULATIVE_ANSWERS", "false")
+SPECULATIVE_WORKERS: int = int(os.getenv("SONG_GENIE_SPECULATIVE_WORKERS", "1"))
+SPECULATIVE_MAX_PENDING: int = int(os.getenv("SONG_GENIE_SPECULATIVE_MAX_PENDING", "64"))
+
+# Micro-batching: turns arriving within this window are scored together (0 disables).
+BATCH_WINDOW_MS: float = float(os.getenv("SONG_GENIE_BATCH_WINDOW_MS", "0"))
+BATCH_MAX_SIZE: int = int(os.getenv("SONG_GENIE_BATCH_MAX_SIZE", "64"))
+
+# Admission control for /start and /answer: bounded in-flight work, a bounded
+# wait queue with a latency target, and per-client token buckets (0 disables;
+# both are off by default).
+ADMISSION_MAX_IN_FLIGHT: int = int(os.getenv("SONG_GENIE_ADMISSION_MAX_IN_FLIGHT", "0"))
+ADMISSION_MAX_QUEUE: int = int(os.getenv("SONG_GENIE_ADMISSION_MAX_QUEUE", "64"))
+ADMISSION_QUEUE_TARGET_MS: float = float(os.getenv("SONG_GENIE_ADMISSION_QUEUE_TARGET_MS", "250"))
+RATE_LIMIT_PER_SECOND: float = float(os.getenv("SONG_GENIE_RATE_LIMIT_PER_SECOND", "0"))
+RATE_LIMIT_BURST: int = int(os.getenv("SONG_GENIE_RATE_LIMIT_BURST", "60"))
+# Header a trusted reverse proxy sets to the client address (e.g. X-Forwarded-For).
+# Rate-limit buckets are keyed on it when set; otherwise on the peer address,
+# which behind a proxy is the proxy itself. Only set it when every request
+# passes through a proxy that overwrites the header.
+RATE_LIMIT_CLIENT_HEADER: str = os.getenv("SONG_GENIE_RATE_LIMIT_CLIENT_HEADER", "")
+
+# Warm pool of ready sessions per dataset size; the target depth follows the
+# observed /start rate between WARM_POOL_MIN and WARM_POOL_MAX (0 disables,
+# the default).
+WARM_POOL_MAX: int = int(os.getenv("SONG_GENIE_WARM_POOL_MAX", "0"))
+WARM_POOL_MIN: int = int(os.getenv("SONG_GENIE_WARM_POOL_MIN", "2"))
+WARM_POOL_REFILL_SECONDS: float = float(os.getenv("SONG_GENIE_WARM_POOL_REFILL_SECONDS", "1.0"))
+# Dataset sizes with a pool at once (never more than CATALOG_CACHE_SIZE).
+WARM_POOL_MAX_SIZES: int = int(os.getenv("SONG_GENIE_WARM_POOL_MAX_SIZES", "4"))
+
+# ASGI entry point: threads that run blocking game logic off the event loop.
+ASGI_WORKER_THREADS: int = int(os.getenv("SONG_GENIE_ASGI_WORKER_THREADS", "8"))
+
+# Live leaderboard stream (SSE): candidates per update and keep-alive interval.
+LIVE_TOP_K: int = int(os.getenv("SONG_GENIE_LIVE_TOP_K", "5"))
+LIVE_HEARTBEAT_SECONDS: float = float(os.getenv("SONG_GENIE_LIVE_HEARTBEAT_SECONDS", "15"))
+
+# Admin endpoints (/admin/*) and the X-Profile header require this token in
+# X-Admin-Token; when it is unset they are only served to loopback clients.
+ADMIN_TOKEN: str = os.getenv("SONG_GENIE_ADMIN_TOKEN", "")
+
+# Request profiling: fraction of requests sampled, ring buffer size, stacks kept.
+PROFILE_SAMPLE_RATE: float = float(os.getenv("SONG_GENIE_PROFILE_SAMPLE_RATE", "0"))
+PROFILE_BUFFER_SIZE: int = int(os.getenv("SONG_GENIE_PROFILE_BUFFER_SIZE", "50"))
+PROFILE_TOP_N: int = int(os.getenv("SONG_GENIE_PROFILE_TOP_N", "25"))
+
+# Stateless mode: games travel as signed client-held tokens instead of
+# server sessions. Every worker must share the secret; when it is unset a
+# random one is generated per process, so tokens only verify in the process
+# that issued them (a warning is logged). Tokens carry their issue time and
+# are rejected once older than STATE_TOKEN_TTL_SECONDS.
+STATELESS_SESSIONS: bool = _get_bool("SONG_GENIE_STATELESS_SESSIONS", "false")
+STATE_TOKEN_SECRET_CONFIGURED: bool = bool(os.getenv("SONG_GENIE_STATE_TOKEN_SECRET", ""))
+STATE_TOKEN_SECRET: bytes = (
+    os.getenv("SONG_GENIE_STATE_TOKEN_SECRET", "").encode("utf-8") or os.urandom(32)
+)
+STATE_TOKEN_TTL_SECONDS: int = int(
+    os.getenv("SONG_GENIE_STATE_TOKEN_TTL_SECONDS", str(SESSION_TTL_SECONDS))
+)
 
 
 # Flask server configuration
@@ -45,6 +142,11 @@ FLASK_HOST: str = os.getenv("SONG_GENIE_FLASK_HOST", "127.0.0.1")
 FLASK_PORT: int = int(os.getenv("SONG_GENIE_FLASK_PORT", "5000"))
 FLASK_DEBUG: bool = _get_bool("SONG_GENIE_FLASK_DEBUG", "true")
 
+# Pre-fork server (serve_prefork.py) configuration
+PREFORK_WORKERS: int = int(os.getenv("SONG_GENIE_PREFORK_WORKERS", str(os.cpu_count() or 2)))
+# Dataset sizes whose catalogs the master builds before forking, e.g. "50,100,200".
+PREFORK_PRELOAD_SIZES: str = os.getenv("SONG_GENIE_PREFORK_PRELOAD_SIZES", "100")
+
 
 # External request configuration (e.g. Wikidata)
 REQUEST_TIMEOUT_SECONDS: float = float(
@@ -60,4 +162,18 @@ WIKIDATA_SPARQL_URL: str = "https://query.wikidata.org/sparql"
 # Set to 0 to prevent bias from historical data
 BANDIT_LAMBDA: float = float(os.getenv("SONG_GENIE_BANDIT_LAMBDA", "0.0"))
 # Cache analytics (disk) reads for this many seconds.
-ANALYTICS_CACHE_SECONDS: int = int(os.getenv("SONG_GENIE_ANALYTICS_CACHE_SECONDS", "5"))
\ No newline at end of file
+ANALYTICS_CACHE_SECONDS: int = int(os.getenv("SONG_GENIE_ANALYTICS_CACHE_SECONDS", "5"))
+
+
+# Belief storage configuration
+# Per-session posteriors are kept as log-beliefs in this numpy dtype.
+# float32 halves memory; float64 is kept for tests and debugging.
+BELIEF_DTYPE: str = os.getenv("SONG_GENIE_BELIEF_DTYPE", "float32")
+# Re-center log-beliefs after this many updates to keep float32 precise.
+BELIEF_RENORMALIZE_EVERY: int = int(os.getenv("SONG_GENIE_BELIEF_RENORMALIZE_EVERY", "4"))
+
+
+# Dataset configuration
+# Seed for synthetic songs added when a size exceeds the real dataset,
+# so every process builds the same catalog for a given size.
+DATASET_SEED: int = int(os.getenv("SONG_GENIE_DATASET_SEED", "1337"))
@@ -0,0 +1,31 @@
+"""
+JSON Fragments
+Splices pre-serialized JSON into responses without re-encoding it
+"""
+
+import json
+from typing import Any
+
+_COMPACT = (",", ":")
+
+
+class RawJSON(str):
+    """A string that already holds serialized JSON"""
+    __slots__ = ()
+
+
+def to_raw_json(value: Any) -> RawJSON:
+    return RawJSON(json.dumps(value, separators=_COMPACT))
+
+
+def dumps(value: Any) -> str:
+    """json.dumps that copies RawJSON fragments through verbatim"""
+    if isinstance(value, RawJSON):
+        return value
+    if isinstance(value, dict):
+        return "{" + ",".join(
+            f"{json.dumps(str(key))}:{dumps(item)}" for key, item in value.items()
+        ) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(dumps(item) for item in value) + "]"
+    return json.dumps(value, separators=_COMPACT)
@@ -0,0 +1,207 @@
+"""
+Live Updates
+Per-session server-sent events with delta-encoded top candidates
+"""
+
+import asyncio
+import json
+import logging
+import math
+import queue
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from .config import LIVE_HEARTBEAT_SECONDS, LIVE_TOP_K, MAX_QUESTIONS
+
+logger = logging.getLogger(__name__)
+
+# Updates a slow subscriber may fall behind by before old ones are dropped
+_QUEUE_LIMIT = 32
+
+
+def summarize(session, top_k: int = LIVE_TOP_K, final: bool = False) -> Dict[str, Any]:
+    """Top candidates and progress for a session, computed once per answer"""
+    catalog = session.catalog
+    probabilities = session.beliefs.probabilities()
+    nonzero = probabilities[probabilities > 0]
+    entropy_bits = float(-(nonzero * np.log2(nonzero)).sum())
+    max_entropy = math.log2(len(probabilities)) if len(probabilities) > 1 else 1.0
+    return {
+        "questions_asked": session.questions_asked,
+        "progress": min(1.0, session.questions_asked / MAX_QUESTIONS),
+        "entropy": round(entropy_bits, 4),
+        "certainty": round(1.0 - entropy_bits / max_entropy, 4),
+        "final": final,
+        "top": [
+            (catalog.song_ids[song_index], round(prob, 4), catalog.songs[song_index].get("title", ""))
+            for song_index, prob, _ in catalog.get_top_candidates(session.beliefs, top_k, probabilities)
+        ],
+    }
+
+
+def delta_event(previous: Dict[Any, float], summary: Dict[str, Any], seq: int) -> Dict[str, Any]:
+    """Encode a summary against what this subscriber last saw; updates `previous`"""
+    current = {song_id: prob for song_id, prob, _ in summary["top"]}
+    event = {
+        "seq": seq,
+        "questions_asked": summary["questions_asked"],
+        "progress": summary["progress"],
+        "entropy": summary["entropy"],
+        "certainty": summary["certainty"],
+        "order": list(current),
+        "set": {str(song_id): prob for song_id, prob in current.items() if previous.get(song_id) != prob},
+        "drop": [song_id for song_id in previous if song_id not in current],
+        "names": {str(song_id): title for song_id, _, title in summary["top"] if song_id not in previous},
+    }
+    previous.clear()
+    previous.update(current)
+    return event
+
+
+def _event_text(previous: Dict[Any, float], summary: Dict[str, Any], seq: int) -> str:
+    event = delta_event(previous, summary, seq)
+    kind = "final" if summary["final"] else "update"
+    return f"id: {seq}\nevent: {kind}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+
+class _AsyncSubscriber(queue.Queue):
+    """Subscriber queue that wakes an event loop when publish() fills it"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        super().__init__(maxsize=_QUEUE_LIMIT)
+        self._loop = loop
+        self.ready = asyncio.Event()
+
+    def _put(self, item) -> None:
+        super()._put(item)
+        self._loop.call_soon_threadsafe(self.ready.set)
+
+    async def next(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Next summary, or None once timeout passes without one"""
+        deadline = time.monotonic() + timeout
+        while True:
+            self.ready.clear()
+            try:
+                return self.get_nowait()
+            except queue.Empty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(self.ready.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+
+
+class LiveUpdateHub:
+    """Fan-out of session summaries to SSE subscribers in this process.
+
+    Each answer is summarized once; every subscriber's stream delta-encodes
+    it against what that subscriber has already been sent.
+    """
+
+    def __init__(self, top_k: int = LIVE_TOP_K, heartbeat_seconds: float = LIVE_HEARTBEAT_SECONDS):
+        self.top_k = top_k
+        self.heartbeat_seconds = heartbeat_seconds
+        self._subscribers: Dict[str, List[queue.Queue]] = {}
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def has_subscribers(self, session_id: str) -> bool:
+        return session_id in self._subscribers
+
+    def subscribe(self, session_id: str, subscriber: Optional[queue.Queue] = None) -> queue.Queue:
+        if subscriber is None:
+            subscriber = queue.Queue(maxsize=_QUEUE_LIMIT)
+        with self._lock:
+            self._subscribers.setdefault(session_id, []).append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, session_id: str, subscriber: queue.Queue) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(session_id, [])
+            if subscriber in subscribers:
+                subscribers.remove(subscriber)
+            if not subscribers:
+                self._subscribers.pop(session_id, None)
+
+    def publish(self, session_id: str, session, final: bool = False) -> None:
+        """Push the session's new state to its subscribers, if any"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(session_id, ()))
+        if not subscribers:
+            return
+        summary = summarize(session, self.top_k, final)
+        self.published += 1
+        for subscriber in subscribers:
+            # Deltas are per subscriber, so dropping a stale summary loses nothing
+            while True:
+                try:
+                    subscriber.put_nowait(summary)
+                    break
+                except queue.Full:
+                    try:
+                        subscriber.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def stream(self, session_id: str, session, alive: Callable[[], bool]) -> Iterator[str]:
+        """SSE text for one subscriber: a full snapshot, then deltas until the guess"""
+        subscriber = self.subscribe(session_id)
+        previous: Dict[Any, float] = {}
+        seq = 0
+        try:
+            summary: Optional[Dict[str, Any]] = summarize(session, self.top_k)
+            while True:
+                if summary is None:
+                    if not alive():
+                        return
+                    yield ": keep-alive\n\n"
+                else:
+                    seq += 1
+                    yield _event_text(previous, summary, seq)
+                    if summary["final"]:
+                        return
+                try:
+                    summary = subscriber.get(timeout=self.heartbeat_seconds)
+                except queue.Empty:
+                    summary = None
+        finally:
+            self.unsubscribe(session_id, subscriber)
+
+    async def stream_async(self, session_id: str, session,
+                           alive: Callable[[], Awaitable[bool]]) -> AsyncIterator[str]:
+        """stream() for an event loop: waiting for updates holds no thread"""
+        subscriber = self.subscribe(session_id, _AsyncSubscriber(asyncio.get_running_loop()))
+        previous: Dict[Any, float] = {}
+        seq = 0
+        try:
+            summary: Optional[Dict[str, Any]] = summarize(session, self.top_k)
+            while True:
+                if summary is None:
+                    if not await alive():
+                        return
+                    yield ": keep-alive\n\n"
+                else:
+                    seq += 1
+                    yield _event_text(previous, summary, seq)
+                    if summary["final"]:
+                        return
+                summary = await subscriber.next(self.heartbeat_seconds)
+        finally:
+            self.unsubscribe(session_id, subscriber)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "streamed_sessions": len(self._subscribers),
+                "subscribers": sum(len(s) for s in self._subscribers.values()),
+                "published": self.published,
+            }
+
+
+live_updates = LiveUpdateHub()
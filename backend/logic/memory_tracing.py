@@ -0,0 +1,92 @@
+"""
+Memory Tracing
+tracemalloc snapshots on demand and diffs between them
+"""
+
+import logging
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Snapshots are large; keep only the most recent few
+_MAX_SNAPSHOTS = 8
+
+
+class MemoryTracer:
+    """Named tracemalloc snapshots for comparing two points in time"""
+
+    def __init__(self, max_snapshots: int = _MAX_SNAPSHOTS):
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counter = 0
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def take_snapshot(self, frames: int = 1) -> Dict[str, Any]:
+        """Snapshot now, starting tracemalloc first if needed (that snapshot is the baseline)"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            logger.info(f"🧠 tracemalloc started ({frames} frames)")
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            self._counter += 1
+            snapshot_id = f"s{self._counter}"
+            info = {"id": snapshot_id, "taken_at": time.time(), "traced_bytes": current, "peak_bytes": peak}
+            self._snapshots[snapshot_id] = {**info, "snapshot": snapshot}
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return info
+
+    def snapshots(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{k: v for k, v in entry.items() if k != "snapshot"} for entry in self._snapshots.values()]
+
+    def diff(self, from_id: str, to_id: str, top_n: int = 20, key_type: str = "lineno",
+             path_filter: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Largest allocation changes between two snapshots, or None if either is gone"""
+        with self._lock:
+            older = self._snapshots.get(from_id)
+            newer = self._snapshots.get(to_id)
+        if older is None or newer is None:
+            return None
+
+        stats = newer["snapshot"].compare_to(older["snapshot"], key_type)
+        if path_filter:
+            stats = [stat for stat in stats if any(path_filter in frame.filename for frame in stat.traceback)]
+        return {
+            "from": from_id,
+            "to": to_id,
+            "size_diff_bytes": sum(stat.size_diff for stat in stats),
+            "count_diff": sum(stat.count_diff for stat in stats),
+            "top": [
+                {
+                    "location": "; ".join(f"{frame.filename}:{frame.lineno}" for frame in stat.traceback),
+                    "size_diff_bytes": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                    "size_bytes": stat.size,
+                    "count": stat.count,
+                }
+                for stat in stats[:top_n]
+            ],
+        }
+
+    def stop(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info("🧠 tracemalloc stopped")
+
+
+memory_tracer = MemoryTracer()
@@ -0,0 +1,33 @@
+"""
+Process Memory Statistics
+Resident / shared / private memory of the current process from /proc
+"""
+
+import os
+import resource
+from typing import Dict
+
+
+def process_memory() -> Dict[str, float]:
+    """Memory of this process in MB: rss, shared, private (and pss on Linux)"""
+    fields = {}
+    try:
+        with open('/proc/self/smaps_rollup', 'r') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        # No smaps (non-Linux): peak RSS is the best we can do
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {'pid': os.getpid(), 'rss_mb': round(peak / 1024.0, 2)}
+
+    shared_kb = fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0)
+    private_kb = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    return {
+        'pid': os.getpid(),
+        'rss_mb': round(fields.get('Rss', 0) / 1024.0, 2),
+        'pss_mb': round(fields.get('Pss', 0) / 1024.0, 2),
+        'shared_mb': round(shared_kb / 1024.0, 2),
+        'private_mb': round(private_kb / 1024.0, 2),
+    }
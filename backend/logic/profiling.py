@@ -0,0 +1,135 @@
+"""
+Request Profiling
+Opt-in cProfile capture per request, kept in a bounded ring buffer
+"""
+
+import cProfile
+import logging
+import pstats
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from .config import PROFILE_BUFFER_SIZE, PROFILE_SAMPLE_RATE, PROFILE_TOP_N
+
+logger = logging.getLogger(__name__)
+
+
+class RequestProfiler:
+    """Profiles selected requests and keeps their top stacks by request id.
+
+    A request is profiled when explicitly asked for or when it falls in the
+    sample. cProfile hooks the interpreter for the running thread, and
+    concurrent profilers interfere, so at most one request is profiled at
+    a time; others that ask while it runs are counted as skipped.
+    """
+
+    def __init__(self, capacity: int = PROFILE_BUFFER_SIZE, sample_rate: float = PROFILE_SAMPLE_RATE,
+                 top_n: int = PROFILE_TOP_N):
+        self.capacity = capacity
+        self.sample_rate = sample_rate
+        self.top_n = top_n
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._active = threading.Lock()
+        self.captured = 0
+        self.skipped = 0
+
+    def wanted(self, requested: bool = False) -> bool:
+        return requested or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def start(self, enable: bool = True) -> Optional[cProfile.Profile]:
+        """Begin profiling the current request, or None if another one is being profiled.
+
+        With enable=False nothing is hooked yet: the caller runs the
+        request's work through runcall() on whichever threads do it.
+        """
+        if not self._active.acquire(blocking=False):
+            with self._lock:
+                self.skipped += 1
+            return None
+        profile = cProfile.Profile()
+        if not enable:
+            return profile
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiling tool is active in this process
+            self._active.release()
+            with self._lock:
+                self.skipped += 1
+            return None
+        return profile
+
+    @staticmethod
+    def runcall(profile: cProfile.Profile, func, *args):
+        """Run func on this thread with the profile hooked in"""
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiling tool is active in this process
+            return func(*args)
+        try:
+            return func(*args)
+        finally:
+            profile.disable()
+
+    def finish(self, profile: cProfile.Profile, request_id: str, path: str,
+               status_code: int, duration_seconds: float) -> None:
+        profile.disable()
+        self._active.release()
+
+        stats = pstats.Stats(profile)
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:self.top_n]
+        record = {
+            "request_id": request_id,
+            "path": path,
+            "status_code": status_code,
+            "duration_ms": round(duration_seconds * 1000.0, 3),
+            "captured_at": time.time(),
+            "total_calls": stats.total_calls,
+            "top": [
+                {
+                    "function": f"{filename}:{line}({name})",
+                    "calls": primitive_calls if primitive_calls == calls else f"{calls}/{primitive_calls}",
+                    "tottime_ms": round(tottime * 1000.0, 3),
+                    "cumtime_ms": round(cumtime * 1000.0, 3),
+                }
+                for (filename, line, name), (primitive_calls, calls, tottime, cumtime, _) in rows
+            ],
+        }
+        with self._lock:
+            self._profiles[request_id] = record
+            self._profiles.move_to_end(request_id)
+            while len(self._profiles) > max(1, self.capacity):
+                self._profiles.popitem(last=False)
+            self.captured += 1
+        logger.info(f"🔬 Profiled {path} ({record['duration_ms']} ms) as {request_id}")
+
+    def get(self, request_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._profiles.get(request_id)
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        """Newest first, without the stacks"""
+        with self._lock:
+            records = list(self._profiles.values())
+        return [
+            {key: record[key] for key in ("request_id", "path", "status_code", "duration_ms", "captured_at")}
+            for record in reversed(records)
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "captured": self.captured,
+                "skipped": self.skipped,
+                "buffered": len(self._profiles),
+                "capacity": self.capacity,
+                "sample_rate": self.sample_rate,
+            }
+
+
+profiler = RequestProfiler()
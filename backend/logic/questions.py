@@ -1,7 +1,9 @@
 import math
 import random
 
-from backend.logic.belief import compute_likelihood, normalize
+import numpy as np
+
+from backend.logic.belief import ALPHA, BETA, FEATURE_NOISE, compute_likelihood, normalize
 
 # Heuristic feature-level weights so we don't over-focus
 # on low-level identifiers like specific artists/countries.
@@ -49,6 +51,14 @@ def make_question_text(feature, value):
     Generate slightly varied, more human-sounding question text
     based on the feature type.
     """
+    return random.choice(question_text_variants(feature, value))
+
+
+def question_text_variants(feature, value):
+    """
+    All text templates for a question, filled in; make_question_text
+    picks one at random.
+    """
     if feature == "artists":
         templates = [
             f"Is the artist {value}?",
@@ -165,7 +175,7 @@ def make_question_text(feature, value):
             f"Would you associate it with {value}?",
         ]
 
-    return random.choice(templates)
+    return templates
 
 
 def entropy(probabilities):
@@ -333,6 +343,24 @@ def generate_all_questions(entities):
     return questions
 
 
+def song_matches(song, feature, value):
+    """
+    True if the song has this feature/value, preferring sparse graph facts
+    when the song carries them.
+    """
+
+    facts = song.get("facts")
+    if facts is not None:
+        return (feature, value) in facts
+
+    song_value = song.get(feature)
+
+    if isinstance(song_value, list):
+        return value in song_value
+
+    return song_value == value
+
+
 def simulate_bayesian_update(songs, beliefs, feature, value, answer):
     """
     Simulates posterior belief after hypothetical answer.
@@ -346,16 +374,7 @@ def simulate_bayesian_update(songs, beliefs, feature, value, answer):
 
         prior = beliefs[song_id]
 
-        facts = song.get("facts")
-        if facts is not None:
-            matches = (feature, value) in facts
-        else:
-            song_value = song.get(feature)
-
-            if isinstance(song_value, list):
-                matches = value in song_value
-            else:
-                matches = song_value == value
+        matches = song_matches(song, feature, value)
 
         likelihood = compute_likelihood(matches, answer, feature=feature)
 
@@ -364,6 +383,171 @@ def simulate_bayesian_update(songs, beliefs, feature, value, answer):
     return normalize(new_beliefs)
 
 
+# Answer order used by the batch what-if arrays.
+ANSWERS = ("yes", "no", "unsure")
+
+
+def build_match_matrix(songs, questions):
+    """
+    Boolean (questions x songs) matrix: True where the song matches the question.
+    """
+
+    matrix = np.zeros((len(questions), len(songs)), dtype=bool)
+
+    for j, song in enumerate(songs):
+        for i, question in enumerate(questions):
+            if song_matches(song, question["feature"], question["value"]):
+                matrix[i, j] = True
+
+    return matrix
+
+
+def question_noise(questions):
+    """
+    Per-question (alpha, beta) arrays from the feature noise model.
+    """
+
+    alphas = np.empty(len(questions), dtype=np.float64)
+    betas = np.empty(len(questions), dtype=np.float64)
+
+    for i, question in enumerate(questions):
+        alphas[i], betas[i] = FEATURE_NOISE.get(question["feature"], (ALPHA, BETA))
+
+    return alphas, betas
+
+
+def _xlog2x(x):
+    """
+    Elementwise x * log2(x) with 0 * log2(0) = 0.
+    """
+
+    x = np.asarray(x, dtype=np.float64)
+    out = np.zeros_like(x)
+    np.multiply(x, np.log2(x, where=x > 0, out=np.zeros_like(x)), out=out, where=x > 0)
+    return out
+
+
+def what_if_summaries(match_matrix, prior, alphas, betas, song_ids=None):
+    """
+    Vectorized what-if over every (question, answer) pair.
+
+    Works on a (questions x songs) match matrix and a prior vector and never
+    builds a posterior: masses and entropies come from two matrix-vector
+    products, the new leader from the top two prior songs on each side of
+    every question's split.
+
+    Returns a dict of arrays shaped (questions, 3), columns ordered as ANSWERS:
+      evidence  - normaliser of each posterior; P(answer) for yes/no, 1 for unsure
+      entropy   - posterior Shannon entropy in bits
+      top_id    - most probable song after the answer (index, or id if song_ids given)
+      top_prob  - its posterior probability
+      margin    - gap between the top two posterior probabilities
+    plus "yes_mass" (prior mass of matching songs) and "expected_entropy"
+    (entropy averaged over the yes/no predictive) shaped (questions,).
+    """
+
+    M = np.asarray(match_matrix, dtype=bool)
+    p = np.asarray(prior, dtype=np.float64)
+    total = p.sum()
+    if total > 0:
+        p = p / total
+
+    n_questions, n_songs = M.shape
+    alphas = np.asarray(alphas, dtype=np.float64)
+    betas = np.asarray(betas, dtype=np.float64)
+
+    # Prior mass and sum(p log p) over each question's matching songs.
+    plogp = _xlog2x(p)
+    yes_mass = M @ p
+    match_plogp = M @ plogp
+    total_plogp = plogp.sum()
+
+    # Top-two prior songs inside and outside each question's match set.
+    # Sorting once by prior turns both into "first True along the row".
+    order = np.argsort(-p, kind="stable")
+    sorted_p = np.append(p[order], 0.0)
+    sorted_M = M[:, order]
+    rows = np.arange(n_questions)
+
+    def _top_two(mask):
+        has = mask.any(axis=1)
+        first = np.where(has, mask.argmax(axis=1), n_songs)
+        rest = mask.copy()
+        rest[rows[has], first[has]] = False
+        has2 = rest.any(axis=1)
+        second = np.where(has2, rest.argmax(axis=1), n_songs)
+        return first, second
+
+    m1, m2 = _top_two(sorted_M)
+    u1, u2 = _top_two(~sorted_M)
+    positions = np.stack([m1, m2, u1, u2], axis=1)
+    candidate_p = sorted_p[positions]
+
+    shape = (n_questions, len(ANSWERS))
+    evidence = np.empty(shape)
+    entropy_bits = np.empty(shape)
+    top_index = np.empty(shape, dtype=np.int64)
+    top_prob = np.empty(shape)
+    margin = np.empty(shape)
+
+    weights = (
+        (alphas, betas),
+        (1.0 - alphas, 1.0 - betas),
+        (np.ones(n_questions), np.ones(n_questions)),
+    )
+
+    for a, (w_match, w_other) in enumerate(weights):
+        z = w_match * yes_mass + w_other * (1.0 - yes_mass)
+        # sum(u log u) for u = w * p, split into the match / non-match parts.
+        ulogu = (
+            _xlog2x(w_match) * yes_mass + w_match * match_plogp
+            + _xlog2x(w_other) * (1.0 - yes_mass) + w_other * (total_plogp - match_plogp)
+        )
+        safe_z = np.where(z > 0, z, 1.0)
+        evidence[:, a] = z
+        entropy_bits[:, a] = np.where(z > 0, np.log2(safe_z) - ulogu / safe_z, 0.0)
+
+        scaled = candidate_p * np.stack([w_match, w_match, w_other, w_other], axis=1)
+        ranked = np.argsort(-scaled, axis=1, kind="stable")
+        best = scaled[rows, ranked[:, 0]]
+        runner_up = scaled[rows, ranked[:, 1]]
+        top_index[:, a] = order[np.minimum(positions[rows, ranked[:, 0]], n_songs - 1)]
+        top_prob[:, a] = best / safe_z
+        margin[:, a] = (best - runner_up) / safe_z
+
+    expected_entropy = evidence[:, 0] * entropy_bits[:, 0] + evidence[:, 1] * entropy_bits[:, 1]
+
+    if song_ids is not None:
+        top_index = np.asarray(song_ids)[top_index]
+
+    return {
+        "evidence": evidence,
+        "entropy": entropy_bits,
+        "top_id": top_index,
+        "top_prob": top_prob,
+        "margin": margin,
+        "yes_mass": yes_mass,
+        "expected_entropy": expected_entropy,
+    }
+
+
+def simulate_bayesian_update_batch(songs, beliefs, questions, match_matrix=None):
+    """
+    Batch counterpart of simulate_bayesian_update: posterior summaries for
+    every question and every answer in one vectorized pass.
+    See what_if_summaries for the returned arrays.
+    """
+
+    if match_matrix is None:
+        match_matrix = build_match_matrix(songs, questions)
+
+    song_ids = [song["id"] for song in songs]
+    prior = np.fromiter((beliefs[song_id] for song_id in song_ids), dtype=np.float64, count=len(song_ids))
+    alphas, betas = question_noise(questions)
+
+    return what_if_summaries(match_matrix, prior, alphas, betas, song_ids=song_ids)
+
+
 def select_best_question(questions, songs, beliefs, asked, engine=None):
     """
     Select the best question using enhanced graph intelligence.
@@ -0,0 +1,47 @@
+"""
+Response Formats
+Negotiated full / slim JSON / MessagePack encodings for game responses
+"""
+
+import logging
+from typing import Any, Dict, Optional, Tuple, Union
+
+from .json_fragments import dumps
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+JSON_MEDIA_TYPE = "application/json"
+SLIM_MEDIA_TYPE = "application/vnd.songgenie.slim+json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+FULL, SLIM, MSGPACK = "full", "slim", "msgpack"
+
+
+def negotiate(accept: Optional[str], requested: Optional[str] = None) -> str:
+    """Pick a response format from an explicit format field or the Accept header.
+
+    MessagePack requests fall back to slim JSON when msgpack is not installed.
+    """
+    requested = (requested or "").strip().lower()
+    accept = (accept or "").lower()
+    if requested == MSGPACK or any(media in accept for media in MSGPACK_MEDIA_TYPES):
+        return MSGPACK if MSGPACK_AVAILABLE else SLIM
+    if requested == SLIM or SLIM_MEDIA_TYPE in accept:
+        return SLIM
+    return FULL
+
+
+def encode(payload: Dict[str, Any], response_format: str = FULL) -> Tuple[Union[str, bytes], str]:
+    """Serialize a payload; returns (body, content type)"""
+    if response_format == MSGPACK:
+        return msgpack.packb(payload, use_bin_type=True), MSGPACK_MEDIA_TYPES[0]
+    if response_format == SLIM:
+        return dumps(payload), SLIM_MEDIA_TYPE
+    return dumps(payload), JSON_MEDIA_TYPE
@@ -0,0 +1,182 @@
+"""
+Session Snapshots
+Atomic binary dumps of the session table and a lazy reader for restarts
+"""
+
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# File layout:
+#   header   <6sBI>   magic, format, record count
+#   index    per record: <B> id length, id bytes, <ddQI> created_at,
+#            last_access, blob offset, blob length
+#   blobs    Session.to_bytes() payloads, back to back
+_MAGIC = b"SGSNAP"
+_FORMAT = 1
+_HEADER = struct.Struct("<6sBI")
+_RECORD = struct.Struct("<ddQI")
+
+# (session id, created_at, last_access, serialized session)
+SnapshotRecord = Tuple[str, float, float, bytes]
+
+
+def write_snapshot(path: str, records: Iterable[SnapshotRecord]) -> int:
+    """Write records to path atomically (temp file, fsync, rename); returns the count"""
+    records = list(records)
+    encoded_ids = [session_id.encode("utf-8")[:255] for session_id, _, _, _ in records]
+    index_size = sum(1 + len(sid) + _RECORD.size for sid in encoded_ids)
+
+    index = bytearray(_HEADER.pack(_MAGIC, _FORMAT, len(records)))
+    offset = _HEADER.size + index_size
+    for sid, (_, created_at, last_access, blob) in zip(encoded_ids, records):
+        index += struct.pack("<B", len(sid)) + sid
+        index += _RECORD.pack(created_at, last_access, offset, len(blob))
+        offset += len(blob)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(index)
+            for _, _, _, blob in records:
+                f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    # Make the rename itself durable
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except OSError:
+        pass
+    return len(records)
+
+
+class SnapshotReader:
+    """Index of a snapshot file; session blobs are read only when asked for.
+
+    The file is memory-mapped, so a later snapshot replacing it on disk
+    does not disturb records that have not been materialized yet.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._index: Dict[str, Tuple[float, float, int, int]] = {}
+        self._map: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+        self._open()
+
+    def _open(self) -> None:
+        try:
+            with open(self.path, "rb") as f:
+                if os.fstat(f.fileno()).st_size < _HEADER.size:
+                    return
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return
+
+        magic, file_format, count = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or file_format != _FORMAT:
+            logger.warning(f"⚠️ Ignoring session snapshot {self.path}: unknown format")
+            self.close()
+            return
+
+        try:
+            self._read_index(count)
+        except (struct.error, UnicodeDecodeError, ValueError) as e:
+            # A truncated or damaged file must not stop the app from starting
+            self.close()
+            self._set_aside(e)
+            return
+        logger.info(f"💾 Indexed {count} snapshotted sessions from {self.path}")
+
+    def _read_index(self, count: int) -> None:
+        position = _HEADER.size
+        size = len(self._map)
+        for _ in range(count):
+            (id_length,) = struct.unpack_from("<B", self._map, position)
+            position += 1
+            if position + id_length > size:
+                raise ValueError("index runs past the end of the file")
+            session_id = self._map[position:position + id_length].decode("utf-8")
+            position += id_length
+            record = _RECORD.unpack_from(self._map, position)
+            if record[2] + record[3] > size:
+                raise ValueError(f"session {session_id} runs past the end of the file")
+            self._index[session_id] = record
+            position += _RECORD.size
+
+    def _set_aside(self, error: Exception) -> None:
+        """Move an unreadable snapshot out of the way so it is kept for inspection"""
+        corrupt_path = f"{self.path}.corrupt-{int(time.time())}"
+        try:
+            os.replace(self.path, corrupt_path)
+        except OSError as e:
+            logger.error(f"❌ Unreadable session snapshot {self.path} ({error}); could not move it: {e}")
+            return
+        logger.error(f"❌ Unreadable session snapshot {self.path} ({error}); moved to {corrupt_path}, starting empty")
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._index
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            return list(self._index)
+
+    def last_access(self, session_id: str) -> Optional[float]:
+        """A record's last_access from the index, without reading its blob"""
+        record = self._index.get(session_id)
+        return None if record is None else record[1]
+
+    def pop(self, session_id: str) -> Optional[Tuple[float, float, bytes]]:
+        """Remove a record and return (created_at, last_access, blob)"""
+        with self._lock:
+            record = self._index.pop(session_id, None)
+            if record is None:
+                return None
+            created_at, last_access, offset, length = record
+            return created_at, last_access, self._map[offset:offset + length]
+
+    def discard(self, session_id: str) -> None:
+        with self._lock:
+            self._index.pop(session_id, None)
+
+    def drop_expired(self, now: float, ttl_seconds: float) -> int:
+        with self._lock:
+            expired = [sid for sid, record in self._index.items() if now - record[1] > ttl_seconds]
+            for session_id in expired:
+                del self._index[session_id]
+            return len(expired)
+
+    def records(self) -> List[SnapshotRecord]:
+        """Unmaterialized records, copied as raw blobs"""
+        with self._lock:
+            return [
+                (session_id, created_at, last_access, self._map[offset:offset + length])
+                for session_id, (created_at, last_access, offset, length) in self._index.items()
+            ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._index.clear()
+            if self._map is not None:
+                self._map.close()
+                self._map = None
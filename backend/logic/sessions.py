@@ -0,0 +1,880 @@
+"""
+Game Sessions
+Compact per-game state and the stores that keep it between requests
+"""
+
+import heapq
+import logging
+import os
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import uuid
+from array import array
+from contextlib import contextmanager
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .catalog import ANSWER_CODES, ANSWER_NAMES, catalog_for_version, get_catalog
+from .config import (
+    SESSION_BACKEND,
+    SESSION_DB_PATH,
+    SESSION_FLUSH_BATCH_SIZE,
+    SESSION_FLUSH_INTERVAL_SECONDS,
+    SESSION_LOCK_STRIPES,
+    SESSION_REAP_INTERVAL_SECONDS,
+    SESSION_SNAPSHOT_INTERVAL_SECONDS,
+    SESSION_SNAPSHOT_PATH,
+    SESSION_TTL_SECONDS,
+)
+from .session_snapshots import SnapshotReader, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Serialized session layout version (first byte of every blob).
+_STATE_FORMAT = 1
+
+# Every state write bumps the row version, so a compare-and-swap in
+# checkout() notices writes from other processes
+_UPSERT_SQL = (
+    "INSERT INTO sessions (session_id, created_at, last_access, state)"
+    " VALUES (?, ?, ?, ?)"
+    " ON CONFLICT(session_id) DO UPDATE SET"
+    " last_access = excluded.last_access, state = excluded.state, version = version + 1"
+)
+
+# Attempts SessionManager.apply() makes when a compare-and-swap loses
+_CHECKOUT_ATTEMPTS = 5
+
+
+class SessionConflict(Exception):
+    """Another process wrote the session after this checkout read it."""
+
+
+class SessionSummary(NamedTuple):
+    """What reporting endpoints show about a session, read without decoding it"""
+    session_id: str
+    created_at: float
+    last_access: float
+    catalog_version: Optional[str]
+    questions_asked: int
+    answers: int
+    # Resident bytes per component; {"state": n} when only the serialized form is held
+    breakdown: Dict[str, int]
+
+
+class Session:
+    """Compact game state: catalog handle, belief array, asked bitmask and answer log"""
+
+    __slots__ = ("catalog", "beliefs", "asked_bits", "question_log", "answer_log")
+
+    def __init__(self, target_dataset_size: int = 100):
+        try:
+            self.catalog = get_catalog(target_dataset_size)
+            self.beliefs = self.catalog.new_beliefs()
+            logger.info(f"✅ Session created with {len(self.catalog.songs)} songs")
+        except Exception as e:
+            logger.error(f"❌ Failed to create session: {e}")
+            self.catalog = None
+            self.beliefs = None
+        self.asked_bits = 0
+        self.question_log = array("H")
+        self.answer_log = bytearray()
+
+    @property
+    def catalog_version(self):
+        return self.catalog.version if self.catalog else None
+
+    @property
+    def questions_asked(self) -> int:
+        return len(self.question_log)
+
+    @property
+    def pending_question(self):
+        """Pool index of the question awaiting an answer, if any"""
+        if len(self.answer_log) < len(self.question_log):
+            return self.question_log[-1]
+        return None
+
+    def ask(self, question_index: int) -> None:
+        self.asked_bits |= 1 << question_index
+        self.question_log.append(question_index)
+
+    def record_answer(self, answer: str) -> None:
+        question_index = self.pending_question
+        if question_index is None:
+            return
+        self.catalog.update_beliefs(self.beliefs, question_index, answer)
+        self.answer_log.append(ANSWER_CODES[answer])
+
+    @property
+    def history(self):
+        """Expanded question/answer history, built on demand"""
+        history = []
+        for i, question_index in enumerate(self.question_log):
+            question = self.catalog.questions[question_index]
+            entry = {"feature": question["feature"], "value": question["value"]}
+            if i < len(self.answer_log):
+                entry["answer"] = ANSWER_NAMES[self.answer_log[i]]
+            history.append(entry)
+        return history
+
+    def memory_breakdown(self) -> Dict[str, int]:
+        """Estimated bytes per component; the shared catalog is referenced, not owned"""
+        beliefs = 0
+        if self.beliefs is not None:
+            beliefs = sys.getsizeof(self.beliefs) + sys.getsizeof(self.beliefs.log_beliefs)
+        return {
+            "object": sys.getsizeof(self),
+            "beliefs": beliefs,
+            "asked_set": sys.getsizeof(self.asked_bits),
+            "history": sys.getsizeof(self.question_log) + sys.getsizeof(self.answer_log),
+            # One pointer to the shared catalog
+            "engine_refs": struct.calcsize("P") if self.catalog is not None else 0,
+        }
+
+    def memory_bytes(self) -> int:
+        """Bytes held by this session, excluding the shared catalog"""
+        return sum(self.memory_breakdown().values())
+
+    def to_bytes(self) -> bytes:
+        """Serialize as catalog version + question indices + answer codes.
+
+        Beliefs are not stored: they are replayed from the answer log.
+        """
+        version = (self.catalog_version or "").encode("utf-8")
+        asked = len(self.question_log)
+        return b"".join((
+            struct.pack("<BB", _STATE_FORMAT, len(version)),
+            version,
+            struct.pack(f"<H{asked}H", asked, *self.question_log),
+            bytes(self.answer_log),
+        ))
+
+    @staticmethod
+    def peek(blob: bytes) -> Tuple[Optional[str], int, int]:
+        """(catalog version, questions asked, answers) read from a blob's header only"""
+        state_format, version_length = struct.unpack_from("<BB", blob, 0)
+        if state_format != _STATE_FORMAT:
+            return None, 0, 0
+        version = bytes(blob[2:2 + version_length]).decode("utf-8")
+        offset = 2 + version_length
+        (asked,) = struct.unpack_from("<H", blob, offset)
+        answers = len(blob) - offset - 2 - 2 * asked
+        return version or None, asked, answers
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> Optional["Session"]:
+        """Rebuild a session, or None if its catalog no longer exists"""
+        state_format, version_length = struct.unpack_from("<BB", blob, 0)
+        if state_format != _STATE_FORMAT:
+            return None
+        offset = 2
+        version = blob[offset:offset + version_length].decode("utf-8")
+        offset += version_length
+        (asked,) = struct.unpack_from("<H", blob, offset)
+        offset += 2
+        question_log = array("H", struct.unpack_from(f"<{asked}H", blob, offset))
+        offset += 2 * asked
+        answer_log = bytearray(blob[offset:])
+
+        catalog = catalog_for_version(version)
+        if catalog is None:
+            return None
+        return cls.restore(catalog, question_log, answer_log)
+
+    @classmethod
+    def restore(cls, catalog, question_log, answer_log) -> "Session":
+        """Session for a catalog with beliefs replayed from its logs"""
+        session = cls.__new__(cls)
+        session.catalog = catalog
+        session.beliefs = catalog.replay_beliefs(question_log, answer_log)
+        session.asked_bits = 0
+        for question_index in question_log:
+            session.asked_bits |= 1 << question_index
+        session.question_log = array("H", question_log)
+        session.answer_log = bytearray(answer_log)
+        return session
+
+
+class _SessionEntry:
+    """Session plus its lock and the timestamps used for sliding expiry"""
+
+    __slots__ = ("session", "lock", "created_at", "last_access")
+
+    def __init__(self, session: Session, created_at: Optional[float] = None,
+                 last_access: Optional[float] = None):
+        now = time.time()
+        self.session = session
+        self.lock = threading.Lock()
+        self.created_at = now if created_at is None else created_at
+        self.last_access = now if last_access is None else last_access
+
+    def summary(self, session_id: str) -> SessionSummary:
+        session = self.session
+        return SessionSummary(session_id, self.created_at, self.last_access, session.catalog_version,
+                              session.questions_asked, len(session.answer_log), session.memory_breakdown())
+
+
+def _stored_summary(session_id: str, created_at: float, last_access: float, blob: bytes) -> SessionSummary:
+    """Summary of a serialized session that is not resident in this process"""
+    try:
+        version, asked, answers = Session.peek(blob)
+    except (struct.error, UnicodeDecodeError):
+        version, asked, answers = None, 0, 0
+    return SessionSummary(session_id, created_at, last_access, version, asked, answers, {"state": len(blob)})
+
+
+class SessionStore:
+    """Where sessions live between requests.
+
+    SessionManager owns ids and the TTL; a store keeps entries and
+    decides how a checkout is serialized. The default checkout() stripes
+    locks over session ids and loads the entry once under the lock, which
+    is what stores that materialize a fresh entry on every load need.
+    """
+
+    def __init__(self, stripes: int = SESSION_LOCK_STRIPES):
+        self._locks = [threading.Lock() for _ in range(max(1, stripes))]
+
+    def lock_for(self, session_id: str):
+        return self._locks[hash(session_id) % len(self._locks)]
+
+    @contextmanager
+    def checkout(self, session_id: str, now: float, ttl_seconds: float):
+        """Yield the entry with its lock held and save it afterwards (None if missing/expired)"""
+        with self.lock_for(session_id):
+            entry = self.refresh(session_id, self.load(session_id), now, ttl_seconds)
+            if entry is None:
+                yield None
+                return
+            yield entry
+            self.save(session_id, entry)
+
+    def refresh(self, session_id: str, entry: Optional[_SessionEntry], now: float,
+               ttl_seconds: float) -> Optional[_SessionEntry]:
+        """Entry with its TTL refreshed, or None (deleting it) once it has lapsed"""
+        if entry is None:
+            return None
+        if now - entry.last_access > ttl_seconds:
+            self.delete(session_id)
+            return None
+        entry.last_access = now
+        return entry
+
+    def insert(self, session_id: str, entry: _SessionEntry) -> None:
+        raise NotImplementedError
+
+    def load(self, session_id: str) -> Optional[_SessionEntry]:
+        raise NotImplementedError
+
+    def save(self, session_id: str, entry: _SessionEntry) -> None:
+        raise NotImplementedError
+
+    def last_access(self, session_id: str) -> Optional[float]:
+        """When a session was last used (None if missing); never decodes or builds one"""
+        raise NotImplementedError
+
+    def touch(self, session_id: str, entry: _SessionEntry) -> None:
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> None:
+        raise NotImplementedError
+
+    def expire(self, now: float, ttl_seconds: float) -> int:
+        raise NotImplementedError
+
+    def summaries(self) -> List[SessionSummary]:
+        """Every stored session for reporting; never decodes or replays one"""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def snapshot(self) -> int:
+        """Persist sessions for a restart; returns how many were written.
+
+        Stores that are durable already have nothing to do.
+        """
+        return 0
+
+    def close(self) -> None:
+        pass
+
+
+class _SessionStripe:
+    """One shard of the session table with its own lock and expiry heap"""
+
+    __slots__ = ("sessions", "expiry_heap", "lock")
+
+    def __init__(self):
+        self.sessions = {}
+        self.expiry_heap = []
+        self.lock = threading.Lock()
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local store sharded over lock stripes.
+
+    Lookups are plain dict reads without a lock. Each stripe keeps a
+    min-heap of deadlines seen at push time; expire() pops due deadlines
+    and re-pushes entries that were touched since, so bookkeeping is O(1)
+    per request and O(log n) per reaped/refreshed entry.
+
+    With a snapshot_path the table is written there by snapshot() and on
+    close(). At startup only the snapshot's index is read; each restored
+    session is decoded the first time it is looked up.
+    """
+
+    def __init__(self, stripes: int = SESSION_LOCK_STRIPES, ttl_seconds: float = SESSION_TTL_SECONDS,
+                 snapshot_path: Optional[str] = None):
+        super().__init__(stripes)
+        self._stripes = [_SessionStripe() for _ in range(max(1, stripes))]
+        self._ttl_seconds = float(ttl_seconds)
+        self._snapshot_path = snapshot_path or None
+        self._snapshot_lock = threading.Lock()
+        self._restored = SnapshotReader(snapshot_path) if self._snapshot_path else None
+
+    def _stripe(self, session_id: str) -> _SessionStripe:
+        return self._stripes[hash(session_id) % len(self._stripes)]
+
+    @contextmanager
+    def checkout(self, session_id: str, now: float, ttl_seconds: float):
+        # Entries are live objects: lock the entry itself, nothing to write back
+        entry = self.refresh(session_id, self.load(session_id), now, ttl_seconds)
+        if entry is None:
+            yield None
+            return
+        with entry.lock:
+            yield entry
+
+    def insert(self, session_id: str, entry: _SessionEntry) -> None:
+        stripe = self._stripe(session_id)
+        with stripe.lock:
+            stripe.sessions[session_id] = entry
+            heapq.heappush(stripe.expiry_heap, (entry.last_access + self._ttl_seconds, session_id))
+
+    def load(self, session_id: str) -> Optional[_SessionEntry]:
+        entry = self._stripe(session_id).sessions.get(session_id)
+        if entry is None and self._restored is not None and session_id in self._restored:
+            entry = self._materialize(session_id)
+        return entry
+
+    def _materialize(self, session_id: str) -> Optional[_SessionEntry]:
+        """Decode a snapshotted session into the live table"""
+        stripe = self._stripe(session_id)
+        with stripe.lock:
+            # Another request may have won the race
+            entry = stripe.sessions.get(session_id)
+            if entry is not None:
+                return entry
+            record = self._restored.pop(session_id)
+            if record is None:
+                return None
+            created_at, last_access, blob = record
+            try:
+                session = Session.from_bytes(blob)
+            except (struct.error, UnicodeDecodeError) as e:
+                logger.warning(f"⚠️ Dropping unreadable snapshotted session {session_id}: {e}")
+                return None
+            if session is None:
+                return None
+            entry = _SessionEntry(session, created_at, last_access)
+            stripe.sessions[session_id] = entry
+            heapq.heappush(stripe.expiry_heap, (last_access + self._ttl_seconds, session_id))
+            return entry
+
+    def save(self, session_id: str, entry: _SessionEntry) -> None:
+        # Entries are live objects; nothing to write back
+        pass
+
+    def last_access(self, session_id: str) -> Optional[float]:
+        entry = self._stripe(session_id).sessions.get(session_id)
+        if entry is not None:
+            return entry.last_access
+        if self._restored is not None:
+            return self._restored.last_access(session_id)
+        return None
+
+    def touch(self, session_id: str, entry: _SessionEntry) -> None:
+        pass
+
+    def delete(self, session_id: str) -> None:
+        stripe = self._stripe(session_id)
+        with stripe.lock:
+            stripe.sessions.pop(session_id, None)
+        if self._restored is not None:
+            self._restored.discard(session_id)
+
+    def expire(self, now: float, ttl_seconds: float) -> int:
+        removed = 0
+        if self._restored is not None:
+            removed += self._restored.drop_expired(now, ttl_seconds)
+        for stripe in self._stripes:
+            with stripe.lock:
+                heap = stripe.expiry_heap
+                while heap and heap[0][0] <= now:
+                    _, session_id = heapq.heappop(heap)
+                    entry = stripe.sessions.get(session_id)
+                    if entry is None:
+                        continue
+                    deadline = entry.last_access + ttl_seconds
+                    if deadline <= now:
+                        del stripe.sessions[session_id]
+                        removed += 1
+                    else:
+                        # Touched since it was scheduled: reschedule at the new deadline
+                        heapq.heappush(heap, (deadline, session_id))
+        return removed
+
+    def summaries(self):
+        result = []
+        for stripe in self._stripes:
+            with stripe.lock:
+                entries = list(stripe.sessions.items())
+            result.extend(entry.summary(session_id) for session_id, entry in entries)
+        # Restored sessions nobody has looked up yet stay serialized
+        if self._restored is not None:
+            result.extend(_stored_summary(*record) for record in self._restored.records())
+        return result
+
+    def __len__(self) -> int:
+        restored = len(self._restored) if self._restored is not None else 0
+        return restored + sum(len(stripe.sessions) for stripe in self._stripes)
+
+    def snapshot(self) -> int:
+        if self._snapshot_path is None:
+            return 0
+        # Restored sessions nobody has touched yet are carried over as-is.
+        # Read them first: one materialized meanwhile is then found live.
+        records = {}
+        if self._restored is not None:
+            for record in self._restored.records():
+                records[record[0]] = record
+        for stripe in self._stripes:
+            with stripe.lock:
+                entries = list(stripe.sessions.items())
+            for session_id, entry in entries:
+                # Serialize under the session lock so a turn is never half-written
+                with entry.lock:
+                    blob = entry.session.to_bytes()
+                records[session_id] = (session_id, entry.created_at, entry.last_access, blob)
+
+        with self._snapshot_lock:
+            started = time.perf_counter()
+            written = write_snapshot(self._snapshot_path, records.values())
+        logger.info(
+            f"💾 Snapshotted {written} sessions to {self._snapshot_path} "
+            f"in {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+        return written
+
+    def close(self) -> None:
+        try:
+            self.snapshot()
+        except OSError as e:
+            logger.error(f"❌ Session snapshot failed: {e}")
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions serialized into a WAL-mode SQLite file.
+
+    Worker processes on one box can share the file. Writes go through a
+    buffer: with `flush_interval` 0 each writer commits before returning,
+    and writers that arrive while a commit is running are batched into the
+    next transaction (group commit), so other processes see every answer
+    immediately. A positive `flush_interval` trades that for write-behind:
+    flushes every `flush_interval` seconds or once `batch_size` sessions
+    are dirty. Reads check the buffer first so a process always sees its
+    own writes. checkout() bypasses the buffer: it reads the row and its
+    version, and writes the turn back with a compare-and-swap on that
+    version. Neither step holds the database lock while the turn is
+    computed. A checkout that loses to another process raises
+    SessionConflict, and SessionManager.apply() re-runs the turn.
+    """
+
+    def __init__(self, path: str = SESSION_DB_PATH,
+                 flush_interval: float = SESSION_FLUSH_INTERVAL_SECONDS,
+                 batch_size: int = SESSION_FLUSH_BATCH_SIZE,
+                 stripes: int = SESSION_LOCK_STRIPES):
+        super().__init__(stripes)
+        self.path = path
+        self._flush_interval = flush_interval
+        self._batch_size = max(1, batch_size)
+        self._local = threading.local()
+        self._pending = {}
+        self._touches = {}
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher = None
+
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " session_id TEXT PRIMARY KEY,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL,"
+            " state BLOB NOT NULL,"
+            " version INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(sessions)")}
+        if "version" not in columns:
+            # Files created before compare-and-swap checkouts
+            connection.execute("ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sessions_last_access ON sessions(last_access)"
+        )
+        connection.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connection for this thread; never reuses one inherited over fork()"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5.0)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _start_flusher(self) -> None:
+        if self._flush_interval <= 0:
+            return
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._flush_lock:
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(
+                    target=self._flush_loop, name="session-flusher", daemon=True
+                )
+                self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self._flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"❌ Session flush error: {e}")
+
+    def _queue(self, session_id: str, row) -> None:
+        with self._pending_lock:
+            self._pending[session_id] = row
+            dirty = len(self._pending)
+        if dirty >= self._batch_size or self._flush_interval <= 0:
+            self.flush()
+        else:
+            self._start_flusher()
+
+    def flush(self) -> int:
+        """Write all buffered sessions in one transaction"""
+        with self._flush_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+                touches, self._touches = self._touches, {}
+            if not pending and not touches:
+                return 0
+            upserts = [
+                (session_id, row[0], row[1], row[2])
+                for session_id, row in pending.items() if row is not None
+            ]
+            deletes = [(session_id,) for session_id, row in pending.items() if row is None]
+            connection = self._connection()
+            try:
+                self._write(connection, upserts, touches, deletes)
+            except sqlite3.Error:
+                # Keep the batch for the next flush unless newer writes replaced it
+                with self._pending_lock:
+                    for session_id, row in pending.items():
+                        self._pending.setdefault(session_id, row)
+                    for session_id, last_access in touches.items():
+                        self._touches.setdefault(session_id, last_access)
+                raise
+            return len(pending) + len(touches)
+
+    @staticmethod
+    def _write(connection, upserts, touches, deletes) -> None:
+        with connection:
+            if upserts:
+                connection.executemany(_UPSERT_SQL, upserts)
+            if touches:
+                connection.executemany(
+                    "UPDATE sessions SET last_access = MAX(last_access, ?) WHERE session_id = ?",
+                    [(last_access, session_id) for session_id, last_access in touches.items()],
+                )
+            if deletes:
+                connection.executemany("DELETE FROM sessions WHERE session_id = ?", deletes)
+
+    def _row(self, entry: _SessionEntry):
+        return (entry.created_at, entry.last_access, entry.session.to_bytes())
+
+    @contextmanager
+    def checkout(self, session_id: str, now: float, ttl_seconds: float):
+        # The stripe lock orders threads of this process; other processes
+        # are caught by the version compare-and-swap on write
+        with self.lock_for(session_id):
+            with self._pending_lock:
+                buffered = session_id in self._pending
+            if buffered:
+                # Unflushed writes have no version yet
+                self.flush()
+            connection = self._connection()
+            row = connection.execute(
+                "SELECT created_at, last_access, state, version FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            entry = None if row is None else self._decode(session_id, row[:3])
+            with self._pending_lock:
+                touched = self._touches.get(session_id)
+            if entry is not None and touched is not None:
+                entry.last_access = max(entry.last_access, touched)
+            if entry is None or now - entry.last_access > ttl_seconds:
+                if row is not None:
+                    self.delete(session_id)
+                yield None
+                return
+
+            entry.last_access = now
+            yield entry
+            with connection:
+                cursor = connection.execute(
+                    "UPDATE sessions SET last_access = ?, state = ?, version = version + 1"
+                    " WHERE session_id = ? AND version = ?",
+                    (entry.last_access, entry.session.to_bytes(), session_id, row[3]),
+                )
+            if cursor.rowcount != 1:
+                raise SessionConflict(session_id)
+            with self._pending_lock:
+                self._touches.pop(session_id, None)
+
+    def insert(self, session_id: str, entry: _SessionEntry) -> None:
+        self._queue(session_id, self._row(entry))
+
+    def save(self, session_id: str, entry: _SessionEntry) -> None:
+        self._queue(session_id, self._row(entry))
+
+    def touch(self, session_id: str, entry: _SessionEntry) -> None:
+        # Reads only move last_access: no re-serialization, and the update
+        # rides along with the next flush (the reaper flushes before expiring)
+        with self._pending_lock:
+            row = self._pending.get(session_id)
+            if row is not None:
+                self._pending[session_id] = (row[0], entry.last_access, row[2])
+                return
+            self._touches[session_id] = entry.last_access
+        self._start_flusher()
+
+    def delete(self, session_id: str) -> None:
+        self._queue(session_id, None)
+
+    def _decode(self, session_id: str, row) -> Optional[_SessionEntry]:
+        created_at, last_access, state = row
+        session = Session.from_bytes(bytes(state))
+        if session is None:
+            return None
+        return _SessionEntry(session, created_at=created_at, last_access=last_access)
+
+    def load(self, session_id: str) -> Optional[_SessionEntry]:
+        with self._pending_lock:
+            if session_id in self._pending:
+                row = self._pending[session_id]
+                return None if row is None else self._decode(session_id, row)
+            touched = self._touches.get(session_id)
+        row = self._connection().execute(
+            "SELECT created_at, last_access, state FROM sessions WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        entry = self._decode(session_id, row)
+        if entry is not None and touched is not None:
+            entry.last_access = max(entry.last_access, touched)
+        return entry
+
+    def last_access(self, session_id: str) -> Optional[float]:
+        with self._pending_lock:
+            if session_id in self._pending:
+                row = self._pending[session_id]
+                return None if row is None else row[1]
+            touched = self._touches.get(session_id)
+        row = self._connection().execute(
+            "SELECT last_access FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0] if touched is None else max(row[0], touched)
+
+    def expire(self, now: float, ttl_seconds: float) -> int:
+        self.flush()
+        connection = self._connection()
+        with connection:
+            cursor = connection.execute(
+                "DELETE FROM sessions WHERE last_access <= ?", (now - ttl_seconds,)
+            )
+        return cursor.rowcount
+
+    def summaries(self):
+        self.flush()
+        rows = self._connection().execute(
+            "SELECT session_id, created_at, last_access, state FROM sessions"
+        ).fetchall()
+        return [_stored_summary(session_id, created_at, last_access, state)
+                for session_id, created_at, last_access, state in rows]
+
+    def __len__(self) -> int:
+        self.flush()
+        return self._connection().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=self._flush_interval + 1)
+            self._flusher = None
+        self.flush()
+
+
+def create_session_store(backend: str = SESSION_BACKEND) -> SessionStore:
+    """Session store for a backend name ("memory" or "sqlite")"""
+    if backend == "sqlite":
+        logger.info(f"🗄️ Using SQLite session store at {SESSION_DB_PATH}")
+        return SQLiteSessionStore()
+    return InMemorySessionStore(snapshot_path=SESSION_SNAPSHOT_PATH)
+
+
+class SessionManager:
+    """Creates, finds and expires game sessions on top of a SessionStore.
+
+    Lookups refresh a sliding TTL. checkout() lets the store hold a
+    per-session lock (per-stripe for stores that rebuild entries on load)
+    and write the session back afterwards, so concurrent answers for the same game are
+    applied in order while different games proceed in parallel. Expiry
+    runs in a background reaper thread, never inside request handling.
+    """
+
+    def __init__(self, store: Optional[SessionStore] = None,
+                 reap_interval: float = SESSION_REAP_INTERVAL_SECONDS,
+                 snapshot_interval: float = SESSION_SNAPSHOT_INTERVAL_SECONDS):
+        self.store = store if store is not None else create_session_store()
+        self._ttl_seconds = float(SESSION_TTL_SECONDS)
+        self._reap_interval = reap_interval
+        self._snapshot_interval = float(snapshot_interval)
+        self._stop = threading.Event()
+        self._reaper = None
+        self._reaper_lock = threading.Lock()
+
+    def start_reaper(self) -> None:
+        """Start the background expiry thread (idempotent)."""
+        with self._reaper_lock:
+            if self._reaper is not None and self._reaper.is_alive():
+                return
+            self._stop.clear()
+            self._reaper = threading.Thread(target=self._reap_loop, name="session-reaper", daemon=True)
+            self._reaper.start()
+
+    def stop_reaper(self) -> None:
+        with self._reaper_lock:
+            self._stop.set()
+            if self._reaper is not None:
+                self._reaper.join(timeout=self._reap_interval + 1)
+            self._reaper = None
+
+    def close(self) -> None:
+        """Stop background work and flush the store."""
+        self.stop_reaper()
+        self.store.close()
+
+    def _reap_loop(self) -> None:
+        last_snapshot = time.monotonic()
+        while not self._stop.wait(self._reap_interval):
+            try:
+                self.cleanup()
+            except Exception as e:
+                logger.error(f"❌ Session reaper error: {e}")
+            if self._snapshot_interval > 0 and time.monotonic() - last_snapshot >= self._snapshot_interval:
+                last_snapshot = time.monotonic()
+                try:
+                    self.store.snapshot()
+                except Exception as e:
+                    logger.error(f"❌ Session snapshot error: {e}")
+
+    def cleanup(self) -> int:
+        """Remove sessions whose sliding TTL has lapsed; returns how many."""
+        removed = self.store.expire(time.time(), self._ttl_seconds)
+        if removed:
+            logger.info(f"🧹 Expired {removed} sessions")
+        return removed
+
+    def create(self, target_dataset_size: int = 100) -> Tuple[str, Session]:
+        """Create a new session and return (session_id, session)."""
+        session = Session(target_dataset_size)
+        return self.add(session), session
+
+    def add(self, session: Session) -> str:
+        """Register an already-built session (e.g. from the warm pool); returns its id."""
+        self.start_reaper()
+        session_id = str(uuid.uuid4())
+        self.store.insert(session_id, _SessionEntry(session))
+        logger.info(f"🆔 Created session {session_id}")
+        return session_id
+
+    def _entry(self, session_id):
+        """Live entry for a session id (refreshing its TTL), or None."""
+        if not isinstance(session_id, str):
+            return None
+        return self.store.refresh(session_id, self.store.load(session_id), time.time(), self._ttl_seconds)
+
+    def get(self, session_id):
+        """Return an existing session or None if missing/expired."""
+        entry = self._entry(session_id)
+        if entry is None:
+            return None
+        self.store.touch(session_id, entry)
+        return entry.session
+
+    def is_live(self, session_id) -> bool:
+        """True if the session exists and has not expired; does not refresh its TTL.
+
+        Only the session's last_access is read, so heartbeats never decode a
+        session or build its catalog.
+        """
+        if not isinstance(session_id, str):
+            return False
+        last_access = self.store.last_access(session_id)
+        return last_access is not None and time.time() - last_access <= self._ttl_seconds
+
+    def apply(self, session_id, turn, attempts: int = _CHECKOUT_ATTEMPTS):
+        """Run turn(session) under checkout() and return its result.
+
+        When another process wrote the session first, the turn is re-run on
+        the fresh state, so turn() must not have side effects beyond the
+        session itself.
+        """
+        for attempt in range(attempts):
+            try:
+                with self.checkout(session_id) as session:
+                    return turn(session)
+            except SessionConflict:
+                if attempt == attempts - 1:
+                    raise
+                logger.info(f"🔁 Session {session_id} changed in another process, retrying turn")
+
+    def save(self, session_id: str, session: Session) -> None:
+        """Write back a session changed outside checkout()."""
+        self.store.save(session_id, _SessionEntry(session))
+
+    @contextmanager
+    def checkout(self, session_id):
+        """Yield the session with its lock held (or None if missing/expired)."""
+        if not isinstance(session_id, str):
+            yield None
+            return
+        with self.store.checkout(session_id, time.time(), self._ttl_seconds) as entry:
+            yield None if entry is None else entry.session
+
+    def summaries(self) -> List[SessionSummary]:
+        """Every session for reporting, read from stored state without decoding it."""
+        return self.store.summaries()
+
+    def __len__(self) -> int:
+        return len(self.store)
@@ -11,6 +11,8 @@ import random
 import os
 from collections import Counter
 
+from .config import DATASET_SEED
+
 # Try to import intelligent selector
 try:
     from .intelligent_question_selector import IntelligentQuestionSelector
@@ -82,13 +84,8 @@ class SimpleEnhancedAkenator:
         """Initialize system components"""
         logger.info("🚀 Initializing Simple Enhanced Music Akenator...")
         
-        # Load existing songs
-        self.songs = self._load_existing_songs()
-        
-        # Expand dataset if needed
-        if len(self.songs) < self.target_dataset_size:
-            logger.info(f"📊 Expanding dataset from {len(self.songs)} to {self.target_dataset_size} songs...")
-            self.songs = self._expand_dataset(self.target_dataset_size)
+        # Load existing songs, expanded to the target size if needed
+        self.songs = self.load_songs(self.target_dataset_size)
         
         # Initialize beliefs
         self.beliefs = {song['id']: 1.0/len(self.songs) for song in self.songs}
@@ -165,7 +162,29 @@ class SimpleEnhancedAkenator:
         
         logger.info(f"✅ Simple Enhanced Akenator initialized with {len(self.songs)} songs")
     
-    def _load_existing_songs(self) -> List[Dict[str, Any]]:
+    @classmethod
+    def load_songs(cls, target_dataset_size: int) -> List[Dict[str, Any]]:
+        """Dataset for a size without building any of the engine's subsystems"""
+        songs = cls._load_existing_songs()
+        if len(songs) < target_dataset_size:
+            logger.info(f"📊 Expanding dataset from {len(songs)} to {target_dataset_size} songs...")
+            songs = cls._expand_dataset(songs, target_dataset_size)
+        return songs
+    
+    @staticmethod
+    def system_status(songs: List[Dict[str, Any]], target_dataset_size: int,
+                      active_songs: Optional[int] = None) -> Dict[str, Any]:
+        """Status fields for a dataset; every song is active under a fresh prior"""
+        return {
+            'system_type': 'Simple Enhanced',
+            'dataset_size': len(songs),
+            'target_dataset_size': target_dataset_size,
+            'active_songs': len(songs) if active_songs is None else active_songs,
+            'features': ['genres', 'artists', 'decade', 'era', 'is_collaboration', 'is_viral_hit']
+        }
+    
+    @classmethod
+    def _load_existing_songs(cls) -> List[Dict[str, Any]]:
         """Load existing songs from dataset"""
         try:
             # Try to load from standard location
@@ -178,22 +197,23 @@ class SimpleEnhancedAkenator:
                 # Validate and normalize songs
                 valid_songs = []
                 for i, song in enumerate(songs):
-                    if self._validate_song(song):
+                    if cls._validate_song(song):
                         song['id'] = i
-                        song = self._normalize_song(song)
+                        song = cls._normalize_song(song)
                         valid_songs.append(song)
                 
                 logger.info(f"📊 Loaded {len(valid_songs)} valid songs from existing dataset")
                 return valid_songs
             else:
                 logger.warning("No existing dataset found, using minimal dataset")
-                return self._create_minimal_dataset()
+                return cls._create_minimal_dataset()
         
         except Exception as e:
             logger.error(f"Error loading existing dataset: {e}")
-            return self._create_minimal_dataset()
+            return cls._create_minimal_dataset()
     
-    def _create_minimal_dataset(self) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _create_minimal_dataset() -> List[Dict[str, Any]]:
         """Create a minimal dataset for testing"""
         return [
             {
@@ -231,12 +251,15 @@ class SimpleEnhancedAkenator:
             }
         ]
     
-    def _expand_dataset(self, target_size: int) -> List[Dict[str, Any]]:
+    @classmethod
+    def _expand_dataset(cls, songs: List[Dict[str, Any]], target_size: int) -> List[Dict[str, Any]]:
         """Expand dataset with synthetic songs"""
-        current_songs = self.songs.copy()
+        current_songs = songs.copy()
         
-        # Create synthetic songs to reach target size
+        # Create synthetic songs to reach target size, seeded per size so
+        # every process expands to the same dataset
         synthetic_songs = []
+        rng = random.Random(f"{DATASET_SEED}:{target_size}")
         
         # Templates for synthetic songs
         artist_templates = [
@@ -252,16 +275,16 @@ class SimpleEnhancedAkenator:
             song = {
                 'id': len(current_songs) + i,
                 'title': f'Synthetic Song {i+1}',
-                'artists': [random.choice(artist_templates)],
-                'genres': [random.choice(genre_templates)],
-                'release_year': random.randint(2010, 2023),
-                'is_collaboration': random.choice([True, False]),
-                'is_viral_hit': random.choice([True, False])
+                'artists': [rng.choice(artist_templates)],
+                'genres': [rng.choice(genre_templates)],
+                'release_year': rng.randint(2010, 2023),
+                'is_collaboration': rng.choice([True, False]),
+                'is_viral_hit': rng.choice([True, False])
             }
             
             # Add derived attributes
             song['decade'] = f"{(song['release_year'] // 10) * 10}s"
-            song['era'] = self._get_era(song['release_year'])
+            song['era'] = cls._get_era(song['release_year'])
             
             synthetic_songs.append(song)
         
@@ -269,7 +292,8 @@ class SimpleEnhancedAkenator:
         logger.info(f"✅ Expanded dataset to {len(expanded_songs)} songs")
         return expanded_songs
     
-    def _validate_song(self, song: Dict[str, Any]) -> bool:
+    @staticmethod
+    def _validate_song(song: Dict[str, Any]) -> bool:
         """Validate song has required fields"""
         required_fields = ['title', 'artists']
         
@@ -279,7 +303,8 @@ class SimpleEnhancedAkenator:
         
         return True
     
-    def _normalize_song(self, song: Dict[str, Any]) -> Dict[str, Any]:
+    @classmethod
+    def _normalize_song(cls, song: Dict[str, Any]) -> Dict[str, Any]:
         """Normalize song attributes"""
         normalized = song.copy()
         
@@ -294,7 +319,7 @@ class SimpleEnhancedAkenator:
         if 'release_year' in normalized:
             year = normalized['release_year']
             normalized['decade'] = f"{(year // 10) * 10}s"
-            normalized['era'] = self._get_era(year)
+            normalized['era'] = cls._get_era(year)
         
         # Add boolean attributes
         normalized['is_collaboration'] = normalized.get('is_collaboration', False)
@@ -303,7 +328,8 @@ class SimpleEnhancedAkenator:
         
         return normalized
     
-    def _get_era(self, year: int) -> str:
+    @staticmethod
+    def _get_era(year: int) -> str:
         """Get era from year"""
         if year < 1960:
             return "Classic Era"
@@ -629,13 +655,8 @@ class SimpleEnhancedAkenator:
     
     def get_system_status(self) -> Dict[str, Any]:
         """Get system status"""
-        return {
-            'system_type': 'Simple Enhanced',
-            'dataset_size': len(self.songs),
-            'target_dataset_size': self.target_dataset_size,
-            'active_songs': len([b for b in self.beliefs.values() if b > 1e-6]),
-            'features': ['genres', 'artists', 'decade', 'era', 'is_collaboration', 'is_viral_hit']
-        }
+        active_songs = len([b for b in self.beliefs.values() if b > 1e-6])
+        return self.system_status(self.songs, self.target_dataset_size, active_songs)
 
 
 def create_simple_enhanced_akenator(target_dataset_size: int = 200) -> SimpleEnhancedAkenator:
@@ -0,0 +1,82 @@
+"""
+Single Flight
+Coalesces concurrent identical computations onto one in-flight call
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, List
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs fn once per key at a time; concurrent callers wait for that result.
+
+    Only for idempotent computations: waiters get the leader's result or
+    its exception. Nothing is cached after the call completes.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+        self.max_waiters = 0
+        _groups.append(self)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+                self.max_waiters = max(self.max_waiters, call.waiters)
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "executions": self.executions,
+                "coalesced_waiters": self.coalesced,
+                "max_waiters": self.max_waiters,
+                "in_flight": len(self._calls),
+            }
+
+
+_groups: List[SingleFlight] = []
+
+
+def single_flight_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every single-flight group, by name"""
+    return {group.name: group.stats() for group in list(_groups)}
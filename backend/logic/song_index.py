@@ -0,0 +1,122 @@
+"""
+Song Index
+O(1) song lookup with pre-serialized card and playback fragments
+"""
+
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+from .json_fragments import RawJSON, to_raw_json
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+def playback_payload(song: Dict[str, Any]) -> Dict[str, Any]:
+    """/play_song response body for a song"""
+    song_id = song.get("id")
+    return {
+        "type": "playback",
+        "song": song,
+        "message": f"Now playing: {song['title']} by {', '.join(song.get('artists', []))}",
+        "audio_url": f"https://example.com/audio/{song_id}.mp3",  # Mock URL
+        "duration": song.get("duration"),
+        "genres": song.get("genres", []),
+        "year": song.get("publication_date", "")[:4] if song.get("publication_date") else "Unknown"
+    }
+
+
+class SongIndex:
+    """id → song record, with each song's JSON serialized once up front"""
+
+    def __init__(self, songs: Iterable[Dict[str, Any]]):
+        self.songs: Dict[Any, Dict[str, Any]] = {}
+        self._cards: Dict[Any, RawJSON] = {}
+        self._playback: Dict[Any, RawJSON] = {}
+        self._summaries: Dict[Any, Dict[str, Any]] = {}
+        for song in songs:
+            song_id = song.get("id")
+            if song_id is None or song_id in self.songs:
+                continue
+            card = to_raw_json(song)
+            self.songs[song_id] = song
+            self._cards[song_id] = card
+            self._playback[song_id] = to_raw_json(playback_payload(song))
+            self._summaries[song_id] = {
+                "id": song_id,
+                "title": song.get("title", ""),
+                "artists": song.get("artists", []),
+            }
+
+    def __len__(self) -> int:
+        return len(self.songs)
+
+    def __contains__(self, song_id) -> bool:
+        return song_id in self.songs
+
+    def get(self, song_id) -> Optional[Dict[str, Any]]:
+        return self.songs.get(song_id)
+
+    def card_json(self, song_id) -> Optional[RawJSON]:
+        """The song record as a JSON fragment"""
+        return self._cards.get(song_id)
+
+    def summary(self, song_id) -> Optional[Dict[str, Any]]:
+        """Small id/title/artists projection used by slim responses"""
+        return self._summaries.get(song_id)
+
+    def playback_json(self, song_id) -> Optional[RawJSON]:
+        """Complete /play_song body for the song"""
+        return self._playback.get(song_id)
+
+
+_dataset_index: Optional[SongIndex] = None
+_dataset_loads = SingleFlight("dataset_index")
+
+
+def _load_dataset_index() -> SongIndex:
+    global _dataset_index
+    if _dataset_index is None:
+        from .kg_loader import load_dataset
+        _dataset_index = SongIndex(load_dataset())
+        logger.info(f"🗂️ Indexed {len(_dataset_index)} dataset songs")
+    return _dataset_index
+
+
+def dataset_index() -> SongIndex:
+    """Index over the on-disk dataset, loaded and validated once"""
+    if _dataset_index is not None:
+        return _dataset_index
+    return _dataset_loads.do("dataset", _load_dataset_index)
+
+
+def find_card_json(song_id, catalog_version: Optional[str] = None) -> Optional[RawJSON]:
+    """Full song card from the named catalog, else from the dataset or any live catalog"""
+    from .catalog import cached_catalogs, find_catalog
+
+    if catalog_version:
+        catalog = find_catalog(catalog_version)
+        return catalog.song_index.card_json(song_id) if catalog else None
+
+    card = dataset_index().card_json(song_id)
+    if card is not None:
+        return card
+    for catalog in reversed(cached_catalogs()):
+        card = catalog.song_index.card_json(song_id)
+        if card is not None:
+            return card
+    return None
+
+
+def find_playback_json(song_id) -> Optional[RawJSON]:
+    """Playback body from the dataset, else from the most recently used catalog that has it"""
+    playback = dataset_index().playback_json(song_id)
+    if playback is not None:
+        return playback
+
+    from .catalog import cached_catalogs
+    for catalog in reversed(cached_catalogs()):
+        playback = catalog.song_index.playback_json(song_id)
+        if playback is not None:
+            return playback
+    return None
@@ -0,0 +1,135 @@
+"""
+Speculative Turns
+Precomputes the next turn for every possible answer while the player reads
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .catalog import ANSWER_CODES
+from .config import SPECULATIVE_MAX_PENDING, SPECULATIVE_WORKERS
+from .turn_cache import TranspositionCache, turn_cache
+
+logger = logging.getLogger(__name__)
+
+
+class Speculator:
+    """Fills the transposition cache with the decisions a pending question can lead to.
+
+    Results are parked in the shared TranspositionCache rather than on the
+    session object, so they are found by /answer whichever session store
+    (or stateless token) carries the game. CPU is bounded by a small worker
+    pool and a cap on queued jobs; a job is cancelled as soon as the real
+    answer arrives.
+    """
+
+    def __init__(self, cache: Optional[TranspositionCache] = None,
+                 workers: int = SPECULATIVE_WORKERS, max_pending: int = SPECULATIVE_MAX_PENDING):
+        self.cache = turn_cache if cache is None else cache
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: Dict[bytes, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.skipped = 0
+        self.cancelled = 0
+        self.computed = 0
+
+    @staticmethod
+    def _job_key(session) -> bytes:
+        """Position key: answered codes plus the pending question"""
+        return TranspositionCache.key_for(session) + session.pending_question.to_bytes(2, "little")
+
+    def speculate(self, session) -> bool:
+        """Queue speculation for the session's pending question; False if skipped"""
+        question_index = session.pending_question
+        if question_index is None or session.catalog is None or self.cache.max_entries <= 0:
+            return False
+
+        job_key = self._job_key(session)
+        with self._lock:
+            if job_key in self._jobs:
+                return False
+            if len(self._jobs) >= self.max_pending:
+                self.skipped += 1
+                return False
+            cancelled = threading.Event()
+            self._jobs[job_key] = cancelled
+            self.submitted += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="speculate"
+                )
+
+        # Snapshot on the request thread; the worker never touches the live session
+        snapshot = (
+            session.catalog,
+            session.beliefs.copy(),
+            session.asked_bits,
+            session.questions_asked,
+            TranspositionCache.answer_codes(session),
+            question_index,
+        )
+        self._executor.submit(self._run, job_key, cancelled, snapshot)
+        return True
+
+    def cancel(self, session) -> None:
+        """The real answer arrived: stop speculating on this position"""
+        if session.pending_question is None:
+            return
+        with self._lock:
+            cancelled = self._jobs.pop(self._job_key(session), None)
+        if cancelled is not None:
+            cancelled.set()
+
+    def _run(self, job_key: bytes, cancelled: threading.Event, snapshot) -> None:
+        catalog, beliefs, asked_bits, questions_asked, codes, question_index = snapshot
+        try:
+            # Most likely answer first, so a cancelled job has usually done the useful part
+            yes_mass = float(np.dot(beliefs.probabilities(), catalog.match_weights[question_index]))
+            answers = ("yes", "no") if yes_mass >= 0.5 else ("no", "yes")
+            for answer in answers + ("unsure",):
+                if cancelled.is_set():
+                    with self._lock:
+                        self.cancelled += 1
+                    return
+                key = TranspositionCache.make_key(
+                    catalog.version, codes + [(question_index << 2) | ANSWER_CODES[answer]]
+                )
+                if key in self.cache:
+                    continue
+                hypothetical = catalog.update_beliefs(beliefs.copy(), question_index, answer)
+                self.cache.put(key, catalog.decide_turn(hypothetical, asked_bits, questions_asked))
+                with self._lock:
+                    self.computed += 1
+        except Exception as e:
+            logger.warning(f"⚠️ Speculation failed: {e}")
+        finally:
+            with self._lock:
+                self._jobs.pop(job_key, None)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for cancelled in self._jobs.values():
+                cancelled.set()
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pending": len(self._jobs),
+                "submitted": self.submitted,
+                "skipped": self.skipped,
+                "cancelled": self.cancelled,
+                "computed": self.computed,
+            }
+
+
+speculator = Speculator()
@@ -0,0 +1,152 @@
+"""
+Signed Game State Tokens
+Client-held, HMAC-signed encoding of a game so any worker can resume it
+"""
+
+import base64
+import hashlib
+import hmac
+import logging
+import time
+from array import array
+from typing import List, Tuple
+
+from .catalog import catalog_for_version
+from .config import (
+    STATE_TOKEN_SECRET,
+    STATE_TOKEN_SECRET_CONFIGURED,
+    STATE_TOKEN_TTL_SECONDS,
+    STATELESS_SESSIONS,
+)
+
+logger = logging.getLogger(__name__)
+
+# st2 tokens start with their issue time
+TOKEN_PREFIX = "st2."
+_MAC_BYTES = 16
+# Tolerated clock difference between workers for issue times in the future
+_CLOCK_SKEW_SECONDS = 60
+
+_SECRET_WARNING = (
+    "⚠️ SONG_GENIE_STATE_TOKEN_SECRET is not set: state tokens are signed with a "
+    "per-process random key and fail on any other worker or after a restart"
+)
+_warned_secret = False
+
+
+def _warn_missing_secret() -> None:
+    global _warned_secret
+    if not STATE_TOKEN_SECRET_CONFIGURED and not _warned_secret:
+        _warned_secret = True
+        logger.warning(_SECRET_WARNING)
+
+
+if STATELESS_SESSIONS:
+    _warn_missing_secret()
+
+
+class InvalidStateToken(ValueError):
+    """Token is malformed, tampered with, or for an unknown catalog"""
+
+
+def is_state_token(value) -> bool:
+    return isinstance(value, str) and value.startswith(TOKEN_PREFIX)
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        if offset >= len(data):
+            raise InvalidStateToken("Truncated state token")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def _sign(payload: bytes) -> bytes:
+    return hmac.new(STATE_TOKEN_SECRET, payload, hashlib.sha256).digest()[:_MAC_BYTES]
+
+
+def pack_state(version: str, question_log, answer_log, issued_at: int = 0) -> bytes:
+    """Varint payload: issue time, version, asked question indices, 2-bit answer codes"""
+    out = bytearray()
+    _write_varint(out, issued_at)
+    encoded_version = version.encode("utf-8")
+    _write_varint(out, len(encoded_version))
+    out += encoded_version
+    _write_varint(out, len(question_log))
+    for question_index in question_log:
+        _write_varint(out, question_index)
+    _write_varint(out, len(answer_log))
+    packed = bytearray((len(answer_log) + 3) // 4)
+    for i, code in enumerate(answer_log):
+        packed[i // 4] |= (code & 0x3) << (2 * (i % 4))
+    out += packed
+    return bytes(out)
+
+
+def unpack_state(payload: bytes) -> Tuple[int, str, List[int], bytearray]:
+    issued_at, offset = _read_varint(payload, 0)
+    length, offset = _read_varint(payload, offset)
+    version = payload[offset:offset + length].decode("utf-8")
+    offset += length
+    asked, offset = _read_varint(payload, offset)
+    question_log = []
+    for _ in range(asked):
+        question_index, offset = _read_varint(payload, offset)
+        question_log.append(question_index)
+    answered, offset = _read_varint(payload, offset)
+    packed = payload[offset:]
+    if answered > asked or len(packed) != (answered + 3) // 4:
+        raise InvalidStateToken("Malformed state token")
+    answer_log = bytearray((packed[i // 4] >> (2 * (i % 4))) & 0x3 for i in range(answered))
+    return issued_at, version, question_log, answer_log
+
+
+def encode_session(session) -> str:
+    """Signed token for a session's catalog version and answer log"""
+    _warn_missing_secret()
+    payload = pack_state(session.catalog_version or "", session.question_log, session.answer_log,
+                         issued_at=int(time.time()))
+    return TOKEN_PREFIX + base64.urlsafe_b64encode(payload + _sign(payload)).rstrip(b"=").decode("ascii")
+
+
+def decode_session(token: str):
+    """Session rebuilt from a token; raises InvalidStateToken"""
+    from .sessions import Session
+
+    if not is_state_token(token):
+        raise InvalidStateToken("Not a state token")
+    body = token[len(TOKEN_PREFIX):]
+    try:
+        raw = base64.urlsafe_b64decode(body + "=" * (-len(body) % 4))
+    except (ValueError, TypeError):
+        raise InvalidStateToken("Malformed state token")
+    payload, mac = raw[:-_MAC_BYTES], raw[-_MAC_BYTES:]
+    if len(raw) <= _MAC_BYTES or not hmac.compare_digest(mac, _sign(payload)):
+        if not STATE_TOKEN_SECRET_CONFIGURED:
+            # Most likely issued by another worker with its own random key
+            logger.warning("🔏 State token signature mismatch and SONG_GENIE_STATE_TOKEN_SECRET is not set")
+        raise InvalidStateToken("Bad state token signature")
+
+    issued_at, version, question_log, answer_log = unpack_state(payload)
+    age = time.time() - issued_at
+    if age > STATE_TOKEN_TTL_SECONDS or age < -_CLOCK_SKEW_SECONDS:
+        raise InvalidStateToken("Expired state token")
+    catalog = catalog_for_version(version)
+    if catalog is None:
+        raise InvalidStateToken("Unknown catalog version")
+    if any(q >= len(catalog.questions) for q in question_log) or any(a > 2 for a in answer_log):
+        raise InvalidStateToken("State token does not match catalog")
+    return Session.restore(catalog, array("H", question_log), answer_log)
@@ -0,0 +1,96 @@
+"""
+Status Snapshot
+System status rebuilt in the background and served from memory
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from .admission import admission
+from .catalog import cached_catalogs, catalog_stats
+from .config import STATUS_REFRESH_SECONDS
+from .process_stats import process_memory
+from .single_flight import SingleFlight, single_flight_stats
+
+logger = logging.getLogger(__name__)
+
+_status_builds = SingleFlight("status_snapshot")
+
+# Reported until the first /start compiles a catalog; /status never builds one
+_NO_ENGINE_STATUS = {"engine_built": False, "message": "No engine built yet"}
+
+
+class StatusReporter:
+    """Keeps a /status snapshot fresh from the live catalogs and session store.
+
+    Requests only read the last snapshot; the refresh thread does the work
+    of walking catalogs and reading process memory.
+    """
+
+    def __init__(self, session_manager, refresh_interval: float = STATUS_REFRESH_SECONDS):
+        self.session_manager = session_manager
+        self.refresh_interval = refresh_interval
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._refreshed_at = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the background refresh thread (idempotent)."""
+        with self._thread_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._refresh_loop, name="status-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        with self._thread_lock:
+            self._stop.set()
+            if self._thread is not None:
+                self._thread.join(timeout=self.refresh_interval + 1)
+            self._thread = None
+
+    def _refresh_loop(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"❌ Status refresh error: {e}")
+
+    def refresh(self) -> Dict[str, Any]:
+        """Rebuild the snapshot from the live shared state (one rebuild at a time)."""
+        return _status_builds.do(id(self), self._build)
+
+    def _build(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        catalogs = cached_catalogs()
+        # Report on the most recently used engine
+        system_status = catalogs[-1].system_status if catalogs else _NO_ENGINE_STATUS
+
+        snapshot = {
+            "system_status": system_status,
+            "active_sessions": len(self.session_manager),
+            "catalogs": catalog_stats(),
+            "admission": admission.stats(),
+            "single_flight": single_flight_stats(),
+            "memory": process_memory(),
+            "generated_at": datetime.now().isoformat(),
+        }
+        snapshot["refresh_seconds"] = round(time.perf_counter() - started, 4)
+
+        self._snapshot = snapshot
+        self._refreshed_at = time.time()
+        return snapshot
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Latest snapshot; only the very first call builds one inline."""
+        self.start()
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.refresh()
+        return {**snapshot, "age_seconds": round(time.time() - self._refreshed_at, 3)}
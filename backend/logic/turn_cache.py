@@ -0,0 +1,135 @@
+"""
+Transposition Cache
+Shares turn decisions between sessions that reached the same answer set
+"""
+
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+from .batching import batch_scheduler
+from .catalog import TurnDecision
+from .config import TURN_CACHE_SIZE
+from .metrics import TURN_DECISIONS
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class TranspositionCache:
+    """Bounded LRU of TurnDecisions keyed by catalog version and answer set.
+
+    Bayesian updates commute, so the posterior (and therefore the next
+    question and guess decision) only depends on which questions were
+    answered how, not on their order. Keys are the sorted
+    (question, answer) pairs, so players who gave the same opening
+    answers in any order share one entry.
+    """
+
+    def __init__(self, max_entries: int = TURN_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, TurnDecision]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def answer_codes(session) -> List[int]:
+        """(question << 2 | answer) code for every answered question"""
+        return [
+            (session.question_log[i] << 2) | session.answer_log[i]
+            for i in range(len(session.answer_log))
+        ]
+
+    @staticmethod
+    def make_key(version: str, codes: Iterable[int]) -> bytes:
+        """Canonical key: catalog version + sorted answer codes"""
+        return version.encode("utf-8") + b"|" + array("I", sorted(codes)).tobytes()
+
+    @classmethod
+    def key_for(cls, session) -> bytes:
+        return cls.make_key(session.catalog.version, cls.answer_codes(session))
+
+    def __contains__(self, key: bytes) -> bool:
+        """Membership check that does not touch LRU order or stats"""
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key: bytes) -> Optional[TurnDecision]:
+        with self._lock:
+            decision = self._entries.get(key)
+            if decision is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return decision
+
+    def put(self, key: bytes, decision: TurnDecision) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = decision
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+turn_cache = TranspositionCache()
+_turn_flights = SingleFlight("turn_decision")
+
+_CACHE_HITS = TURN_DECISIONS.labels("cache")
+_COMPUTED = TURN_DECISIONS.labels("computed")
+_COALESCED = TURN_DECISIONS.labels("coalesced")
+_UNCACHED = TURN_DECISIONS.labels("uncached")
+
+
+def decide_turn(session, cache: Optional[TranspositionCache] = None) -> TurnDecision:
+    """Turn decision for a session with no pending question, cached across sessions"""
+    cache = turn_cache if cache is None else cache
+    if cache.max_entries <= 0:
+        _UNCACHED.inc()
+        return batch_scheduler.decide(
+            session.catalog, session.beliefs, session.asked_bits, session.questions_asked
+        )
+
+    key = cache.key_for(session)
+    decision = cache.get(key)
+    if decision is not None:
+        _CACHE_HITS.inc()
+        return decision
+
+    # Sessions reaching the same answers concurrently share one computation
+    computed = []
+
+    def compute():
+        computed.append(True)
+        result = batch_scheduler.decide(
+            session.catalog, session.beliefs, session.asked_bits, session.questions_asked
+        )
+        cache.put(key, result)
+        return result
+
+    decision = _turn_flights.do(key, compute)
+    (_COMPUTED if computed else _COALESCED).inc()
+    return decision
@@ -0,0 +1,209 @@
+"""
+Warm Session Pool
+Ready-to-play sessions per dataset size, refilled in the background
+"""
+
+import logging
+import math
+import threading
+import time
+from array import array
+from collections import deque
+from typing import Any, Deque, Dict
+
+from .catalog import cached_catalogs, get_catalog
+from .config import (
+    CATALOG_CACHE_SIZE,
+    WARM_POOL_MAX,
+    WARM_POOL_MAX_SIZES,
+    WARM_POOL_MIN,
+    WARM_POOL_REFILL_SECONDS,
+)
+from .sessions import Session
+
+logger = logging.getLogger(__name__)
+
+# Time constant (seconds) of the decaying /start rate estimate
+_RATE_WINDOW_SECONDS = 10.0
+
+
+def new_session(target_dataset_size: int, catalog=None) -> Session:
+    """A fresh session that has already been asked the catalog's first question"""
+    if catalog is None:
+        session = Session(target_dataset_size)
+    else:
+        # Built on a catalog we already hold: no registry lookup, no rebuild
+        session = Session.restore(catalog, array("H"), bytearray())
+    if session.catalog is not None and session.catalog.first_question is not None:
+        session.ask(session.catalog.first_question)
+    return session
+
+
+class WarmPool:
+    """Per-size queues of new sessions.
+
+    /start pops a session; a background thread tops each queue up to a
+    depth that covers a couple of refill intervals at the observed /start
+    rate, so quiet sizes hold only WARM_POOL_MIN sessions.
+
+    Pooled sessions keep their catalog alive, so only sizes whose catalog
+    is still in the catalog LRU are pooled, and at most `max_sizes` of
+    them: a pool is dropped once its catalog is evicted and is never a
+    reason to rebuild one.
+    """
+
+    def __init__(self, max_per_size: int = WARM_POOL_MAX, min_per_size: int = WARM_POOL_MIN,
+                 refill_interval: float = WARM_POOL_REFILL_SECONDS,
+                 max_sizes: int = min(WARM_POOL_MAX_SIZES, CATALOG_CACHE_SIZE)):
+        self.max_per_size = max_per_size
+        self.min_per_size = min(min_per_size, max_per_size)
+        self.refill_interval = refill_interval
+        self.max_sizes = max(1, max_sizes)
+        self._pools: Dict[int, Deque[Session]] = {}
+        self._rates: Dict[int, float] = {}
+        self._last_take: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_per_size > 0
+
+    def _drop(self, size: int) -> None:
+        """Forget a size and release its pooled sessions (caller holds the lock)"""
+        self.discarded += len(self._pools.pop(size, ()))
+        self._rates.pop(size, None)
+        self._last_take.pop(size, None)
+
+    def _prune(self, live: Dict[int, Any]) -> None:
+        """Drop pools whose catalog left the LRU or was rebuilt (caller holds the lock)"""
+        for size in list(self._pools):
+            catalog = live.get(size)
+            pool = self._pools[size]
+            if catalog is None or (pool and pool[0].catalog is not catalog):
+                self._drop(size)
+
+    def _observe(self, size: int, now: float) -> None:
+        """Decaying count of /start calls, in starts per second"""
+        last = self._last_take.get(size, now)
+        decay = math.exp(-(now - last) / _RATE_WINDOW_SECONDS)
+        self._rates[size] = self._rates.get(size, 0.0) * decay + 1.0 / _RATE_WINDOW_SECONDS
+        self._last_take[size] = now
+
+    def target_depth(self, size: int) -> int:
+        now = time.monotonic()
+        with self._lock:
+            rate = self._rates.get(size, 0.0)
+            idle = now - self._last_take.get(size, now)
+        rate *= math.exp(-idle / _RATE_WINDOW_SECONDS)
+        wanted = math.ceil(rate * self.refill_interval * 2)
+        return max(self.min_per_size, min(self.max_per_size, wanted))
+
+    def take(self, target_dataset_size: int) -> Session:
+        """A ready session for the size, built inline only when the pool is empty"""
+        if not self.enabled:
+            return new_session(target_dataset_size)
+
+        session = None
+        catalog = get_catalog(target_dataset_size)
+        live = {c.target_dataset_size: c for c in cached_catalogs()}
+        with self._lock:
+            self._prune(live)
+            if target_dataset_size not in self._pools and len(self._pools) >= self.max_sizes:
+                # Make room by dropping the size that was started least recently
+                stalest = min(self._pools, key=lambda size: self._last_take.get(size, 0.0))
+                self._drop(stalest)
+            self._observe(target_dataset_size, time.monotonic())
+            pool = self._pools.setdefault(target_dataset_size, deque())
+            while pool and session is None:
+                candidate = pool.popleft()
+                # Catalog evicted and rebuilt since the session was pooled
+                if candidate.catalog is catalog:
+                    session = candidate
+                else:
+                    self.discarded += 1
+            if session is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        self.start()
+        self._wake.set()
+        return session if session is not None else new_session(target_dataset_size)
+
+    def refill(self) -> int:
+        """Top every pooled size up to its target depth; returns sessions built"""
+        built = 0
+        live = {c.target_dataset_size: c for c in cached_catalogs()}
+        with self._lock:
+            self._prune(live)
+            sizes = list(self._pools)
+        for size in sizes:
+            target = self.target_depth(size)
+            while not self._stop.is_set():
+                with self._lock:
+                    pool = self._pools.get(size)
+                    if pool is None or len(pool) >= target:
+                        break
+                session = new_session(size, live[size])
+                with self._lock:
+                    # The size may have been dropped meanwhile
+                    pool = self._pools.get(size)
+                    if pool is None:
+                        break
+                    pool.append(session)
+                built += 1
+        return built
+
+    def start(self) -> None:
+        """Start the background refill thread (idempotent)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._refill_loop, name="warm-pool", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=self.refill_interval + 1)
+
+    def _refill_loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.refill_interval)
+            self._wake.clear()
+            try:
+                self.refill()
+            except Exception as e:
+                logger.error(f"❌ Warm pool refill error: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            depths = {size: len(pool) for size, pool in self._pools.items()}
+            rates = dict(self._rates)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "discarded": self.discarded,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "pools": {
+                str(size): {
+                    "depth": depth,
+                    "target": self.target_depth(size),
+                    "starts_per_second": round(rates.get(size, 0.0), 3),
+                }
+                for size, depth in depths.items()
+            },
+        }
+
+
+warm_pool = WarmPool()
@@ -4,6 +4,8 @@ class SongGenieGame {
         this.session_id = null;
         this.currentType = null;
         this.questionCount = 0;
+        this.liveStream = null;
+        this.liveCandidates = new Map();
         this.init();
     }
 
@@ -62,6 +64,10 @@ class SongGenieGame {
             
             this.session_id = data.session_id;
             this.updateSessionId(data.session_id);
+            // Stateless tokens change every turn, so only stored sessions can stream
+            if (!data.state_token) {
+                this.openLiveStream(data.session_id);
+            }
             this.handleResponse(data);
         } catch (error) {
             console.error('Failed to start game:', error);
@@ -85,6 +91,10 @@ class SongGenieGame {
             });
 
             const data = await res.json();
+            // Stateless games hand back a fresh state token every turn
+            if (data.session_id) {
+                this.session_id = data.session_id;
+            }
             this.handleResponse(data);
         } catch (error) {
             console.error('Failed to send answer:', error);
@@ -248,6 +258,47 @@ class SongGenieGame {
         }, 2000);
     }
 
+    // Live leaderboard: server-sent deltas of the top candidates
+    openLiveStream(sessionId) {
+        this.closeLiveStream();
+        if (!window.EventSource) {
+            return;
+        }
+        this.liveStream = new EventSource(`/sessions/${sessionId}/stream`);
+        const onUpdate = (event) => this.applyLiveUpdate(JSON.parse(event.data));
+        this.liveStream.addEventListener('update', onUpdate);
+        this.liveStream.addEventListener('final', (event) => {
+            onUpdate(event);
+            this.closeLiveStream();
+        });
+        this.liveStream.onerror = () => this.closeLiveStream();
+    }
+
+    closeLiveStream() {
+        if (this.liveStream) {
+            this.liveStream.close();
+            this.liveStream = null;
+        }
+        this.liveCandidates.clear();
+    }
+
+    applyLiveUpdate(update) {
+        update.drop.forEach(id => this.liveCandidates.delete(id));
+        Object.entries(update.names).forEach(([id, name]) => {
+            this.liveCandidates.set(Number(id), { id: Number(id), name, confidence: 0 });
+        });
+        Object.entries(update.set).forEach(([id, probability]) => {
+            const candidate = this.liveCandidates.get(Number(id));
+            if (candidate) {
+                candidate.confidence = probability;
+            }
+        });
+        const ranked = update.order.map(id => this.liveCandidates.get(id)).filter(Boolean);
+        if (update.questions_asked > 0 && ranked.length) {
+            this.showTopCandidates(ranked);
+        }
+    }
+
     showTopCandidates(candidates) {
         const candidatesList = document.getElementById('candidates-list');
         const candidatesSection = document.getElementById('top-candidates');
@@ -0,0 +1,131 @@
+"""
+Pre-fork production server for the Music Akenator API
+
+The master builds the song catalogs once, moves their large arrays into
+shared mappings, freezes the GC and then forks workers that all accept on
+one listening socket. Workers share the catalogs copy-on-write and share
+sessions through the SQLite session store.
+
+Usage: python serve_prefork.py
+"""
+
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+
+# Workers are separate processes, so sessions must live in a shared store
+os.environ.setdefault("SONG_GENIE_SESSION_BACKEND", "sqlite")
+
+from werkzeug.serving import make_server
+
+from app import app, shutdown
+from backend.logic.catalog import get_catalog
+from backend.logic.config import (
+    FLASK_HOST,
+    FLASK_PORT,
+    PREFORK_PRELOAD_SIZES,
+    PREFORK_WORKERS,
+    SESSION_BACKEND,
+)
+from backend.logic.process_stats import process_memory
+
+logger = logging.getLogger("prefork")
+
+
+def preload_catalogs():
+    """Build and share every configured catalog in the master process."""
+    sizes = [int(size) for size in PREFORK_PRELOAD_SIZES.split(",") if size.strip()]
+    for size in sizes:
+        catalog = get_catalog(max(10, min(1000, size)))
+        catalog.share_memory()
+        logger.info(f"📚 Preloaded catalog {catalog.version} ({catalog.array_bytes() / 1024:.1f} KB arrays)")
+
+
+def run_worker(listener: socket.socket) -> None:
+    """Serve requests on the inherited socket until terminated."""
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    server = make_server(FLASK_HOST, FLASK_PORT, app, threaded=True, fd=listener.fileno())
+
+    # Private pages are what this worker added on top of the shared master image
+    memory = process_memory()
+    logger.info(
+        f"👷 Worker {memory['pid']} ready: rss {memory['rss_mb']} MB, "
+        f"shared {memory.get('shared_mb', 0.0)} MB, "
+        f"private (growth since fork) {memory.get('private_mb', 0.0)} MB"
+    )
+    server.serve_forever()
+
+
+def spawn_worker(listener: socket.socket) -> int:
+    pid = os.fork()
+    if pid == 0:
+        try:
+            run_worker(listener)
+        finally:
+            # os._exit() skips atexit, so flush buffered sessions here
+            try:
+                shutdown()
+            finally:
+                os._exit(0)
+    return pid
+
+
+def main():
+    if SESSION_BACKEND != "sqlite":
+        logger.warning("⚠️ Workers do not share in-memory sessions; set SONG_GENIE_SESSION_BACKEND=sqlite")
+
+    preload_catalogs()
+
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((FLASK_HOST, FLASK_PORT))
+    listener.listen(128)
+    listener.set_inheritable(True)
+
+    # Objects that exist now are never collected, so the GC will not
+    # dirty their pages in the workers
+    gc.collect()
+    gc.freeze()
+
+    master_memory = process_memory()
+    logger.info(
+        f"🚀 Master {master_memory['pid']}: rss {master_memory['rss_mb']} MB before fork, "
+        f"starting {PREFORK_WORKERS} workers on http://{FLASK_HOST}:{FLASK_PORT}"
+    )
+
+    workers = {spawn_worker(listener) for _ in range(max(1, PREFORK_WORKERS))}
+    stopping = False
+
+    def shutdown(*_):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        workers.discard(pid)
+        if not stopping:
+            logger.warning(f"⚠️ Worker {pid} exited with status {status}, restarting")
+            workers.add(spawn_worker(listener))
+
+    listener.close()
+    logger.info("👋 Master stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import threading
+import time
+
+import pytest
+
+from backend.logic.admission import AdmissionController, AdmissionRejected
+
+
+def test_token_bucket_rejects_with_retry_after():
+    controller = AdmissionController(max_in_flight=0, rate_per_second=1, burst=2)
+    controller.acquire("a")
+    controller.acquire("a")
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.acquire("a")
+    assert rejected.value.status_code == 429
+    assert rejected.value.retry_after >= 1
+
+    controller.acquire("b")  # buckets are per client
+    assert controller.stats()["shed_rate_limited"] == 1
+
+
+def test_busy_slots_shed_with_503_after_queue_target():
+    controller = AdmissionController(max_in_flight=1, max_queue=1, queue_target_ms=20, rate_per_second=0)
+    controller.acquire("a")
+
+    with pytest.raises(AdmissionRejected) as timed_out:
+        controller.acquire("b")
+    assert timed_out.value.status_code == 503
+
+    # A queued request is admitted as soon as a slot frees up
+    admitted = threading.Event()
+    controller.queue_target = 5.0
+
+    def waiter():
+        controller.acquire("c")
+        admitted.set()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    while controller.stats()["queue_depth"] == 0:
+        time.sleep(0.001)
+    with pytest.raises(AdmissionRejected) as full:
+        controller.acquire("d")
+    assert full.value.status_code == 503
+
+    controller.release()
+    thread.join(timeout=5)
+    assert admitted.is_set()
+    stats = controller.stats()
+    assert (stats["shed_queue_timeout"], stats["shed_queue_full"], stats["in_flight"]) == (1, 1, 1)
+
+
+def test_client_key_uses_forwarded_header_only_when_configured(monkeypatch):
+    from backend.logic import admission as admission_module
+
+    monkeypatch.setattr(admission_module, "RATE_LIMIT_CLIENT_HEADER", "")
+    assert admission_module.client_key("10.0.0.1", "1.2.3.4") == "10.0.0.1"
+
+    monkeypatch.setattr(admission_module, "RATE_LIMIT_CLIENT_HEADER", "X-Forwarded-For")
+    # The trusted proxy appends the address it saw; earlier entries are client-supplied
+    assert admission_module.client_key("10.0.0.1", "6.6.6.6, 1.2.3.4") == "1.2.3.4"
+    assert admission_module.client_key("10.0.0.1", None) == "10.0.0.1"
+    assert admission_module.client_key(None) == "unknown"
@@ -34,3 +34,228 @@ def test_sessions_and_insights_endpoints_exist():
     assert client.get("/sessions").status_code == 200
     assert client.get("/insights").status_code == 200
 
+
+
+def test_answer_flow_and_session_memory_report():
+    app_module = importlib.import_module("app")
+    client = app_module.app.test_client()
+    start = client.get("/start?size=20").get_json()
+    session_id = start["session_id"]
+
+    res = client.post("/answer", json={"session_id": session_id, "answer": "yes"})
+    assert res.status_code == 200
+    assert res.get_json()["type"] in {"question", "result"}
+
+    listing = client.get("/sessions").get_json()
+    entry = next(s for s in listing["sessions"] if s["session_id"] == session_id)
+    assert entry["questions_asked"] >= 1
+    assert 0 < entry["memory_bytes"] <= listing["memory_bytes"]
+
+
+def test_concurrent_answers_for_one_session_are_serialized():
+    import threading
+
+    app_module = importlib.import_module("app")
+    client = app_module.app.test_client()
+    session_id = client.get("/start?size=30").get_json()["session_id"]
+
+    def send():
+        app_module.app.test_client().post("/answer", json={"session_id": session_id, "answer": "no"})
+
+    threads = [threading.Thread(target=send) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    session = app_module.session_manager.get(session_id)
+    asked = list(session.question_log)
+    assert len(asked) == len(set(asked))
+    assert len(session.answer_log) <= len(asked) <= len(session.answer_log) + 1
+
+
+def test_start_serves_precomputed_first_question():
+    from backend.logic.catalog import get_catalog
+
+    app_module = importlib.import_module("app")
+    client = app_module.app.test_client()
+    catalog = get_catalog(20)
+
+    assert catalog.first_question == catalog.select_question(catalog.new_beliefs())
+    question = client.get("/start?size=20").get_json()["question"]
+    assert question["text"] in catalog.question_texts(catalog.first_question)
+
+
+def test_status_serves_snapshot_without_building_engines(monkeypatch):
+    from backend.logic import simple_enhanced
+
+    app_module = importlib.import_module("app")
+    client = app_module.app.test_client()
+    client.get("/start?size=20")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("status must not build an engine")
+
+    monkeypatch.setattr(simple_enhanced.SimpleEnhancedAkenator, "load_songs", fail)
+    body = client.get("/status").get_json()
+    assert body["status"] == "success"
+    assert body["system_status"]["system_type"] == "Simple Enhanced"
+    assert "rss_mb" in body["memory"]
+    assert all("compile_seconds" in entry for entry in body["catalogs"]["catalogs"])
+
+
+def test_cold_status_reports_no_engine(monkeypatch):
+    from collections import OrderedDict
+
+    from backend.logic import catalog as catalog_module
+    from backend.logic import simple_enhanced
+    from backend.logic.status import StatusReporter
+
+    def fail(*args, **kwargs):
+        raise AssertionError("status must not build an engine")
+
+    monkeypatch.setattr(catalog_module, "_catalogs", OrderedDict())
+    monkeypatch.setattr(simple_enhanced.SimpleEnhancedAkenator, "load_songs", fail)
+    reporter = StatusReporter(session_manager=[], refresh_interval=3600)
+    assert reporter.refresh()["system_status"]["engine_built"] is False
+
+
+def test_play_song_uses_indexed_payloads():
+    import pytest
+
+    pytest.importorskip("requests")  # kg_loader dependency
+    from backend.logic.song_index import dataset_index, find_playback_json
+
+    app_module = importlib.import_module("app")
+    client = app_module.app.test_client()
+    client.get("/start?size=20")
+
+    song_id = next(iter(dataset_index().songs), None)
+    if song_id is None:
+        from backend.logic.catalog import get_catalog
+        song_id = get_catalog(20).song_ids[0]
+
+    res = client.get(f"/play_song/{song_id}")
+    assert res.status_code == 200
+    assert res.get_data(as_text=True) == find_playback_json(song_id)
+    assert res.get_json()["song"]["id"] == song_id
+    assert client.get("/play_song/987654321").status_code == 404
+
+
+def test_session_stream_sends_snapshot_then_deltas():
+    import json
+
+    from backend.logic.live_updates import live_updates
+
+    app_module = importlib.import_module("app")
+    client = app_module.app.test_client()
+    session_id = client.get("/start?size=20").get_json()["session_id"]
+    session = app_module.session_manager.get(session_id)
+
+    events = live_updates.stream(session_id, session, alive=lambda: True)
+    snapshot = json.loads(next(events).split("data: ", 1)[1])
+    assert snapshot["seq"] == 1 and len(snapshot["order"]) == len(snapshot["names"]) == 5
+
+    client.post("/answer", json={"session_id": session_id, "answer": "yes"})
+    delta = json.loads(next(events).split("data: ", 1)[1])
+    assert delta["seq"] == 2 and delta["questions_asked"] >= 1
+    assert set(delta["set"]) | set(snapshot["set"]) >= {str(i) for i in delta["order"]}
+    events.close()
+    assert not live_updates.has_subscribers(session_id)
+
+    assert client.get("/sessions/not-a-session/stream").status_code == 404
+
+
+def test_slim_answer_format_and_cacheable_song_card():
+    app_module = importlib.import_module("app")
+    client = app_module.app.test_client()
+    session_id = client.get("/start?size=20").get_json()["session_id"]
+
+    for _ in range(25):
+        res = client.post(
+            "/answer",
+            json={"session_id": session_id, "answer": "yes"},
+            headers={"Accept": "application/vnd.songgenie.slim+json"},
+        )
+        assert res.content_type == "application/vnd.songgenie.slim+json"
+        body = res.get_json(force=True)
+        if body["type"] == "result":
+            break
+        assert set(body["question"]) == {"text"}
+
+    assert body["type"] == "result" and set(body["song"]) == {"id", "title", "artists"}
+    song_id = body["song"]["id"]
+    assert body["top_songs"][0][0] == song_id
+
+    card = client.get(f"/songs/{song_id}?catalog={body['catalog_version']}")
+    assert card.status_code == 200 and card.get_json()["id"] == song_id
+    assert "max-age" in card.headers["Cache-Control"]
+    again = client.get(
+        f"/songs/{song_id}?catalog={body['catalog_version']}",
+        headers={"If-None-Match": card.headers["ETag"]},
+    )
+    assert again.status_code == 304
+
+
+def test_metric_label_values_are_escaped():
+    from backend.logic.metrics import MetricsRegistry
+
+    registry = MetricsRegistry()
+    registry.counter("demo_total", "Demo", ["path"]).labels('C:\\x "y"\nz').inc()
+    registry.callback("demo_gauge", "Demo", lambda: [({"version": 'a"b'}, 1)])
+    text = registry.render()
+    assert 'demo_total{path="C:\\\\x \\"y\\"\\nz"} 1' in text
+    assert 'demo_gauge{version="a\\"b"} 1' in text
+
+
+def test_metrics_endpoint_exposes_stage_histograms_and_gauges():
+    app_module = importlib.import_module("app")
+    client = app_module.app.test_client()
+    session_id = client.get("/start?size=20").get_json()["session_id"]
+    client.post("/answer", json={"session_id": session_id, "answer": "no"})
+
+    res = client.get("/metrics")
+    assert res.status_code == 200 and res.content_type.startswith("text/plain")
+    text = res.get_data(as_text=True)
+    assert "# TYPE song_genie_stage_seconds histogram" in text
+    assert 'song_genie_stage_seconds_bucket{stage="belief_update",le="+Inf"}' in text
+    assert 'song_genie_request_seconds_count{endpoint="/answer"}' in text
+    assert "song_genie_turn_decisions_total{source=" in text
+    assert "song_genie_active_sessions " in text
+
+
+def test_profile_header_captures_request_into_admin_buffer():
+    app_module = importlib.import_module("app")
+    client = app_module.app.test_client()
+
+    res = client.get("/start?size=20", headers={"X-Profile": "1", "X-Request-Id": "prof-start-1"})
+    assert res.headers["X-Profile-Id"] == "prof-start-1"
+
+    listing = client.get("/admin/profiles").get_json()
+    assert listing["profiles"][0]["request_id"] == "prof-start-1"
+    record = client.get("/admin/profiles/prof-start-1").get_json()
+    assert record["path"] == "/start" and record["top"]
+    assert client.get("/admin/profiles/unknown").status_code == 404
+
+    remote = client.get("/admin/profiles", environ_base={"REMOTE_ADDR": "203.0.113.9"})
+    assert remote.status_code == 403
+
+
+def test_admin_memory_breakdown_and_tracemalloc_diff():
+    app_module = importlib.import_module("app")
+    client = app_module.app.test_client()
+
+    baseline = client.post("/admin/tracemalloc/snapshots").get_json()["snapshot"]["id"]
+    session_ids = [client.get("/start?size=20").get_json()["session_id"] for _ in range(3)]
+    after = client.post("/admin/tracemalloc/snapshots").get_json()["snapshot"]["id"]
+
+    diff = client.get(f"/admin/tracemalloc/diff?from={baseline}&to={after}&top=5").get_json()
+    assert diff["status"] == "success" and len(diff["top"]) <= 5
+    assert client.get(f"/admin/tracemalloc/diff?from=nope&to={after}").status_code == 404
+    assert client.delete("/admin/tracemalloc").status_code == 200
+
+    report = client.get("/admin/memory?limit=1000").get_json()
+    entry = next(s for s in report["sessions"] if s["session_id"] == session_ids[0])
+    assert set(entry["breakdown"]) == {"object", "beliefs", "asked_set", "history", "engine_refs"}
+    assert entry["memory_bytes"] == sum(entry["breakdown"].values())
+    assert report["session_bytes"] == sum(report["components"].values())
@@ -0,0 +1,164 @@
+import asyncio
+import json
+
+
+def _send(method, path, body=None, query=b"", headers=(), client="127.0.0.1"):
+    from asgi import app
+
+    messages = [{"type": "http.request", "body": json.dumps(body).encode() if body is not None else b""}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "query_string": query,
+             "client": (client, 1), "headers": list(headers)}
+    asyncio.run(app(scope, receive, send))
+    return sent
+
+
+def _call(method, path, body=None, query=b""):
+    sent = _send(method, path, body, query)
+    return sent[0]["status"], json.loads(sent[1]["body"] or b"null")
+
+
+def _headers(path, query=b"", headers=()):
+    sent = _send("GET", path, query=query, headers=headers)
+    return sent[0]["status"], dict(sent[0]["headers"])
+
+
+def test_asgi_start_answer_feedback_contract():
+    status, start = _call("GET", "/start", query=b"size=20")
+    assert status == 200 and start["question"]["text"]
+
+    status, turn = _call("POST", "/answer", {"session_id": start["session_id"], "answer": "yes"})
+    assert status == 200 and turn["type"] in {"question", "result"}
+
+    status, feedback = _call("POST", "/feedback", {"session_id": start["session_id"], "feedback": "correct"})
+    assert status == 200 and feedback["status"] == "success"
+
+    assert _call("POST", "/answer", {"session_id": "missing", "answer": "yes"})[0] == 400
+    assert _call("GET", "/play_song/not-a-number")[0] == 404
+
+
+def test_asgi_serves_cacheable_song_cards():
+    from backend.logic.catalog import get_catalog
+
+    catalog = get_catalog(20)
+    song = catalog.songs[0]
+    query = f"catalog={catalog.version}".encode()
+
+    status, card = _call("GET", f"/songs/{song['id']}", query=query)
+    assert status == 200 and card == song
+
+    status, headers = _headers(f"/songs/{song['id']}", query=query)
+    assert b"max-age=86400" in headers[b"cache-control"]
+    status, _ = _headers(f"/songs/{song['id']}", query=query,
+                         headers=[(b"if-none-match", headers[b"etag"])])
+    assert status == 304
+    assert _call("GET", "/songs/999999999", query=query)[0] == 404
+
+
+def test_asgi_session_stream_pushes_updates_until_disconnect():
+    from app import answer_game
+    from asgi import app
+
+    session_id = _call("GET", "/start", query=b"size=20")[1]["session_id"]
+    chunks = []
+    arrived = asyncio.Queue()
+    disconnect = asyncio.Event()
+
+    async def receive():
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        chunks.append(message)
+        await arrived.put(message)
+
+    async def run():
+        scope = {"type": "http", "method": "GET", "path": f"/sessions/{session_id}/stream",
+                 "query_string": b"", "client": ("127.0.0.1", 1), "headers": []}
+        stream = asyncio.ensure_future(app(scope, receive, send))
+        assert (await arrived.get())["status"] == 200
+        assert b"event: update" in (await arrived.get())["body"]
+        # Published from a worker thread, delivered without one parked per stream
+        await asyncio.to_thread(answer_game, {"session_id": session_id, "answer": "yes"})
+        delta = await asyncio.wait_for(arrived.get(), 5)
+        assert b'"seq":2' in delta["body"]
+        disconnect.set()
+        await asyncio.wait_for(stream, 5)
+
+    asyncio.run(run())
+    assert _call("GET", "/sessions/not-a-session/stream")[0] == 404
+
+
+def test_asgi_profiles_offloaded_work_into_admin_buffer():
+    sent = _send("GET", "/start", query=b"size=20",
+                 headers=[(b"x-profile", b"1"), (b"x-request-id", b"asgi-prof-1")])
+    assert dict(sent[0]["headers"])[b"x-profile-id"] == b"asgi-prof-1"
+
+    status, listing = _call("GET", "/admin/profiles")
+    assert status == 200 and listing["profiles"][0]["request_id"] == "asgi-prof-1"
+    status, record = _call("GET", "/admin/profiles/asgi-prof-1")
+    assert status == 200 and record["path"] == "/start"
+    # The game handler ran on a worker thread and is still in the profile
+    assert any("start_game" in row["function"] for row in record["top"])
+    assert _call("GET", "/admin/profiles/unknown")[0] == 404
+    assert _send("GET", "/admin/profiles", client="203.0.113.9")[0]["status"] == 403
+
+
+def test_asgi_serves_every_flask_route():
+    import re
+
+    from app import app as flask_app
+    from backend.logic.memory_tracing import memory_tracer
+
+    missing = []
+    try:
+        for rule in flask_app.url_map.iter_rules():
+            if rule.endpoint == "static":
+                continue
+            path = re.sub(r"<int:[^>]+>", "1", rule.rule)
+            path = re.sub(r"<[^>]+>", "missing", path)
+            for method in sorted(rule.methods - {"HEAD", "OPTIONS"}):
+                sent = _send(method, path)
+                body = sent[1]["body"] if len(sent) > 1 else b""
+                if sent[0]["status"] == 404 and b"Endpoint not found" in body:
+                    missing.append(f"{method} {rule.rule}")
+    finally:
+        memory_tracer.stop()
+    assert not missing
+
+
+def test_asgi_admin_memory_and_tracemalloc():
+    baseline = _call("POST", "/admin/tracemalloc/snapshots")[1]["snapshot"]["id"]
+    session_id = _call("GET", "/start", query=b"size=20")[1]["session_id"]
+    after = _call("POST", "/admin/tracemalloc/snapshots")[1]["snapshot"]["id"]
+
+    status, diff = _call("GET", "/admin/tracemalloc/diff", query=f"from={baseline}&to={after}&top=5".encode())
+    assert status == 200 and len(diff["top"]) <= 5
+    assert _call("GET", "/admin/tracemalloc/diff", query=b"group_by=nope")[0] == 400
+    assert _call("DELETE", "/admin/tracemalloc")[0] == 200
+
+    status, report = _call("GET", "/admin/memory", query=b"limit=1000")
+    assert status == 200 and report["session_bytes"] == sum(report["components"].values())
+    assert any(entry["session_id"] == session_id for entry in report["sessions"])
+    assert _send("GET", "/admin/memory", client="203.0.113.9")[0]["status"] == 403
+
+
+def test_asgi_serves_frontend_and_reports():
+    sent = _send("GET", "/")
+    assert sent[0]["status"] == 200 and b"<html" in sent[1]["body"].lower()
+    assert dict(sent[0]["headers"])[b"content-type"].startswith(b"text/html")
+    assert _send("GET", "/script.js")[0]["status"] == 200
+
+    status, body = _call("GET", "/status")
+    assert status == 200 and body["status"] == "success" and "memory" in body
+    status, body = _call("GET", "/sessions")
+    assert status == 200 and isinstance(body["sessions"], list)
+    status, body = _call("GET", "/insights")
+    assert status == 200 and "catalog_cache" in body
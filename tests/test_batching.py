@@ -0,0 +1,37 @@
+import threading
+
+from backend.logic.batching import BatchScheduler
+from backend.logic.catalog import get_catalog
+
+
+def test_decide_turns_matches_individual_decisions():
+    catalog = get_catalog(20)
+    turns = []
+    for answer in ("yes", "no"):
+        beliefs = catalog.new_beliefs()
+        catalog.update_beliefs(beliefs, catalog.first_question, answer)
+        turns.append((beliefs, 1 << catalog.first_question, 1))
+
+    batched = catalog.decide_turns(turns)
+    assert batched == [catalog.decide_turn(*turn) for turn in turns]
+
+
+def test_scheduler_batches_concurrent_turns():
+    catalog = get_catalog(20)
+    scheduler = BatchScheduler(window_ms=200, max_batch=4)
+    results = [None] * 4
+    start = threading.Barrier(4)
+
+    def run(i):
+        beliefs = catalog.new_beliefs()
+        start.wait()
+        results[i] = scheduler.decide(catalog, beliefs, 0, 0)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(result.question_index == catalog.first_question for result in results)
+    assert scheduler.stats()["largest_batch"] == 4
@@ -24,3 +24,47 @@ def test_update_beliefs_changes_distribution():
     updated = update_beliefs(beliefs, songs, "genres", "Pop", "yes")
     assert updated[1] > updated[2]
 
+
+
+def test_belief_vector_float64_matches_dict_update():
+    import numpy as np
+    from backend.logic.belief import BeliefVector
+
+    songs = [
+        {"id": 1, "genres": ["Pop"], "language": "English"},
+        {"id": 2, "genres": ["Rock"], "language": "English"},
+        {"id": 3, "genres": ["Pop"], "language": "Spanish"},
+    ]
+    beliefs = {1: 1 / 3, 2: 1 / 3, 3: 1 / 3}
+    vector = BeliefVector.uniform(3, dtype="float64", renormalize_every=2)
+
+    for feature, value, answer in [
+        ("genres", "Pop", "yes"),
+        ("language", "English", "no"),
+        ("genres", "Rock", "unsure"),
+    ]:
+        beliefs = update_beliefs(beliefs, songs, feature, value, answer)
+        matches = np.array([value in s[feature] if isinstance(s[feature], list) else s[feature] == value for s in songs])
+        vector.update(matches, answer, feature=feature)
+
+    assert vector.dtype == np.float64
+    expected = [beliefs[1], beliefs[2], beliefs[3]]
+    assert np.allclose(vector.probabilities(), expected, atol=1e-12)
+
+
+def test_belief_vector_float32_stays_normalized_over_many_updates():
+    import numpy as np
+    from backend.logic.belief import BeliefVector
+
+    rng = np.random.default_rng(0)
+    vector32 = BeliefVector.uniform(500, dtype="float32")
+    vector64 = BeliefVector.uniform(500, dtype="float64")
+    for _ in range(200):
+        matches = rng.random(500) < 0.5
+        vector32.update(matches, "yes", feature="genres")
+        vector64.update(matches, "yes", feature="genres")
+
+    assert vector32.log_beliefs.dtype == np.float32
+    assert np.isfinite(vector32.log_beliefs).all()
+    assert abs(vector32.probabilities().sum() - 1.0) < 1e-9
+    assert np.allclose(vector32.probabilities(), vector64.probabilities(), atol=1e-4)
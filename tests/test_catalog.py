@@ -0,0 +1,52 @@
+from collections import OrderedDict
+
+from backend.logic import catalog as catalog_module
+
+
+def test_catalog_cache_is_a_bounded_lru(monkeypatch):
+    monkeypatch.setattr(catalog_module, "_catalogs", OrderedDict())
+    monkeypatch.setattr(catalog_module, "_catalog_counters", {"hits": 0, "misses": 0, "evictions": 0})
+    monkeypatch.setattr(catalog_module, "CATALOG_CACHE_SIZE", 1)
+
+    first = catalog_module.get_catalog(10)
+    assert catalog_module.get_catalog(10) is first
+    rebuilt_other = catalog_module.get_catalog(11)
+
+    stats = catalog_module.catalog_stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 2, 1)
+    assert [entry["size"] for entry in stats["catalogs"]] == [11]
+    assert stats["catalogs"][0]["memory_bytes"] == rebuilt_other.memory_bytes()
+    # Songs and pre-serialized fragments are counted too, and no engine is pinned
+    assert rebuilt_other.memory_bytes() > rebuilt_other.array_bytes()
+    assert not hasattr(rebuilt_other, "engine")
+
+    # Seeded expansion: an evicted size rebuilds to the same version
+    assert catalog_module.get_catalog(10).version == first.version
+
+
+def test_catalog_build_does_not_construct_an_engine(monkeypatch):
+    from backend.logic import simple_enhanced
+
+    def fail(*args, **kwargs):
+        raise AssertionError("catalogs must load songs without an engine")
+
+    monkeypatch.setattr(catalog_module, "_catalogs", OrderedDict())
+    monkeypatch.setattr(simple_enhanced.SimpleEnhancedAkenator, "__init__", fail)
+    catalog = catalog_module.get_catalog(12)
+    assert catalog.target_dataset_size == 12
+    assert catalog.system_status["dataset_size"] == len(catalog.songs) >= 12
+    assert catalog.system_status["active_songs"] == len(catalog.songs)
+
+
+def test_song_index_fragments_splice_into_responses():
+    import json
+
+    from backend.logic.json_fragments import dumps
+
+    catalog = catalog_module.get_catalog(20)
+    song = catalog.songs[3]
+    card = catalog.song_index.card_json(song["id"])
+
+    body = json.loads(dumps({"song": card, "top": [card], "n": 1.5}))
+    assert body == {"song": song, "top": [song], "n": 1.5}
+    assert json.loads(catalog.song_index.playback_json(song["id"]))["type"] == "playback"
@@ -0,0 +1,48 @@
+import math
+
+import numpy as np
+
+from backend.logic.questions import (
+    ANSWERS,
+    entropy,
+    simulate_bayesian_update,
+    simulate_bayesian_update_batch,
+)
+
+
+SONGS = [
+    {"id": 10, "genres": ["Pop"], "language": "English"},
+    {"id": 11, "genres": ["Rock"], "language": "English"},
+    {"id": 12, "genres": ["Pop", "Rock"], "language": "Spanish"},
+    {"id": 13, "genres": ["Jazz"], "language": "French"},
+]
+QUESTIONS = [
+    {"feature": "genres", "value": "Pop", "text": ""},
+    {"feature": "language", "value": "English", "text": ""},
+    {"feature": "genres", "value": "Metal", "text": ""},
+]
+BELIEFS = {10: 0.4, 11: 0.3, 12: 0.2, 13: 0.1}
+
+
+def test_batch_what_if_matches_scalar_simulation():
+    summary = simulate_bayesian_update_batch(SONGS, BELIEFS, QUESTIONS)
+
+    for i, question in enumerate(QUESTIONS):
+        for a, answer in enumerate(ANSWERS):
+            posterior = simulate_bayesian_update(
+                SONGS, dict(BELIEFS), question["feature"], question["value"], answer
+            )
+            ranked = sorted(posterior.items(), key=lambda kv: kv[1], reverse=True)
+
+            assert math.isclose(summary["entropy"][i, a], entropy(posterior.values()), abs_tol=1e-9)
+            assert summary["top_id"][i, a] == ranked[0][0]
+            assert math.isclose(summary["top_prob"][i, a], ranked[0][1], abs_tol=1e-9)
+            assert math.isclose(summary["margin"][i, a], ranked[0][1] - ranked[1][1], abs_tol=1e-9)
+
+
+def test_batch_what_if_predictive_probabilities_sum_to_one():
+    summary = simulate_bayesian_update_batch(SONGS, BELIEFS, QUESTIONS)
+    yes_no = summary["evidence"][:, 0] + summary["evidence"][:, 1]
+    assert np.allclose(yes_no, 1.0)
+    assert np.allclose(summary["evidence"][:, 2], 1.0)
+    assert math.isclose(summary["yes_mass"][0], 0.6)
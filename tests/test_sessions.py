@@ -0,0 +1,255 @@
+import threading
+import time
+
+from backend.logic import sessions
+from backend.logic.sessions import (
+    InMemorySessionStore,
+    Session,
+    SessionManager,
+    SQLiteSessionStore,
+)
+
+
+def _play(session, answers):
+    catalog = session.catalog
+    for answer in answers:
+        session.ask(catalog.select_question(session.beliefs, session.asked_bits))
+        session.record_answer(answer)
+
+
+def test_session_manager_sliding_expiry(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(sessions.time, "time", lambda: clock[0])
+    manager = SessionManager(store=InMemorySessionStore(ttl_seconds=10), reap_interval=3600)
+    monkeypatch.setattr(manager, "_ttl_seconds", 10.0)
+
+    kept_id, _ = manager.create(10)
+    dropped_id, _ = manager.create(10)
+
+    clock[0] += 8
+    assert manager.get(kept_id) is not None  # refreshes the sliding TTL
+
+    clock[0] += 5
+    assert manager.cleanup() == 1
+    assert manager.get(dropped_id) is None
+    assert manager.get(kept_id) is not None
+
+    # Liveness checks (SSE heartbeats) must not extend the TTL
+    clock[0] += 6
+    assert manager.is_live(kept_id)
+    clock[0] += 6
+    assert not manager.is_live(kept_id)
+    manager.stop_reaper()
+
+
+def test_session_round_trips_through_bytes():
+    session = Session(20)
+    _play(session, ["yes", "no", "unsure"])
+    session.ask(session.catalog.select_question(session.beliefs, session.asked_bits))
+
+    restored = Session.from_bytes(session.to_bytes())
+
+    assert restored.catalog is session.catalog
+    assert list(restored.question_log) == list(session.question_log)
+    assert restored.answer_log == session.answer_log
+    assert restored.asked_bits == session.asked_bits
+    assert restored.pending_question == session.pending_question
+    assert (restored.beliefs.probabilities() - session.beliefs.probabilities()).max() < 1e-6
+
+
+def test_sqlite_store_shares_sessions_between_managers(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    first = SessionManager(store=SQLiteSessionStore(path, flush_interval=0.01), reap_interval=3600)
+    second = SessionManager(store=SQLiteSessionStore(path, flush_interval=0.01), reap_interval=3600)
+
+    session_id, _ = first.create(20)
+    with first.checkout(session_id) as session:
+        _play(session, ["yes", "no"])
+    first.store.flush()
+
+    shared = second.get(session_id)
+    assert shared is not None
+    assert shared.answer_log == bytearray([0, 1])
+    assert len(second) == 1
+
+    first.close()
+    second.close()
+
+
+def test_sqlite_turns_from_two_managers_both_apply(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    managers = [SessionManager(store=SQLiteSessionStore(path), reap_interval=3600) for _ in range(2)]
+    session_id, _ = managers[0].create(20)
+
+    def answer(manager, reply):
+        def turn(session):
+            question = session.catalog.select_question(session.beliefs, session.asked_bits)
+            time.sleep(0.05)  # widen the read-modify-write window
+            session.ask(question)
+            session.record_answer(reply)
+
+        manager.apply(session_id, turn)
+
+    threads = [threading.Thread(target=answer, args=(manager, reply))
+               for manager, reply in zip(managers, ["yes", "no"])]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    session = managers[1].get(session_id)
+    assert sorted(session.answer_log) == [0, 1]
+    assert len(session.question_log) == 2
+    for manager in managers:
+        manager.close()
+
+
+def test_sqlite_turn_does_not_block_other_workers(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    first, second = (SessionManager(store=SQLiteSessionStore(path), reap_interval=3600) for _ in range(2))
+    slow_id, _ = first.create(20)
+    fast_id, _ = second.create(20)
+    other_done = threading.Event()
+
+    def slow_turn(session):
+        # Held open until the other worker has written its own turn
+        assert other_done.wait(5)
+        _play(session, ["yes"])
+
+    slow = threading.Thread(target=first.apply, args=(slow_id, slow_turn))
+    slow.start()
+    second.apply(fast_id, lambda session: _play(session, ["no"]))
+    other_done.set()
+    slow.join()
+
+    assert first.get(fast_id).answer_log == bytearray([1])
+    assert second.get(slow_id).answer_log == bytearray([0])
+    first.close()
+    second.close()
+
+
+def test_sqlite_checkout_decodes_once_and_reads_only_touch(tmp_path, monkeypatch):
+    manager = SessionManager(store=SQLiteSessionStore(str(tmp_path / "sessions.db")), reap_interval=3600)
+    session_id, _ = manager.create(20)
+
+    decoded = []
+    from_bytes = Session.from_bytes.__func__
+    monkeypatch.setattr(Session, "from_bytes",
+                        classmethod(lambda cls, blob: decoded.append(blob) or from_bytes(cls, blob)))
+    with manager.checkout(session_id) as session:
+        _play(session, ["yes"])
+    assert len(decoded) == 1
+
+    saved_rows = []
+    monkeypatch.setattr(manager.store, "_row", lambda entry: saved_rows.append(entry))
+    assert manager.get(session_id).answer_log == bytearray([0])
+    assert saved_rows == []
+    manager.close()
+
+
+def test_sqlite_reporting_and_liveness_never_decode_sessions(tmp_path, monkeypatch):
+    manager = SessionManager(store=SQLiteSessionStore(str(tmp_path / "sessions.db")), reap_interval=3600)
+    session_id, _ = manager.create(20)
+    with manager.checkout(session_id) as session:
+        _play(session, ["yes", "no"])
+        session.ask(session.catalog.select_question(session.beliefs, session.asked_bits))
+        version = session.catalog_version
+
+    def fail(*args, **kwargs):
+        raise AssertionError("reporting must not decode sessions")
+
+    monkeypatch.setattr(Session, "from_bytes", classmethod(fail))
+    (summary,) = manager.summaries()
+    assert (summary.session_id, summary.catalog_version) == (session_id, version)
+    assert (summary.questions_asked, summary.answers) == (3, 2)
+    assert summary.breakdown["state"] > 0
+    # SSE heartbeats read last_access only
+    assert manager.is_live(session_id)
+    assert not manager.is_live("missing")
+    manager.close()
+
+
+def test_memory_store_restores_snapshot_lazily(tmp_path):
+    path = str(tmp_path / "sessions.snapshot")
+    first = SessionManager(store=InMemorySessionStore(snapshot_path=path), reap_interval=3600)
+    played_id, _ = first.create(20)
+    untouched_id, _ = first.create(20)
+    with first.checkout(played_id) as session:
+        _play(session, ["yes", "no"])
+    first.close()  # writes the final snapshot
+
+    store = InMemorySessionStore(snapshot_path=path)
+    second = SessionManager(store=store, reap_interval=3600)
+    assert len(second) == 2
+    assert second.is_live(untouched_id)
+    assert not any(stripe.sessions for stripe in store._stripes)  # nothing decoded yet
+
+    restored = second.get(played_id)
+    assert restored is not None
+    assert restored.answer_log == bytearray([0, 1])
+
+    # A second restart still carries the session nobody looked at
+    second.close()
+    third = SessionManager(store=InMemorySessionStore(snapshot_path=path), reap_interval=3600)
+    assert third.get(untouched_id) is not None
+    assert third.get(played_id).answer_log == bytearray([0, 1])
+    third.stop_reaper()
+
+
+def test_corrupt_snapshot_is_set_aside_and_startup_continues(tmp_path):
+    path = tmp_path / "sessions.snapshot"
+    first = SessionManager(store=InMemorySessionStore(snapshot_path=str(path)), reap_interval=3600)
+    first.create(20)
+    first.create(20)
+    first.close()
+    path.write_bytes(path.read_bytes()[:30])  # cut off mid-index
+
+    store = InMemorySessionStore(snapshot_path=str(path))
+    assert len(store) == 0
+    assert not path.exists()
+    assert len(list(tmp_path.glob("sessions.snapshot.corrupt-*"))) == 1
+
+
+def test_warm_pool_serves_ready_sessions_and_adapts_depth():
+    from backend.logic.warm_pool import WarmPool
+
+    pool = WarmPool(max_per_size=8, min_per_size=1, refill_interval=60)
+    first = pool.take(20)  # empty pool: built inline
+    assert first.pending_question == first.catalog.first_question
+
+    pool.refill()
+    assert pool.stats()["pools"]["20"]["depth"] >= 1
+    pooled = pool.take(20)
+    assert pooled is not first and pooled.questions_asked == 1
+
+    for _ in range(20):
+        pool.take(20)
+    assert pool.target_depth(20) > 1  # a busy size keeps a deeper pool
+    stats = pool.stats()
+    assert stats["hits"] >= 1 and stats["misses"] >= 1
+    pool.stop()
+
+
+def test_warm_pool_follows_the_catalog_lru(monkeypatch):
+    from collections import OrderedDict
+
+    from backend.logic import catalog as catalog_module
+    from backend.logic.warm_pool import WarmPool
+
+    monkeypatch.setattr(catalog_module, "_catalogs", OrderedDict())
+    monkeypatch.setattr(catalog_module, "CATALOG_CACHE_SIZE", 2)
+    pool = WarmPool(max_per_size=4, min_per_size=2, refill_interval=60, max_sizes=2)
+    monkeypatch.setattr(pool, "start", lambda: None)  # drive refills by hand
+
+    for size in range(10, 16):
+        pool.take(size)
+        pool.refill()
+
+    cached = {catalog.target_dataset_size for catalog in catalog_module.cached_catalogs()}
+    assert set(int(size) for size in pool.stats()["pools"]) <= cached
+    assert len(pool.stats()["pools"]) <= 2
+
+    # Refilling never rebuilds an evicted catalog
+    monkeypatch.setattr(catalog_module, "_build_catalog",
+                        lambda size: (_ for _ in ()).throw(AssertionError("rebuilt")))
+    pool.refill()
@@ -0,0 +1,58 @@
+import importlib
+
+import pytest
+
+from backend.logic.sessions import Session
+from backend.logic.state_tokens import InvalidStateToken, decode_session, encode_session
+
+
+def test_state_token_round_trip_rebuilds_posterior():
+    session = Session(20)
+    catalog = session.catalog
+    for answer in ["yes", "no", "unsure", "no"]:
+        session.ask(catalog.select_question(session.beliefs, session.asked_bits))
+        session.record_answer(answer)
+    session.ask(catalog.select_question(session.beliefs, session.asked_bits))
+
+    restored = decode_session(encode_session(session))
+
+    assert list(restored.question_log) == list(session.question_log)
+    assert restored.answer_log == session.answer_log
+    assert restored.pending_question == session.pending_question
+    assert abs(restored.beliefs.probabilities() - session.beliefs.probabilities()).max() < 1e-6
+
+
+def test_tampered_state_token_is_rejected():
+    session = Session(20)
+    session.ask(0)
+    token = encode_session(session)
+    tampered = token[:-2] + ("A" if token[-2] != "A" else "B") + token[-1]
+    with pytest.raises(InvalidStateToken):
+        decode_session(tampered)
+
+
+def test_expired_state_token_is_rejected(monkeypatch):
+    from backend.logic import state_tokens
+
+    session = Session(20)
+    session.ask(0)
+    token = encode_session(session)
+    monkeypatch.setattr(state_tokens.time, "time",
+                        lambda: 10**10)  # far past STATE_TOKEN_TTL_SECONDS
+    with pytest.raises(InvalidStateToken, match="Expired"):
+        decode_session(token)
+
+
+def test_stateless_game_through_endpoints():
+    app_module = importlib.import_module("app")
+    client = app_module.app.test_client()
+    sessions_before = len(app_module.session_manager)
+
+    start = client.get("/start?size=20&stateless=1").get_json()
+    token = start["session_id"]
+    assert token == start["state_token"]
+
+    res = client.post("/answer", json={"session_id": token, "answer": "yes"}).get_json()
+    assert res["status"] == "success"
+    assert res["session_id"] != token
+    assert len(app_module.session_manager) == sessions_before
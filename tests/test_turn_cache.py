@@ -0,0 +1,62 @@
+from backend.logic.sessions import Session
+from backend.logic.turn_cache import TranspositionCache, decide_turn
+
+
+def _answer(session, question_index, answer):
+    session.ask(question_index)
+    session.record_answer(answer)
+
+
+def test_answer_order_shares_one_cache_entry():
+    cache = TranspositionCache(max_entries=8)
+    first, second = Session(20), Session(20)
+    q1 = first.catalog.select_question(first.beliefs)
+    q2 = (q1 + 1) % len(first.catalog.questions)
+
+    _answer(first, q1, "yes")
+    _answer(first, q2, "no")
+    _answer(second, q2, "no")
+    _answer(second, q1, "yes")
+
+    decision = decide_turn(first, cache)
+    assert decide_turn(second, cache) is decision
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    expected = second.catalog.decide_turn(second.beliefs, second.asked_bits, second.questions_asked)
+    assert decision.question_index == expected.question_index
+    assert decision.should_guess == expected.should_guess
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TranspositionCache(max_entries=1)
+    session = Session(20)
+    decide_turn(session, cache)
+    _answer(session, session.catalog.select_question(session.beliefs), "yes")
+    decide_turn(session, cache)
+
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_speculation_precomputes_every_answer():
+    import time
+
+    from backend.logic.speculation import Speculator
+
+    cache = TranspositionCache(max_entries=64)
+    speculator = Speculator(cache=cache, workers=1)
+    session = Session(20)
+    session.ask(session.catalog.first_question)
+
+    assert speculator.speculate(session)
+    deadline = time.time() + 5
+    while speculator.stats()["pending"] and time.time() < deadline:
+        time.sleep(0.01)
+    assert speculator.stats()["computed"] == 3
+
+    session.record_answer("no")
+    decision = decide_turn(session, cache)
+    assert cache.stats()["hits"] == 1
+    expected = session.catalog.decide_turn(session.beliefs, session.asked_bits, session.questions_asked)
+    assert decision.question_index == expected.question_index
+    speculator.shutdown()